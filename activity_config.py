@@ -0,0 +1,182 @@
+# activity_config.py
+
+# Sincronización de la configuración de actividades de zona de una asignatura.
+# La configuración actual se carga una sola vez; se calcula la diferencia con lo enviado
+# (altas, cambios y bajas) y se aplica con sentencias masivas. Si una actividad cambia de
+# nombre o de unidad, las notas de zona asociadas se actualizan en la misma transacción.
+# subject_activities() comparte entre las vistas de notas, la validación de solicitudes y la
+# importación la configuración de cada asignatura desde una caché por proceso; cada entrada
+# guarda la versión de 'subject:<id>' con la que se leyó (ver cache.py y versions.py). En las
+# páginas con conditional_page esa versión ya se leyó para el ETag: un acierto no hace consultas.
+
+from collections import namedtuple
+from flask import current_app
+from sqlalchemy import select, insert, update, delete, bindparam, case, tuple_, and_
+from extensions import db
+from models import Grade, SubjectActivityConfig
+from grade_summary import rebuild_summaries
+from ledger import record_grade_rows, current_actor_id
+from cache import TTLCache, get_version
+from versions import subject_changed, subject_key
+
+# Fila de solo lectura con los atributos que usan las plantillas y unit_breakdown
+ActivityConfigRow = namedtuple('ActivityConfigRow', 'id unit_number activity_number activity_name max_score')
+# Actividades ordenadas por unidad y número, y punteo máximo por (unidad, nombre de actividad)
+SubjectActivities = namedtuple('SubjectActivities', 'activities max_scores')
+
+
+def init_app(app):
+    app.extensions['activity_config_cache'] = TTLCache(maxsize=app.config['ACTIVITY_CONFIG_CACHE_SIZE'],
+                                                       ttl=app.config['ACTIVITY_CONFIG_CACHE_TTL'])
+
+
+def _cache():
+    # Los comandos de consola no inicializan la caché: leen siempre de la base
+    return current_app.extensions.get('activity_config_cache')
+
+
+def _load_activities(subject_id):
+    config_table = SubjectActivityConfig.__table__
+    activities = tuple(ActivityConfigRow._make(row) for row in db.session.execute(
+        select(config_table.c.id, config_table.c.unit_number, config_table.c.activity_number,
+               config_table.c.activity_name, config_table.c.max_score)
+        .where(config_table.c.subject_id == subject_id)
+        .order_by(config_table.c.unit_number, config_table.c.activity_number)))
+    return SubjectActivities(activities, {(row.unit_number, row.activity_name): row.max_score for row in activities})
+
+
+def subject_activities(subject_id):
+    """Configuración de actividades de `subject_id` (SubjectActivities). No se debe modificar:
+    la misma instancia se comparte entre peticiones mientras no cambie la versión de la asignatura."""
+    cache = _cache()
+    if cache is None:
+        return _load_activities(subject_id)
+    version = get_version(subject_key(subject_id))
+    cached = cache.get(subject_id)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+    activities = _load_activities(subject_id)
+    # Se guarda con la versión leída antes de consultar: una escritura entretanto sube la versión
+    cache.set(subject_id, (version, activities))
+    return activities
+
+
+def clear_local_cache(subject_id):
+    """Se llama después del commit: este proceso descarta su copia de inmediato; los demás
+    workers detectan el cambio de versión en su próxima lectura."""
+    cache = _cache()
+    if cache is not None:
+        cache.pop(subject_id)
+
+
+class ActivitySyncResult:
+    """Resumen de los cambios aplicados a la configuración de una asignatura."""
+
+    def __init__(self):
+        self.inserted = 0
+        self.updated = 0
+        self.deleted = 0
+        self.grades_moved = 0 # Notas de zona renombradas o movidas de unidad
+        self.invalid_ids = [] # IDs enviados que no pertenecen a la asignatura
+
+    @property
+    def changed(self):
+        return bool(self.inserted or self.updated or self.deleted)
+
+
+def sync_activity_configs(subject_id, submitted):
+    """Aplica la configuración enviada para `subject_id`.
+
+    `submitted` es una lista de dicts con id (None para una actividad nueva), unit_number,
+    activity_name y max_score, en el orden del formulario; ese orden define activity_number
+    dentro de cada unidad. Lanza ValueError si una unidad repite el nombre de una actividad,
+    porque las notas se asocian a su actividad por (unidad, nombre).
+    """
+    config_table = SubjectActivityConfig.__table__
+    grade_table = Grade.__table__
+    result = ActivitySyncResult()
+
+    existing = {
+        row.id: row for row in db.session.execute(
+            select(config_table.c.id, config_table.c.unit_number, config_table.c.activity_number,
+                   config_table.c.activity_name, config_table.c.max_score)
+            .where(config_table.c.subject_id == subject_id))
+    }
+
+    # Estado deseado: numeración consecutiva por unidad según el orden del formulario
+    desired = []
+    seen_names = set()
+    next_number = {}
+    for item in submitted:
+        config_id = item.get('id')
+        if config_id and config_id not in existing:
+            result.invalid_ids.append(config_id)
+            continue
+        name_key = (item['unit_number'], item['activity_name'])
+        if name_key in seen_names:
+            raise ValueError(f'La actividad "{item["activity_name"]}" está repetida en {item["unit_number"]}.')
+        seen_names.add(name_key)
+        number = next_number.get(item['unit_number'], 0) + 1
+        next_number[item['unit_number']] = number
+        desired.append(dict(item, id=config_id or None, activity_number=number))
+
+    kept_ids = {item['id'] for item in desired if item['id']}
+    to_delete = [config_id for config_id in existing if config_id not in kept_ids]
+    to_insert = [item for item in desired if not item['id']]
+    to_update = []
+    renames = {} # (unidad, nombre) anterior -> (unidad, nombre) nuevo
+    for item in desired:
+        if not item['id']:
+            continue
+        old = existing[item['id']]
+        if (old.unit_number, old.activity_number, old.activity_name, old.max_score) != (
+                item['unit_number'], item['activity_number'], item['activity_name'], item['max_score']):
+            to_update.append(item)
+        if (old.unit_number, old.activity_name) != (item['unit_number'], item['activity_name']):
+            renames[(old.unit_number, old.activity_name)] = (item['unit_number'], item['activity_name'])
+
+    if to_delete:
+        db.session.execute(delete(config_table).where(config_table.c.id.in_(to_delete)))
+    if to_update:
+        # Números temporales negativos para que el intercambio de posiciones no viole
+        # la restricción única (asignatura, unidad, número) a mitad de la actualización
+        db.session.execute(
+            update(config_table)
+            .where(config_table.c.id.in_([item['id'] for item in to_update]))
+            .values(activity_number=-config_table.c.id))
+        db.session.execute(
+            update(config_table).where(config_table.c.id == bindparam('c_id')).values(
+                unit_number=bindparam('c_unit'), activity_number=bindparam('c_number'),
+                activity_name=bindparam('c_name'), max_score=bindparam('c_score')),
+            [{'c_id': item['id'], 'c_unit': item['unit_number'], 'c_number': item['activity_number'],
+              'c_name': item['activity_name'], 'c_score': item['max_score']} for item in to_update])
+    if to_insert:
+        db.session.execute(insert(config_table), [
+            {'subject_id': subject_id, 'unit_number': item['unit_number'], 'activity_number': item['activity_number'],
+             'activity_name': item['activity_name'], 'max_score': item['max_score']} for item in to_insert])
+
+    if renames:
+        # Un único UPDATE con CASE: los intercambios de nombre (A <-> B) se resuelven sin colisiones
+        old_unit, old_name = grade_table.c.unit_number, grade_table.c.activity_name
+        new_unit = case(*[(and_(old_unit == old[0], old_name == old[1]), new[0]) for old, new in renames.items()],
+                        else_=old_unit)
+        new_name = case(*[(and_(old_unit == old[0], old_name == old[1]), new[1]) for old, new in renames.items()],
+                        else_=old_name)
+        moved_filter = and_(grade_table.c.subject_id == subject_id, grade_table.c.component_type == 'Zona',
+                            tuple_(old_unit, old_name).in_(list(renames)))
+        # El historial se escribe antes del UPDATE, con la unidad y el nombre nuevos de cada nota
+        record_grade_rows(db.session.connection(), 'updated', moved_filter, current_actor_id(),
+                          unit_number=new_unit, activity_name=new_name)
+        moved = db.session.execute(
+            update(grade_table).where(moved_filter).values(unit_number=new_unit, activity_name=new_name))
+        result.grades_moved = moved.rowcount
+        if result.grades_moved and any(old[0] != new[0] for old, new in renames.items()):
+            # Cambiar de unidad mueve puntos entre filas de GradeSummary
+            rebuild_summaries(db.session, subject_id=subject_id)
+
+    if to_insert or to_update or to_delete:
+        subject_changed(subject_id) # Las páginas de la asignatura y las notas renombradas cambian
+    db.session.commit()
+    clear_local_cache(subject_id)
+    result.inserted, result.updated, result.deleted = len(to_insert), len(to_update), len(to_delete)
+    return result
@@ -0,0 +1,231 @@
+# analytics.py
+
+# Estadísticas de notas por asignatura, nivel de grado y profesor para el Administrador.
+# - El puntaje de un estudiante en una asignatura es su promedio por unidad (zona + parcial),
+#   calculado en SQL desde GradeSummary: una fila por inscripción en lugar de todas sus notas.
+# - El rendimiento por actividad (promedio / punteo máximo) se agrega en SQL sobre Grade con GROUP BY.
+# - Por asignatura se guardan en memoria los puntajes ordenados (array de dobles) y sus actividades,
+#   junto con las versiones de sus notas y de su configuración (versions.py). Una asignatura
+#   solo se recalcula cuando cambia alguna de esas versiones.
+# - Media, mediana, percentiles y tasa de aprobación de un nivel, un profesor o el colegio se
+#   obtienen uniendo los puntajes ya ordenados de sus asignaturas: son exactos, no aproximados.
+# La caché es del proceso: con varios workers cada uno calcula una vez las asignaturas que lee.
+
+import bisect
+from array import array
+from itertools import chain
+from math import fsum, sqrt
+from operator import mul
+from flask import current_app
+from sqlalchemy import select, func
+from extensions import db
+from models import (User, Subject, Grade, GradeLevel, GradeSummary, SubjectActivityConfig, subject_grade_level_association,
+                    PARCIAL_MAX_SCORE)
+from cache import TTLCache, get_versions
+from versions import subject_grades_key, subject_key
+
+PERCENTILES = (10, 25, 50, 75, 90)
+HISTOGRAM_BINS = 10 # Rangos de 10 puntos: 0-10, 10-20, ..., 90-100
+HARDEST_ACTIVITIES = 10
+SUBJECT_CHUNK_SIZE = 500
+
+
+def init_app(app):
+    app.extensions['analytics_cache'] = TTLCache(maxsize=app.config['ANALYTICS_CACHE_SIZE'],
+                                                 ttl=app.config['ANALYTICS_CACHE_TTL'])
+
+
+def _cache():
+    return current_app.extensions['analytics_cache']
+
+
+class SubjectStats:
+    """Puntajes ordenados de los estudiantes de una asignatura y rendimiento de cada actividad."""
+
+    def __init__(self, subject_id, scores, activities):
+        self.subject_id = subject_id
+        self.scores = scores # array('d') ordenado de menor a mayor
+        self.activities = activities # dicts: unit_number, component_type, activity_name, count, average, max_score, performance
+
+
+# --- Distribuciones ---
+def percentile(sorted_scores, p):
+    """Percentil `p` (0-100) con interpolación lineal entre las dos posiciones vecinas."""
+    if not sorted_scores:
+        return None
+    position = (len(sorted_scores) - 1) * p / 100
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_scores) - 1)
+    return sorted_scores[lower] + (sorted_scores[upper] - sorted_scores[lower]) * (position - lower)
+
+
+def describe(sorted_scores, passing_score):
+    """Resumen de una distribución ya ordenada: media, desviación, percentiles, aprobación e histograma."""
+    count = len(sorted_scores)
+    if not count:
+        return {'count': 0, 'mean': None, 'stdev': None, 'min': None, 'max': None,
+                'percentiles': {p: None for p in PERCENTILES}, 'pass_rate': None,
+                'histogram': [0] * HISTOGRAM_BINS}
+    # Con los puntajes ordenados, cada conteo es una búsqueda binaria en lugar de un recorrido
+    width = 100 / HISTOGRAM_BINS
+    edges = [bisect.bisect_left(sorted_scores, width * index) for index in range(1, HISTOGRAM_BINS)]
+    histogram = [upper - lower for lower, upper in zip([0] + edges, edges + [count])]
+    failed = bisect.bisect_left(sorted_scores, passing_score) # Puntajes por debajo de la nota de aprobación
+    mean = fsum(sorted_scores) / count
+    return {
+        'count': count,
+        'mean': mean,
+        # E[x²] - media², con las sumas en C (statistics.pstdev usa fracciones exactas y es mucho más lento).
+        # Los puntajes están acotados (zona + parcial de una unidad): la cancelación numérica es despreciable.
+        'stdev': sqrt(max(fsum(map(mul, sorted_scores, sorted_scores)) / count - mean * mean, 0.0)),
+        'min': sorted_scores[0],
+        'max': sorted_scores[-1],
+        'percentiles': {p: percentile(sorted_scores, p) for p in PERCENTILES},
+        'pass_rate': 100 * (count - failed) / count,
+        'histogram': histogram,
+    }
+
+
+def merge_scores(stats_list):
+    """Une los puntajes ordenados de varias asignaturas (timsort aprovecha los tramos ya ordenados)."""
+    return array('d', sorted(chain.from_iterable(stats.scores for stats in stats_list)))
+
+
+# --- Cálculo en SQL ---
+def _load_scores(subject_ids):
+    """{asignatura: array ordenado de puntajes}: promedio por unidad de cada estudiante."""
+    score = (func.sum(GradeSummary.zona_total + GradeSummary.parcial_total) / func.count()).label('score')
+    rows = db.session.execute(
+        select(GradeSummary.subject_id, score).where(GradeSummary.subject_id.in_(subject_ids))
+        .group_by(GradeSummary.subject_id, GradeSummary.student_id))
+    scores = {subject_id: [] for subject_id in subject_ids}
+    for subject_id, value in rows:
+        scores[subject_id].append(value)
+    return {subject_id: array('d', sorted(values)) for subject_id, values in scores.items()}
+
+
+def _load_activities(subject_ids):
+    """{asignatura: [actividades]} con el promedio de cada actividad y su punteo máximo."""
+    max_scores = {
+        (row.subject_id, row.unit_number, row.activity_name): row.max_score
+        for row in db.session.execute(
+            select(SubjectActivityConfig.subject_id, SubjectActivityConfig.unit_number,
+                   SubjectActivityConfig.activity_name, SubjectActivityConfig.max_score)
+            .where(SubjectActivityConfig.subject_id.in_(subject_ids)))
+    }
+    rows = db.session.execute(
+        select(Grade.subject_id, Grade.unit_number, Grade.component_type, Grade.activity_name,
+               func.count().label('count'), func.avg(Grade.value).label('average'))
+        .where(Grade.subject_id.in_(subject_ids))
+        .group_by(Grade.subject_id, Grade.unit_number, Grade.component_type, Grade.activity_name))
+    activities = {subject_id: [] for subject_id in subject_ids}
+    for row in rows:
+        if row.component_type == 'Parcial':
+            max_score = PARCIAL_MAX_SCORE
+        else:
+            max_score = max_scores.get((row.subject_id, row.unit_number, row.activity_name))
+        activities[row.subject_id].append({
+            'unit_number': row.unit_number,
+            'component_type': row.component_type,
+            'activity_name': row.activity_name,
+            'count': row.count,
+            'average': row.average,
+            'max_score': max_score,
+            # Porcentaje del punteo que se obtiene en promedio; cuanto más bajo, más difícil
+            'performance': 100 * row.average / max_score if max_score else None,
+        })
+    for items in activities.values():
+        items.sort(key=lambda item: (item['unit_number'], item['component_type'] != 'Zona', item['activity_name']))
+    return activities
+
+
+def subject_stats(subject_ids):
+    """{asignatura: SubjectStats}. Las vigentes salen de la caché tras consultar sus versiones
+    (una consulta IN por bloque); las que cambiaron se recalculan juntas, dos consultas por bloque."""
+    subject_ids = list(subject_ids)
+    keys = {subject_id: (subject_grades_key(subject_id), subject_key(subject_id)) for subject_id in subject_ids}
+    versions = get_versions(chain.from_iterable(keys.values()))
+    cache = _cache()
+    result, stale = {}, {}
+    for subject_id in subject_ids:
+        version = tuple(versions.get(key, (0, None))[0] for key in keys[subject_id])
+        cached = cache.get(subject_id)
+        if cached is not None and cached[0] == version:
+            result[subject_id] = cached[1]
+        else:
+            stale[subject_id] = version
+
+    stale_ids = list(stale)
+    for start in range(0, len(stale_ids), SUBJECT_CHUNK_SIZE):
+        chunk = stale_ids[start:start + SUBJECT_CHUNK_SIZE]
+        scores = _load_scores(chunk)
+        activities = _load_activities(chunk)
+        for subject_id in chunk:
+            stats = SubjectStats(subject_id, scores[subject_id], activities[subject_id])
+            # Se guarda con la versión leída antes de calcular: si hubo una escritura entretanto,
+            # la próxima lectura verá una versión mayor y volverá a calcular
+            cache.set(subject_id, (stale[subject_id], stats))
+            result[subject_id] = stats
+    return result
+
+
+def clear_local_cache():
+    _cache().clear()
+
+
+# --- Vistas agregadas ---
+def school_overview():
+    """Estadísticas del colegio, por nivel de grado, por profesor y por asignatura, más las
+    actividades con menor rendimiento."""
+    passing_score = current_app.config['ANALYTICS_PASSING_SCORE']
+    subjects = db.session.execute(
+        select(Subject.id, Subject.name, Subject.code, Subject.teacher_id, User.first_name, User.last_name)
+        .outerjoin(User, User.id == Subject.teacher_id).order_by(Subject.name, Subject.id)).all()
+    levels = db.session.execute(
+        select(GradeLevel.id, GradeLevel.name, subject_grade_level_association.c.subject_id)
+        .join(subject_grade_level_association, subject_grade_level_association.c.grade_level_id == GradeLevel.id)
+        .order_by(GradeLevel.name)).all()
+    stats = subject_stats(subject.id for subject in subjects)
+
+    subject_rows, activities = [], []
+    by_teacher = {}
+    for subject in subjects:
+        current = stats[subject.id]
+        subject_rows.append({'id': subject.id, 'name': subject.name, 'code': subject.code,
+                             'stats': describe(current.scores, passing_score)})
+        if subject.teacher_id is not None:
+            teacher = by_teacher.setdefault(subject.teacher_id, {
+                'name': f'{subject.first_name} {subject.last_name}', 'members': []})
+            teacher['members'].append(current)
+        for activity in current.activities:
+            if activity['performance'] is not None:
+                activities.append(dict(activity, subject_id=subject.id, subject_name=subject.name))
+
+    by_level = {}
+    for level in levels:
+        entry = by_level.setdefault(level.id, {'name': level.name, 'members': []})
+        entry['members'].append(stats[level.subject_id])
+
+    def grouped(groups):
+        return [{'name': group['name'], 'subjects': len(group['members']),
+                 'stats': describe(merge_scores(group['members']), passing_score)} for group in groups]
+
+    activities.sort(key=lambda activity: activity['performance'])
+    return {
+        'school': describe(merge_scores(stats.values()), passing_score),
+        'levels': grouped(by_level.values()),
+        'teachers': sorted(grouped(by_teacher.values()), key=lambda row: row['name']),
+        'subjects': subject_rows,
+        'hardest_activities': activities[:HARDEST_ACTIVITIES],
+        'passing_score': passing_score,
+    }
+
+
+def subject_report(subject_id):
+    """Distribución y rendimiento por actividad de una asignatura."""
+    stats = subject_stats([subject_id])[subject_id]
+    return {
+        'stats': describe(stats.scores, current_app.config['ANALYTICS_PASSING_SCORE']),
+        'activities': stats.activities,
+        'passing_score': current_app.config['ANALYTICS_PASSING_SCORE'],
+    }
@@ -0,0 +1,75 @@
+# announcements.py
+
+# Feed de anuncios por rol que muestran los tres dashboards.
+# La primera página de cada rol se comparte desde una caché por proceso; cada entrada guarda
+# la versión de 'announcements' con la que se construyó (ver cache.py).
+
+from types import SimpleNamespace
+from flask import request, current_app
+from sqlalchemy.orm import joinedload
+from models import Announcement
+from pagination import keyset_page, get_page_size, KeysetPage
+from cache import TTLCache, get_version, bump_version
+from versions import ANNOUNCEMENTS_KEY
+
+
+def init_app(app):
+    app.extensions['announcement_feed_cache'] = TTLCache(maxsize=8, ttl=app.config['ANNOUNCEMENT_CACHE_TTL'])
+
+
+def _feed_cache():
+    return current_app.extensions['announcement_feed_cache']
+
+
+def announcements_changed():
+    """Se llama antes del commit que crea o modifica un anuncio; los demás workers detectan
+    el cambio de versión en su próxima lectura."""
+    bump_version(ANNOUNCEMENTS_KEY)
+
+
+def clear_local_cache():
+    """Se llama después del commit: este proceso descarta sus copias de inmediato."""
+    _feed_cache().clear()
+
+
+def _announcement_snapshot(announcement):
+    """Copia de solo lectura del anuncio (y su autor) que puede vivir fuera de la sesión de SQLAlchemy."""
+    return SimpleNamespace(
+        id=announcement.id,
+        title=announcement.title,
+        content=announcement.content,
+        date_posted=announcement.date_posted,
+        target_role=announcement.target_role,
+        user=SimpleNamespace(
+            username=announcement.user.username,
+            first_name=announcement.user.first_name,
+            last_name=announcement.user.last_name,
+        ),
+    )
+
+def announcements_page(role):
+    """Página de anuncios visibles para `role` (los dirigidos a 'Todos' o a ese rol),
+    del más reciente al más antiguo, paginada por (date_posted, id).
+
+    La primera página sale de la caché del feed mientras la versión en la base de datos
+    no cambie; las páginas siguientes siempre se consultan."""
+    cursor = request.args.get('anuncios_desde')
+    feed_size = current_app.config['ANNOUNCEMENT_FEED_SIZE']
+    page_size = get_page_size(default=feed_size)
+    use_cache = cursor is None and page_size == feed_size
+
+    if use_cache:
+        version = get_version(ANNOUNCEMENTS_KEY)
+        cached = _feed_cache().get(role)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+
+    query = Announcement.query.options(joinedload(Announcement.user)).filter(
+        (Announcement.target_role == 'Todos') | (Announcement.target_role == role))
+    page = keyset_page(query, Announcement.date_posted, Announcement.id,
+                       cursor=cursor, page_size=page_size, descending=True)
+
+    if use_cache:
+        page = KeysetPage([_announcement_snapshot(a) for a in page.items], page.next_cursor)
+        _feed_cache().set(role, (version, page))
+    return page
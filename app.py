@@ -1,56 +1,109 @@
 # app.py
 
-from flask import Flask, render_template, redirect, url_for, flash, request
-from flask_sqlalchemy import SQLAlchemy
+import os
+from flask import Flask
 from config import Config # Asegúrate de que tienes un archivo config.py con tu configuración
-from flask_login import LoginManager, UserMixin, login_user, logout_user, current_user, login_required
-from werkzeug.security import generate_password_hash, check_password_hash
-from flask_wtf.csrf import CSRFProtect
-
-app = Flask(__name__)
-app.config.from_object(Config) # Carga la configuración desde config.py
-
-db = SQLAlchemy(app) # Inicializa la base de datos con tu aplicación Flask
-csrf = CSRFProtect(app) # Inicializa CSRFProtect con tu aplicación
-
-# --- Configuración de Flask-Login ---
-login_manager = LoginManager()
-login_manager.init_app(app) # Inicializa Flask-Login con tu aplicación
-login_manager.login_view = 'login'
-login_manager.login_message_category = 'info'
-
-# --- User Loader para Flask-Login ---
-# Esta función le dice a Flask-Login cómo cargar un usuario dado su ID
-@login_manager.user_loader
-def load_user(user_id):
-    # Importa el modelo User SOLO AQUÍ, si es absolutamente necesario para evitar circular imports en otros lugares
-    # O, mejor, asegúrate de que 'from models import User' ya esté hecho globalmente después de db = SQLAlchemy(app)
-    # Para la práctica común, ya se debería haber importado globalmente.
-    return User.query.get(int(user_id))
-
-# Importa tus modelos (asegúrate de que estén definidos en models.py)
-# Esta importación debe ir DESPUÉS de db = SQLAlchemy(app)
-from models import User, GradeLevel, Subject, Grade, Announcement, Enrollment, SubjectActivityConfig, GradeChangeRequest
-
-# Importa tus rutas (las crearemos en el siguiente paso o ya las tienes)
-# Esto debe ir DESPUÉS de que app, db y los modelos estén inicializados.
-import routes # Esto registrará las rutas definidas en routes.py
-
-# Contexto de shell para facilitar el trabajo con la base de datos
-@app.shell_context_processor
-def make_shell_context():
-    return {
-        'db': db,
-        'User': User,
-        'GradeLevel': GradeLevel,
-        'Subject': Subject,
-        'Grade': Grade, # Incluye todos tus modelos para fácil acceso en el shell
-        'Announcement': Announcement,
-        'Enrollment': Enrollment,
-        'SubjectActivityConfig': SubjectActivityConfig,
-        'GradeChangeRequest': GradeChangeRequest,
-        'generate_password_hash': generate_password_hash
-    }
+from extensions import db, login_manager
+
+
+def create_app(config_class=Config, web=True):
+    """Construye la aplicación.
+
+    Con web=False solo se inicializan la base de datos, los modelos y los comandos: los
+    scripts de mantenimiento (init_db.py, flask db ...) no importan vistas, formularios ni
+    WTForms-SQLAlchemy. `flask --app "app:create_app(web=False)" ...` usa ese modo desde la consola.
+    """
+    app = Flask(__name__)
+    app.config.from_object(config_class) # Carga la configuración desde config.py
+    app.logger.setLevel(app.config['LOG_LEVEL'])
+
+    db.init_app(app) # Inicializa la base de datos con tu aplicación Flask
+    if os.environ.get('FLASK_RUN_FROM_CLI'):
+        # Migraciones versionadas del esquema (flask db upgrade). Alembic solo hace falta en los
+        # comandos `flask ...` (Flask marca el proceso con FLASK_RUN_FROM_CLI): los workers web
+        # (wsgi.py) y los scripts como init_db.py se ahorran su importación, la más cara del arranque.
+        from flask_migrate import Migrate
+        Migrate(app, db, render_as_batch=True)
+
+    import db_engine # PRAGMA de SQLite al conectar según DB_PROFILE
+    with app.app_context():
+        db_engine.configure_engine(app, db.engine)
+    db_engine.log_engine_profile(app)
+
+    # Los modelos se registran en los metadatos de `db`; grade_summary escucha los flush de la sesión
+    import models
+    import grade_summary # Registra los eventos que mantienen GradeSummary al día
+    import ledger # Registra el evento que anota cada cambio de nota en el historial (GradeEvent)
+    import passwords # hash_password lo usan también los scripts (init_db.py)
+
+    from commands import register_commands # Comandos 'flask ...' de mantenimiento
+    register_commands(app)
+
+    if web:
+        _init_web(app)
+
+    # Contexto de shell para facilitar el trabajo con la base de datos
+    @app.shell_context_processor
+    def make_shell_context():
+        return {
+            'db': db,
+            'User': models.User,
+            'GradeLevel': models.GradeLevel,
+            'Subject': models.Subject,
+            'Grade': models.Grade, # Incluye todos tus modelos para fácil acceso en el shell
+            'Announcement': models.Announcement,
+            'Enrollment': models.Enrollment,
+            'SubjectActivityConfig': models.SubjectActivityConfig,
+            'GradeChangeRequest': models.GradeChangeRequest,
+            'GradeSummary': models.GradeSummary,
+            'Job': models.Job,
+            'hash_password': passwords.hash_password
+        }
+
+    return app
+
+
+def _init_web(app):
+    """Extensiones y blueprints que solo necesita el servidor web. Las vistas se importan aquí
+    (y no al importar app.py) para que los procesos de consola no carguen formularios ni plantillas."""
+    import identity
+    import passwords
+    import announcements
+    import analytics
+    import activity_config
+    import request_metrics
+    import conditional
+    import page_cache
+    import jobs
+    from flask_wtf.csrf import CSRFProtect
+
+    CSRFProtect(app) # Protección CSRF de los formularios (queda en app.extensions['csrf'])
+    login_manager.init_app(app) # Inicializa Flask-Login con tu aplicación
+    identity.init_app(app)
+    passwords.init_app(app)
+    announcements.init_app(app)
+    analytics.init_app(app) # Estadísticas por asignatura en memoria, invalidadas por versión
+    activity_config.init_app(app) # Actividades configuradas por asignatura, invalidadas por versión
+    request_metrics.init_app(app) # Server-Timing, log por petición, consultas lentas y /admin/metricas
+    conditional.init_app(app) # ETag de las páginas con sellos de versión
+    page_cache.init_app(app) # Páginas públicas anónimas y menú de base.html en memoria
+    jobs.init_app(app) # Hilos que ejecutan los trabajos en segundo plano encolados desde el panel
+
+    # --- User Loader para Flask-Login ---
+    # Devuelve una Identity liviana (ver identity.py) desde la caché o la sesión firmada;
+    # solo consulta la base de datos cuando la entrada no existe o venció.
+    @login_manager.user_loader
+    def load_user(user_id):
+        return identity.load_identity(int(user_id))
+
+    from routes_public import public_bp
+    from routes_admin import admin_bp
+    from routes_teacher import teacher_bp
+    from routes_student import student_bp
+    from routes_search import search_bp
+    for blueprint in (public_bp, admin_bp, teacher_bp, student_bp, search_bp):
+        app.register_blueprint(blueprint)
+
 
 if __name__ == '__main__':
-    app.run(debug=True)
\ No newline at end of file
+    create_app().run(debug=True)
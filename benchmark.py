@@ -0,0 +1,257 @@
+# benchmark.py
+
+# Recorre todas las rutas GET de la aplicación con el cliente de pruebas de Flask, con una sesión
+# por rol (anónimo, Administrador, Profesor, Estudiante), y guarda una línea base en JSON con
+# el tiempo de respuesta, la cantidad de sentencias SQL y el pico de memoria de cada ruta:
+#   flask --app "app:create_app(web=False)" generate-synthetic-data   # una vez, ver synthetic_data.py
+#   python benchmark.py --output benchmarks/baseline.json
+#   python benchmark.py --compare benchmarks/baseline.json            # marca regresiones (exit 1)
+# Usa la misma base que la aplicación (DATABASE_URL). Por defecto inicia sesión con el primer
+# usuario sintético de cada rol; --login Rol=usuario:contraseña usa otro (p. ej. los de init_db.py).
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from flask import url_for
+from sqlalchemy import event, select, func
+from app import create_app
+from config import Config
+from extensions import db
+from models import User, Subject, Grade, Enrollment, GradeChangeRequest, GradeSummary
+from synthetic_data import USERNAME_PREFIX, SYNTHETIC_PASSWORD
+
+ROLES_BY_BLUEPRINT = {
+    'public': None, # Anónimo
+    'admin': 'Administrador',
+    'teacher': 'Profesor',
+    'student': 'Estudiante',
+    'search': 'Profesor', # El caso más costoso: filtra por las inscripciones del profesor
+}
+SKIPPED_ENDPOINTS = {'static', 'public.logout'}
+QUERY_ARGS = {
+    'search.search_students_api': {'q': 'ga'},
+    'search.search_subjects_api': {'q': 'as'},
+}
+
+
+class BenchmarkConfig(Config):
+    WTF_CSRF_ENABLED = False
+    # El benchmark inicia sesión varias veces seguidas desde la misma "IP"
+    LOGIN_RATE_USER_CAPACITY = 1000
+    LOGIN_RATE_IP_CAPACITY = 1000
+    REQUEST_LOG = False # La línea JSON por petición solo ensuciaría la salida
+
+
+class StatementCounter:
+    """Cuenta las sentencias que llegan al cursor (before_cursor_execute)."""
+
+    def __init__(self, engine):
+        self.count = 0
+        event.listen(engine, 'before_cursor_execute', self._on_execute)
+
+    def _on_execute(self, *args):
+        self.count += 1
+
+
+def _default_login(role):
+    username = db.session.execute(
+        select(User.username).where(User.role == role, User.username.like(f'{USERNAME_PREFIX}%'))
+        .order_by(User.id).limit(1)).scalar()
+    return (username, SYNTHETIC_PASSWORD) if username else None
+
+
+def _url_values(role, user_id):
+    """Valores para los parámetros de las rutas según el rol: asignaturas y notas que ese
+    usuario realmente puede ver, eligiendo las de más datos para medir el peor caso habitual."""
+    values = {'formato': 'csv'}
+    if role == 'Administrador':
+        values['subject_id'] = db.session.execute(
+            select(Enrollment.subject_id).group_by(Enrollment.subject_id)
+            .order_by(func.count().desc()).limit(1)).scalar()
+    elif role == 'Profesor':
+        row = db.session.execute(
+            select(Enrollment.subject_id, Enrollment.student_id)
+            .join(Subject, Subject.id == Enrollment.subject_id).where(Subject.teacher_id == user_id)
+            .order_by(Enrollment.subject_id, Enrollment.student_id).limit(1)).first()
+        if row:
+            values['subject_id'], values['student_id'] = row.subject_id, row.student_id
+            values['grade_id'] = db.session.execute(
+                select(Grade.id).where(Grade.subject_id == row.subject_id, Grade.student_id == row.student_id)
+                .order_by(Grade.id).limit(1)).scalar()
+    elif role == 'Estudiante':
+        values['subject_id'] = db.session.execute(
+            select(Enrollment.subject_id).where(Enrollment.student_id == user_id)
+            .order_by(Enrollment.subject_id).limit(1)).scalar()
+    return {key: value for key, value in values.items() if value is not None}
+
+
+def _dataset_counts():
+    return {model.__tablename__: db.session.execute(select(func.count()).select_from(model)).scalar()
+            for model in (User, Subject, Enrollment, Grade, GradeSummary, GradeChangeRequest)}
+
+
+def _git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def measure_route(client, counter, url, repeat):
+    """Una petición en frío (cachés vacías), `repeat` en caliente para el tiempo y una más bajo
+    tracemalloc para el pico de memoria (tracemalloc enlentece, por eso va aparte)."""
+    counter.count = 0
+    start = time.perf_counter()
+    response = client.get(url)
+    cold_ms = (time.perf_counter() - start) * 1000
+    cold_sql = counter.count
+    body = response.get_data()
+
+    samples, warm_sql = [], 0
+    for _ in range(repeat):
+        counter.count = 0
+        start = time.perf_counter()
+        client.get(url).get_data()
+        samples.append((time.perf_counter() - start) * 1000)
+        warm_sql = counter.count
+
+    tracemalloc.start()
+    client.get(url).get_data()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return {
+        'status': response.status_code,
+        'bytes': len(body),
+        'cold_ms': round(cold_ms, 2),
+        'median_ms': round(statistics.median(samples), 2),
+        'min_ms': round(min(samples), 2),
+        'max_ms': round(max(samples), 2),
+        'sql_cold': cold_sql,
+        'sql_warm': warm_sql,
+        'peak_kib': round(peak / 1024, 1),
+    }
+
+
+def run(repeat, logins):
+    app = create_app(BenchmarkConfig)
+    results, login_ms = [], {}
+    # Las consultas auxiliares van en contextos propios y cortos: si las peticiones se hicieran
+    # dentro de un app context ya abierto, Flask lo reutilizaría y todas compartirían `g`
+    # (el usuario de Flask-Login) y la sesión de base de datos.
+    with app.app_context():
+        counter = StatementCounter(db.engine)
+        dataset = _dataset_counts()
+    rules = sorted((rule for rule in app.url_map.iter_rules()
+                    if 'GET' in rule.methods and rule.endpoint not in SKIPPED_ENDPOINTS),
+                   key=lambda rule: rule.rule)
+
+    for blueprint, role in ROLES_BY_BLUEPRINT.items():
+        client = app.test_client()
+        user_id = None
+        if role:
+            with app.app_context():
+                credentials = logins.get(role) or _default_login(role)
+            if credentials is None:
+                print(f'{role}: sin usuario para iniciar sesión, se omiten sus rutas.')
+                continue
+            start = time.perf_counter()
+            response = client.post('/login', data={'username': credentials[0], 'password': credentials[1]})
+            login_ms[role] = round((time.perf_counter() - start) * 1000, 2)
+            with app.app_context():
+                user_id = db.session.execute(select(User.id).where(User.username == credentials[0])).scalar()
+            if response.status_code != 302 or user_id is None or response.location.endswith('/login'):
+                print(f'{role}: no se pudo iniciar sesión como {credentials[0]} ({response.status_code}).')
+                continue
+        with app.app_context():
+            values = _url_values(role, user_id)
+
+        for rule in rules:
+            if rule.endpoint.split('.', 1)[0] != blueprint:
+                continue
+            missing = [arg for arg in rule.arguments if arg not in values and arg not in (rule.defaults or {})]
+            if missing:
+                print(f'{rule.endpoint} ({rule.rule}): sin valores para {", ".join(missing)}, se omite.')
+                continue
+            with app.test_request_context():
+                url = url_for(rule.endpoint, **{arg: values[arg] for arg in rule.arguments if arg in values},
+                              **QUERY_ARGS.get(rule.endpoint, {}))
+            entry = {'endpoint': rule.endpoint, 'role': role or 'Anónimo', 'url': url}
+            entry.update(measure_route(client, counter, url, repeat))
+            results.append(entry)
+            print(f"{entry['role']:>13} {entry['status']} {entry['median_ms']:>9.2f} ms "
+                  f"{entry['sql_warm']:>4} SQL {entry['peak_kib']:>9.1f} KiB  {url}")
+
+    return {
+        'generated_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'git_revision': _git_revision(),
+        'database': app.config['SQLALCHEMY_DATABASE_URI'].split('://', 1)[0],
+        'dataset': dataset,
+        'repeat': repeat,
+        'login_ms': login_ms,
+        'routes': results,
+    }
+
+
+def compare(current, baseline, threshold, min_delta_ms):
+    """Rutas más lentas que `threshold` veces la línea base (y al menos `min_delta_ms` más, para
+    no marcar el ruido de las rutas de un milisegundo), o que ejecutan más sentencias SQL."""
+    previous = {(entry['role'], entry['url']): entry for entry in baseline['routes']}
+    regressions = []
+    for entry in current['routes']:
+        old = previous.get((entry['role'], entry['url']))
+        if old is None:
+            continue
+        if (entry['median_ms'] > old['median_ms'] * threshold
+                and entry['median_ms'] - old['median_ms'] >= min_delta_ms):
+            regressions.append(f"{entry['role']} {entry['url']}: {old['median_ms']} -> {entry['median_ms']} ms")
+        if entry['sql_warm'] > old['sql_warm']:
+            regressions.append(f"{entry['role']} {entry['url']}: {old['sql_warm']} -> {entry['sql_warm']} sentencias SQL")
+    return regressions
+
+
+def _parse_logins(items):
+    logins = {}
+    for item in items:
+        role, _, credentials = item.partition('=')
+        username, _, password = credentials.partition(':')
+        if not (role and username and password):
+            raise SystemExit(f'--login espera Rol=usuario:contraseña, se recibió {item!r}')
+        logins[role] = (username, password)
+    return logins
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Tiempo, sentencias SQL y memoria de cada ruta por rol.')
+    parser.add_argument('--repeat', type=int, default=5, help='Peticiones en caliente por ruta.')
+    parser.add_argument('--output', help='Archivo JSON donde guardar los resultados.')
+    parser.add_argument('--compare', help='Línea base JSON contra la que comparar.')
+    parser.add_argument('--threshold', type=float, default=1.25, help='Factor de tiempo que cuenta como regresión.')
+    parser.add_argument('--min-delta-ms', type=float, default=5, help='Diferencia mínima en ms para contar como regresión.')
+    parser.add_argument('--login', action='append', default=[], metavar='ROL=USUARIO:CONTRASEÑA')
+    args = parser.parse_args()
+
+    current = run(args.repeat, _parse_logins(args.login))
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, 'w', encoding='utf-8') as output:
+            json.dump(current, output, indent=2, ensure_ascii=False)
+        print(f'Resultados guardados en {args.output}')
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as baseline_file:
+            regressions = compare(current, json.load(baseline_file), args.threshold, args.min_delta_ms)
+        for line in regressions:
+            print(f'REGRESIÓN {line}')
+        if regressions:
+            raise SystemExit(1)
+        print('Sin regresiones respecto de la línea base.')
+
+
+if __name__ == '__main__':
+    main()
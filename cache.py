@@ -0,0 +1,161 @@
+# cache.py
+
+# Cachés en memoria del proceso con tamaño acotado y tiempo de vida (TTL),
+# y sellos de versión en la base de datos para detectar datos obsoletos entre workers.
+# Dentro de una petición cada versión se lee una sola vez: conditional_page las trae todas con
+# get_versions y las cachés que consulta la vista después (p. ej. subject_activities) reutilizan
+# esos valores sin otra consulta. Los comandos y trabajos en segundo plano leen siempre de la base.
+
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from flask import g, has_request_context
+from sqlalchemy import select, update, insert, bindparam
+from sqlalchemy.exc import IntegrityError
+from extensions import db
+from models import CacheVersion
+
+
+class TTLCache:
+    """Caché LRU con tamaño máximo y expiración por entrada. Segura entre hilos."""
+
+    def __init__(self, maxsize=128, ttl=60):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return default
+            expires_at, value = item
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key, default=None):
+        with self._lock:
+            item = self._data.pop(key, None)
+            return default if item is None else item[1]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+# --- Sellos de versión ---
+def _request_versions():
+    """{clave: (versión, updated_at) o None si no existe} ya leídas en la petición en curso."""
+    if not has_request_context():
+        return None
+    if 'cache_versions' not in g:
+        g.cache_versions = {}
+    return g.cache_versions
+
+
+def _forget_versions(keys):
+    # La próxima lectura de la petición debe ver la versión incrementada
+    versions = _request_versions()
+    if versions is not None:
+        for key in keys:
+            versions.pop(key, None)
+
+
+def get_version(key):
+    """Versión actual de `key` (0 si nunca se ha incrementado). Es una lectura por clave primaria,
+    o ninguna si la petición ya la leyó."""
+    version = get_versions([key]).get(key)
+    return version[0] if version else 0
+
+
+def bump_version(key):
+    """Incrementa la versión de `key` dentro de la transacción actual (se confirma con el commit del llamador)."""
+    bump_versions([key])
+
+
+KEY_CHUNK_SIZE = 500
+
+
+def get_versions(keys):
+    """{clave: (versión, updated_at)} de las claves que existen, con una consulta IN por bloque
+    para las que la petición aún no ha leído."""
+    keys = list(keys)
+    known = _request_versions()
+    pending = keys if known is None else [key for key in dict.fromkeys(keys) if key not in known]
+    versions = {}
+    for start in range(0, len(pending), KEY_CHUNK_SIZE):
+        rows = db.session.execute(
+            select(CacheVersion.key, CacheVersion.version, CacheVersion.updated_at)
+            .where(CacheVersion.key.in_(pending[start:start + KEY_CHUNK_SIZE])))
+        versions.update((row.key, (row.version, row.updated_at)) for row in rows)
+    if known is None:
+        return versions
+    known.update((key, versions.get(key)) for key in pending)
+    return {key: known[key] for key in keys if known[key] is not None}
+
+
+def _upsert_statement(dialect_name):
+    """INSERT con versión 1 que, si la clave ya existe, le suma 1 en la misma sentencia (atómico
+    entre transacciones). None si el dialecto no tiene upsert."""
+    table = CacheVersion.__table__
+    if dialect_name in ('sqlite', 'postgresql'):
+        if dialect_name == 'sqlite':
+            from sqlalchemy.dialects.sqlite import insert as upsert
+        else:
+            from sqlalchemy.dialects.postgresql import insert as upsert
+        statement = upsert(table)
+        return statement.on_conflict_do_update(
+            index_elements=[table.c.key],
+            set_={'version': table.c.version + 1, 'updated_at': statement.excluded.updated_at})
+    if dialect_name in ('mysql', 'mariadb'):
+        from sqlalchemy.dialects.mysql import insert as upsert
+        statement = upsert(table)
+        return statement.on_duplicate_key_update(version=table.c.version + 1, updated_at=statement.inserted.updated_at)
+    return None
+
+
+def _bump_with_savepoints(connection, keys, now):
+    # Sin upsert: UPDATE y, si la clave no existe, INSERT en un SAVEPOINT. Si otra transacción
+    # la insertó entretanto, el INSERT falla sin abortar la transacción y se repite el UPDATE.
+    table = CacheVersion.__table__
+    increment = update(table).where(table.c.key == bindparam('k_key')).values(
+        version=table.c.version + 1, updated_at=now)
+    for key in keys:
+        if connection.execute(increment, {'k_key': key}).rowcount:
+            continue
+        try:
+            with connection.begin_nested():
+                connection.execute(insert(table).values(key=key, version=1, updated_at=now))
+        except IntegrityError:
+            connection.execute(increment, {'k_key': key})
+
+
+def bump_versions(keys, connection=None):
+    """Como bump_version para varias claves a la vez, con un upsert executemany (las claves nuevas
+    empiezan en 1). `connection` permite usarla dentro de un flush (grade_summary)."""
+    keys = sorted(set(keys)) # Siempre en el mismo orden: dos transacciones no se bloquean en cruz
+    if not keys:
+        return
+    connection = connection or db.session.connection()
+    now = datetime.utcnow()
+    statement = _upsert_statement(connection.dialect.name)
+    if statement is not None:
+        connection.execute(statement, [{'key': key, 'version': 1, 'updated_at': now} for key in keys])
+    else:
+        _bump_with_savepoints(connection, keys, now)
+    _forget_versions(keys)
@@ -0,0 +1,158 @@
+# commands.py
+
+# Comandos de línea de comandos (flask <comando>) para tareas de mantenimiento.
+# Los módulos de cada comando se importan dentro de él: create_app(web=False) registra todos los
+# comandos y no debe pagar la importación de los que no se ejecutan.
+
+import csv
+import time
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from extensions import db
+from grade_summary import check_and_rebuild
+from models import Subject, GradeLevel
+
+
+@click.command('check-grade-summary')
+@with_appcontext
+@click.option('--dry-run', is_flag=True, help='Solo reporta diferencias, sin reconstruir la tabla.')
+def check_grade_summary(dry_run):
+    """Reconstruye GradeSummary desde las notas y reporta cualquier diferencia encontrada."""
+    report, orphans = check_and_rebuild(db.session, fix=not dry_run)
+    for (student_id, subject_id, unit_number), expected, actual in report:
+        click.echo(f'Diferencia: estudiante={student_id} asignatura={subject_id} unidad={unit_number} '
+                   f'esperado={expected} actual={actual}')
+    if orphans:
+        click.echo(f'{orphans} resúmenes huérfanos (asignaturas inexistentes).')
+    if not report and not orphans:
+        click.echo('GradeSummary está consistente con las notas.')
+    elif dry_run:
+        click.echo(f'{len(report)} diferencias encontradas (sin cambios, --dry-run).')
+    else:
+        click.echo(f'{len(report)} diferencias corregidas.')
+
+
+@click.command('import-grades')
+@with_appcontext
+@click.argument('subject_code')
+@click.argument('csv_file', type=click.File('r', encoding='utf-8-sig'))
+@click.option('--batch-size', type=int, default=None, help='Notas insertadas por transacción (por defecto 1000).')
+def import_grades(subject_code, csv_file, batch_size):
+    """Importa notas desde CSV_FILE (username, unit_number, activity_name, value) para la asignatura SUBJECT_CODE."""
+    from grade_import import import_grades_csv, DEFAULT_BATCH_SIZE
+    subject = Subject.query.filter_by(code=subject_code).first()
+    if subject is None:
+        raise click.ClickException(f'No existe una asignatura con código {subject_code}.')
+    report = import_grades_csv(subject, csv_file, batch_size=batch_size or DEFAULT_BATCH_SIZE)
+    for line_number, message in report.errors:
+        click.echo(f'Línea {line_number}: {message}', err=True)
+    click.echo(f'{report.rows_read} filas leídas, {report.inserted} notas importadas en {report.batches} lotes, '
+               f'{len(report.errors)} errores.')
+
+
+@click.command('generate-synthetic-data')
+@with_appcontext
+@click.option('--students', default=10000, show_default=True)
+@click.option('--teachers', default=200, show_default=True)
+@click.option('--subjects', default=400, show_default=True)
+@click.option('--activities', default=6, show_default=True,
+              help='Actividades de zona por asignatura, repartidas entre las 4 unidades. Más de 6 no caben en el formulario de configuración.')
+@click.option('--subjects-per-student', default=8, show_default=True)
+@click.option('--change-requests', default=500, show_default=True)
+@click.option('--seed', default=1, show_default=True)
+@click.option('--batch-size', type=int, default=None, help='Filas por INSERT/commit (por defecto 20000).')
+def generate_synthetic_data(students, teachers, subjects, activities, subjects_per_student, change_requests, seed, batch_size):
+    """Agrega un colegio sintético a la base actual para pruebas de rendimiento (ver benchmark.py)."""
+    import synthetic_data
+    start = time.perf_counter()
+    report = synthetic_data.generate_school(
+        students=students, teachers=teachers, subjects=subjects, activities=activities,
+        subjects_per_student=subjects_per_student, change_requests=change_requests, seed=seed,
+        batch_size=batch_size or synthetic_data.DEFAULT_BATCH_SIZE, progress=lambda table, rows: click.echo(f'  {table}: {rows} filas'))
+    click.echo(f'Listo en {time.perf_counter() - start:.1f} s: ' +
+               ', '.join(f'{table}={rows}' for table, rows in report.counts.items()))
+    click.echo(f"Usuarios '{synthetic_data.USERNAME_PREFIX}*' con contraseña '{synthetic_data.SYNTHETIC_PASSWORD}'.")
+
+
+@click.command('provision-users')
+@with_appcontext
+@click.argument('roster', type=click.File('r', encoding='utf-8-sig'))
+@click.option('--credentials-out', type=click.Path(dir_okay=False, writable=True),
+              help='CSV donde escribir usuario,contraseña de las cuentas sin contraseña en el listado.')
+@click.option('--workers', type=int, default=None, help='Procesos para calcular los hashes (por defecto, uno por núcleo).')
+@click.option('--batch-size', type=int, default=None, help='Cuentas insertadas por transacción (por defecto 500).')
+@click.option('--dry-run', is_flag=True, help='Solo valida el listado contra la base, sin crear cuentas.')
+def provision_users_command(roster, credentials_out, workers, batch_size, dry_run):
+    """Crea las cuentas del listado ROSTER (CSV con username, email, first_name, last_name, role y opcionalmente password)."""
+    from user_provisioning import provision_users, DEFAULT_BATCH_SIZE
+    start = time.perf_counter()
+    report = provision_users(roster, batch_size=batch_size or DEFAULT_BATCH_SIZE, workers=workers, dry_run=dry_run)
+    for line_number, message in report.errors + report.conflicts:
+        click.echo(f'Línea {line_number}: {message}', err=True)
+    if report.generated_passwords:
+        if credentials_out:
+            with open(credentials_out, 'w', encoding='utf-8', newline='') as output:
+                writer = csv.writer(output)
+                writer.writerow(['username', 'password'])
+                writer.writerows(report.generated_passwords)
+            click.echo(f'{len(report.generated_passwords)} contraseñas generadas guardadas en {credentials_out}.')
+        else:
+            for username, password in report.generated_passwords:
+                click.echo(f'{username},{password}')
+    click.echo(f'{report.rows_read} filas leídas: {report.created} creadas, {len(report.skipped)} omitidas (ya existían), '
+               f'{len(report.conflicts)} conflictos, {len(report.errors)} errores'
+               f'{" (--dry-run, sin cambios)" if dry_run else ""} en {time.perf_counter() - start:.1f} s.')
+
+
+@click.command('generate-report-cards')
+@with_appcontext
+@click.argument('output', type=click.Path(dir_okay=False, writable=True))
+@click.option('--grade-level', help='Nombre del nivel de grado; sin esta opción, todo el colegio.')
+@click.option('--workers', type=int, default=None, help='Procesos para renderizar las boletas (por defecto, uno por núcleo).')
+@click.option('--batch-size', type=int, default=None, help='Estudiantes por lote de consultas (por defecto 200).')
+def generate_report_cards_command(output, grade_level, workers, batch_size):
+    """Genera en OUTPUT (.zip) una boleta HTML por estudiante de un nivel de grado o de todo el colegio."""
+    from report_cards import generate_report_cards, DEFAULT_BATCH_SIZE
+    level = None
+    if grade_level:
+        level = GradeLevel.query.filter_by(name=grade_level).first()
+        if level is None:
+            raise click.ClickException(f'No existe el nivel de grado "{grade_level}".')
+    report = generate_report_cards(output, grade_level=level, workers=workers,
+                                   batch_size=batch_size or DEFAULT_BATCH_SIZE)
+    click.echo(f'{report.cards} boletas ({report.subjects} asignaturas, {report.batches} lotes) '
+               f'guardadas en {report.path} en {report.elapsed:.1f} s.')
+
+
+@click.command('snapshot-grades')
+@with_appcontext
+@click.option('--min-events', type=int, default=None,
+              help='Eventos desde la última instantánea para tomar otra (por defecto GRADE_SNAPSHOT_MIN_EVENTS).')
+def snapshot_grades_command(min_events):
+    """Guarda instantáneas del historial de notas de las asignaturas con cambios (ejecutar periódicamente, p. ej. con cron)."""
+    from ledger import take_snapshots
+    start = time.perf_counter()
+    if min_events is None:
+        min_events = current_app.config['GRADE_SNAPSHOT_MIN_EVENTS']
+    taken = take_snapshots(max(1, min_events))
+    click.echo(f'{taken} instantáneas guardadas en {time.perf_counter() - start:.1f} s.')
+
+
+@click.command('run-jobs')
+@with_appcontext
+@click.option('--limit', type=int, default=None, help='Cantidad máxima de trabajos a ejecutar.')
+def run_jobs_command(limit):
+    """Ejecuta los trabajos en segundo plano pendientes (p. ej. los que quedaron en cola tras un reinicio)."""
+    import jobs # Registra los trabajos; solo este comando lo necesita
+    stale = jobs.fail_stale_jobs()
+    if stale:
+        click.echo(f'{stale} trabajos sin avances marcados como fallidos.')
+    executed = jobs.run_pending(limit)
+    click.echo(f'{executed} trabajos ejecutados.')
+
+
+def register_commands(app):
+    for command in (check_grade_summary, import_grades, generate_synthetic_data, provision_users_command,
+                    generate_report_cards_command, snapshot_grades_command, run_jobs_command):
+        app.cli.add_command(command)
@@ -0,0 +1,84 @@
+# conditional.py
+
+# GET condicional (ETag) para páginas que se recargan mucho sin cambiar.
+# El ETag se calcula con los sellos de versión de los datos que muestra la página (versions.py),
+# el usuario y la URL completa: una sola consulta a cache_version. Si el navegador ya tiene esa
+# versión (If-None-Match) se responde 304 sin ejecutar la vista, es decir, sin sus consultas ni
+# su plantilla. No se usa Last-Modified / If-Modified-Since: una fecha no distingue al usuario
+# (un navegador compartido recibiría 304 con la página del usuario anterior).
+
+import hashlib
+import os
+import time
+from functools import wraps
+from flask import request, session, current_app, make_response
+from flask_login import current_user
+from flask_wtf.csrf import generate_csrf
+from cache import get_versions
+
+
+def init_app(app):
+    # Los ETag cambian con cada versión desplegada del código o de las plantillas
+    app.extensions['etag_salt'] = app.config['ETAG_SALT'] or _release_fingerprint(app)
+
+
+def _release_fingerprint(app):
+    """Huella de los .py y plantillas de la aplicación (nombres y fechas de modificación).
+    Es la misma en todos los workers de un despliegue, a diferencia de la hora de arranque."""
+    entries = []
+    for folder in (app.root_path, os.path.join(app.root_path, app.template_folder)):
+        for directory, _, files in os.walk(folder):
+            if '__pycache__' in directory or 'migrations' in directory:
+                continue
+            for name in files:
+                if name.endswith(('.py', '.html')):
+                    path = os.path.join(directory, name)
+                    entries.append(f'{os.path.relpath(path, app.root_path)}:{os.stat(path).st_mtime_ns}')
+    return hashlib.sha1('\n'.join(sorted(entries)).encode('utf-8')).hexdigest()[:12]
+
+
+def _page_etag(keys, versions, with_forms):
+    parts = [
+        current_app.extensions['etag_salt'],
+        request.full_path,
+        f'{current_user.id}:{current_user.role}:{current_user.username}:{current_user.first_name}:{current_user.last_name}',
+        time.strftime('%Y'), # Las plantillas muestran el año actual en el pie
+        # Si una plantilla muestra los mensajes flash pendientes, la página cambia al consumirlos
+        repr(session.get('_flashes', [])),
+    ]
+    parts.extend(f'{key}={versions.get(key, (0, None))[0]}' for key in keys)
+    if with_forms:
+        # La página incluye tokens CSRF: el ETag cambia con el token de la sesión y antes de que expire
+        limit = current_app.config.get('WTF_CSRF_TIME_LIMIT') or 3600
+        generate_csrf() # Crea el token de la sesión si aún no existe, como lo haría la plantilla
+        parts.append(session.get('csrf_token', ''))
+        parts.append(str(int(time.time() // (limit / 2))))
+    return hashlib.sha1('|'.join(parts).encode('utf-8')).hexdigest()
+
+
+def conditional_page(version_keys, with_forms=False):
+    """Decorador para vistas GET de usuarios autenticados; va debajo de login_required y del
+    decorador de rol. `version_keys(**view_args)` devuelve las claves de versión que la página
+    muestra. Con `with_forms=True` el ETag respeta la vigencia de los tokens CSRF."""
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            if request.method != 'GET':
+                return f(*args, **kwargs)
+            keys = list(version_keys(**kwargs))
+            versions = get_versions(keys)
+            etag = _page_etag(keys, versions, with_forms)
+
+            if request.if_none_match.contains_weak(etag):
+                response = current_app.response_class(status=304)
+            else:
+                response = make_response(f(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+            response.set_etag(etag, weak=True)
+            # Solo el navegador del usuario puede guardar la página, y debe revalidarla siempre
+            response.headers['Cache-Control'] = 'private, no-cache'
+            response.vary.add('Cookie')
+            return response
+        return decorated_function
+    return decorator
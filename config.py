@@ -2,10 +2,118 @@
 
 import os
 
+# --- Perfiles del motor de base de datos ---
+# Se elige con DB_PROFILE; si no se indica, se deduce del esquema de DATABASE_URL.
+# 'sqlite': pool por defecto de SQLAlchemy, con los PRAGMA de SQLITE_PRAGMAS aplicados al conectar (db_engine.py).
+# 'server': pool de conexiones para MySQL/MariaDB u otro servidor.
+# 'postgres': igual que 'server', más parámetros de sesión de PostgreSQL.
+_SERVER_POOL = {
+    'pool_size': int(os.environ.get('DB_POOL_SIZE', 10)), # Conexiones abiertas permanentemente por proceso
+    'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW', 20)), # Conexiones extra en picos
+    'pool_timeout': 30, # Segundos esperando una conexión libre antes de fallar
+    'pool_pre_ping': True, # Descarta conexiones cortadas por el servidor antes de usarlas
+    'pool_recycle': 1800, # Renueva conexiones cada 30 minutos (timeouts de firewall / wait_timeout)
+}
+
+ENGINE_PROFILES = {
+    'sqlite': {
+        'connect_args': {'timeout': 30}, # Espera del driver ante un bloqueo (además de busy_timeout)
+    },
+    'server': dict(_SERVER_POOL),
+    'postgres': dict(_SERVER_POOL, connect_args={
+        'application_name': 'mi_plataforma_escolar',
+        'options': '-c statement_timeout=30000', # Ninguna consulta de una petición web debería tardar más de 30 s
+    }),
+}
+
+
+def default_engine_profile(database_uri):
+    if database_uri.startswith('sqlite'):
+        return 'sqlite'
+    if database_uri.startswith('postgres'):
+        return 'postgres'
+    return 'server'
+
+
 class Config:
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'una_clave_secreta_muy_dificil_de_adivinar_y_cambiar'
     # Configuración de la base de datos SQLite
     # Flask-SQLAlchemy necesita la URL de la base de datos
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or \
         'sqlite:///' + os.path.join(os.path.abspath(os.path.dirname(__file__)), 'site.db')
-    SQLALCHEMY_TRACK_MODIFICATIONS = False # Desactiva el seguimiento de modificaciones para ahorrar recursos
\ No newline at end of file
+    SQLALCHEMY_TRACK_MODIFICATIONS = False # Desactiva el seguimiento de modificaciones para ahorrar recursos
+
+    DB_PROFILE = os.environ.get('DB_PROFILE') or default_engine_profile(SQLALCHEMY_DATABASE_URI)
+    SQLALCHEMY_ENGINE_OPTIONS = ENGINE_PROFILES[DB_PROFILE]
+    # Solo con el perfil 'sqlite'. WAL deja leer mientras otro proceso escribe; con NORMAL el
+    # commit no espera un fsync por transacción (sigue siendo seguro ante caídas de la aplicación).
+    SQLITE_PRAGMAS = {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'busy_timeout': 5000, # Milisegundos esperando un bloqueo de escritura en lugar de fallar con "database is locked"
+        'mmap_size': 268435456, # 256 MB de la base mapeados en memoria para lecturas
+        'cache_size': -65536, # 64 MB de caché de páginas por conexión (negativo = KiB)
+    }
+    LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO')
+
+    # Caché de anuncios por rol (dashboards)
+    ANNOUNCEMENT_FEED_SIZE = 10 # Anuncios en la primera página de cada dashboard
+    ANNOUNCEMENT_CACHE_TTL = 300 # Segundos que una entrada puede vivir aunque no cambie la versión
+
+    # Páginas públicas para visitantes anónimos y fragmentos de base.html (page_cache.py)
+    PAGE_CACHE_SIZE = 64 # URLs públicas distintas que cada proceso mantiene en memoria
+    PAGE_CACHE_TTL = 60 # Segundos que otro worker puede tardar en ver un cambio de profesores
+    FRAGMENT_CACHE_SIZE = 1024 # Combinaciones (rol, usuario) del menú principal
+    FRAGMENT_CACHE_TTL = 3600
+
+    # Configuración de actividades por asignatura (activity_config.py)
+    ACTIVITY_CONFIG_CACHE_SIZE = 2000 # Asignaturas que cada proceso mantiene en memoria
+    ACTIVITY_CONFIG_CACHE_TTL = 3600 # Segundos; la versión de la asignatura invalida antes cualquier cambio
+
+    # Estadísticas de notas (analytics.py)
+    ANALYTICS_PASSING_SCORE = 60 # Promedio por unidad (zona + parcial) mínimo para aprobar
+    ANALYTICS_CACHE_SIZE = 5000 # Asignaturas que cada proceso mantiene calculadas
+    ANALYTICS_CACHE_TTL = 3600 # Segundos; las versiones de las notas invalidan antes cualquier cambio
+
+    # Trabajos en segundo plano (jobs.py)
+    JOB_WORKERS = 1 # Trabajos simultáneos por proceso web
+    # Archivos para descargar (boletas, con notas de estudiantes). Sin valor: <instance_path>/job_results,
+    # fuera del código fuente (ver jobs.results_dir)
+    JOB_RESULTS_DIR = os.environ.get('JOB_RESULTS_DIR')
+    JOB_PROGRESS_INTERVAL = 1 # Segundos mínimos entre dos escrituras de progreso de un trabajo
+    JOB_STALE_SECONDS = 900 # Un trabajo en curso sin avances por más tiempo se da por fallido
+
+    # Historial de notas (ledger.py)
+    GRADE_SNAPSHOT_MIN_EVENTS = 200 # Eventos desde la última instantánea de una asignatura para tomar otra
+    # Segundos antes de una instantánea desde los que grades_as_of vuelve a aplicar eventos: debe superar
+    # la transacción de escritura de notas más larga (en PostgreSQL/MySQL los ids no siguen el orden de commit)
+    GRADE_SNAPSHOT_REPLAY_MARGIN = 300
+
+    # Identidad del usuario en sesión (load_user)
+    IDENTITY_CACHE_SIZE = 1024 # Usuarios distintos que cada proceso mantiene en memoria
+    IDENTITY_CACHE_TTL = 120 # Segundos que otro worker puede tardar en ver un cambio de rol o contraseña
+    # Con True, id/rol/nombre viajan en la cookie de sesión firmada y las peticiones no consultan la base
+    IDENTITY_SESSION_CLAIMS = os.environ.get('IDENTITY_SESSION_CLAIMS', '').lower() in ('1', 'true', 'yes')
+    IDENTITY_CLAIMS_MAX_AGE = 300 # Segundos antes de revalidar los claims contra la base
+
+    # Contraseñas: política de hashing y protección del login
+    PASSWORD_HASH_METHOD = 'scrypt:32768:8:1' # Los hashes con otros parámetros se regeneran al iniciar sesión
+    PASSWORD_VERIFY_WORKERS = 2 # Verificaciones simultáneas por proceso (núcleos dedicados al hashing)
+    PASSWORD_VERIFY_QUEUE = 16 # Intentos que pueden esperar turno; más allá se responde 503
+    PASSWORD_VERIFY_WAIT = 2 # Segundos máximos esperando un lugar en la cola
+    LOGIN_RATE_USER_CAPACITY = 5 # Intentos seguidos por nombre de usuario desde una misma IP...
+    LOGIN_RATE_USER_REFILL_SECONDS = 30 # ...y uno más cada 30 segundos
+    LOGIN_RATE_IP_CAPACITY = 60
+    LOGIN_RATE_IP_REFILL_SECONDS = 1
+
+    # Métricas por petición (request_metrics.py)
+    # Cabecera Server-Timing con el tiempo en la base y el total de la petición. Apagada en producción:
+    # revela consultas y tiempos internos a cualquier visitante (/admin/metricas y el log ya los muestran)
+    SERVER_TIMING_HEADER = os.environ.get('SERVER_TIMING_HEADER', '0').lower() in ('1', 'true', 'yes')
+    REQUEST_LOG = os.environ.get('REQUEST_LOG', '1').lower() in ('1', 'true', 'yes') # Una línea JSON por petición ('app.requests')
+    SLOW_QUERY_MS = 100 # Sentencias más lentas se registran normalizadas en 'app.slow_sql'
+    METRICS_WINDOW_SECONDS = 3600 # Ventana de los percentiles de /admin/metricas...
+    METRICS_WINDOW_SLOTS = 12 # ...en tramos de 5 minutos que se descartan al vencer
+
+    # GET condicional (conditional.py): si no se indica, se deriva de los archivos desplegados
+    ETAG_SALT = os.environ.get('ETAG_SALT')
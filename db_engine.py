@@ -0,0 +1,34 @@
+# db_engine.py
+
+# Ajustes por conexión según el perfil del motor (DB_PROFILE en config.py)
+# y registro del perfil activo al arrancar.
+
+import sqlite3
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+
+
+def configure_engine(app, engine):
+    """Registra en `engine` los ajustes por conexión del perfil activo de `app`."""
+    if app.config['DB_PROFILE'] != 'sqlite':
+        return
+    pragmas = dict(app.config['SQLITE_PRAGMAS'])
+
+    @event.listens_for(engine, 'connect')
+    def _apply_sqlite_pragmas(dbapi_connection, connection_record):
+        # Se ejecuta una vez por conexión física, no por petición
+        if not isinstance(dbapi_connection, sqlite3.Connection):
+            return
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name}={value}')
+        cursor.close()
+
+
+def log_engine_profile(app):
+    url = make_url(app.config['SQLALCHEMY_DATABASE_URI']).render_as_string(hide_password=True)
+    options = {key: value for key, value in app.config['SQLALCHEMY_ENGINE_OPTIONS'].items() if key != 'connect_args'}
+    if app.config['DB_PROFILE'] == 'sqlite':
+        options.update(app.config['SQLITE_PRAGMAS'])
+    app.logger.info('Perfil de base de datos: %s (%s) %s', app.config['DB_PROFILE'], url,
+                    ', '.join(f'{key}={value}' for key, value in options.items()))
@@ -0,0 +1,49 @@
+# decorators.py
+
+# Decoradores de rol para las vistas. Leen current_user.role, que viene de la identidad
+# en caché (identity.py), así que no consultan la base de datos.
+
+from functools import wraps
+from flask import flash, redirect, url_for, jsonify
+from flask_login import current_user
+
+
+def admin_required(f):
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        if not current_user.is_authenticated or current_user.role != 'Administrador':
+            flash('Acceso no autorizado. Se requiere rol de Administrador.', 'danger')
+            return redirect(url_for('public.home'))
+        return f(*args, **kwargs)
+    return decorated_function
+
+def teacher_required(f):
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        if not current_user.is_authenticated or current_user.role != 'Profesor':
+            flash('Acceso no autorizado. Se requiere rol de Profesor.', 'danger')
+            return redirect(url_for('public.home'))
+        return f(*args, **kwargs)
+    return decorated_function
+
+def student_required(f):
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        if not current_user.is_authenticated or current_user.role != 'Estudiante':
+            flash('Acceso no autorizado. Se requiere rol de Estudiante.', 'danger')
+            return redirect(url_for('public.home'))
+        return f(*args, **kwargs)
+    return decorated_function
+
+def api_roles_required(*roles):
+    """Para endpoints JSON: responde 401/403 en JSON en lugar de redirigir a una página HTML."""
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            if not current_user.is_authenticated:
+                return jsonify(error='Se requiere iniciar sesión.'), 401
+            if current_user.role not in roles:
+                return jsonify(error='Acceso no autorizado.'), 403
+            return f(*args, **kwargs)
+        return decorated_function
+    return decorator
@@ -0,0 +1,17 @@
+# extensions.py
+
+# Instancias de las extensiones de Flask, sin aplicación asociada.
+# create_app() (app.py) las inicializa con init_app(); los módulos de modelos y servicios
+# importan `db` desde aquí, así que pueden usarse sin construir la aplicación web completa.
+# Flask-Migrate se inicializa aparte en create_app(), solo en procesos de consola, y
+# CSRFProtect en app._init_web(), para que la consola no importe Flask-WTF.
+
+from flask_sqlalchemy import SQLAlchemy
+from flask_login import LoginManager
+
+db = SQLAlchemy()
+
+# --- Configuración de Flask-Login ---
+login_manager = LoginManager()
+login_manager.login_view = 'public.login'
+login_manager.login_message_category = 'info'
@@ -1,15 +1,88 @@
 # forms.py
 
 from flask_wtf import FlaskForm
-from wtforms import StringField, PasswordField, SubmitField, SelectField, FloatField, IntegerField, FieldList, FormField, TextAreaField, BooleanField, HiddenField
-from wtforms.validators import DataRequired, Email, EqualTo, ValidationError, Length, NumberRange, Optional
+from flask import url_for
+from markupsafe import Markup, escape
+from wtforms import Field, StringField, PasswordField, SubmitField, SelectField, FloatField, IntegerField, FieldList, FormField, TextAreaField, BooleanField, HiddenField
+from wtforms.validators import DataRequired, Email, EqualTo, ValidationError, StopValidation, Length, NumberRange, Optional
 from models import User, Subject, GradeLevel, Enrollment, SubjectActivityConfig, Grade # Importa los nuevos modelos
 from wtforms_sqlalchemy.fields import QuerySelectMultipleField, QuerySelectField
+from flask_wtf.file import FileField, FileRequired, FileAllowed
+from extensions import db
+from search import student_label, subject_label, SEARCH_MIN_CHARS
 
 # Función para obtener solo los profesores
 def get_teachers():
     return User.query.filter_by(role='Profesor').all()
 
+# --- Campo con búsqueda (typeahead) que solo envía el ID ---
+class TypeaheadWidget:
+    """Input oculto con el ID más un cuadro de búsqueda que consulta `field.search_endpoint`
+    (static/typeahead.js). La página no incluye ninguna lista de opciones."""
+
+    def __call__(self, field, **kwargs):
+        search_url = url_for(field.search_endpoint, **field.search_args)
+        label = field.get_label(field.data) if field.data is not None else ''
+        return Markup(
+            f'<input type="hidden" id="{field.id}" name="{field.name}" value="{escape(field._value())}">'
+            f'<input type="search" id="{field.id}-buscar" value="{escape(label)}" autocomplete="off" '
+            f'list="{field.id}-opciones" data-typeahead-for="{field.id}" data-typeahead-url="{escape(search_url)}" '
+            f'data-typeahead-min="{SEARCH_MIN_CHARS}" placeholder="Escriba al menos {SEARCH_MIN_CHARS} letras...">'
+            f'<datalist id="{field.id}-opciones"></datalist>')
+
+
+class ModelIdField(Field):
+    """Reemplaza a QuerySelectField para tablas grandes: recibe un ID y al validar carga solo
+    esa fila (db.session.get). `data` es el objeto, igual que con QuerySelectField.
+    `allowed(obj)` decide si el objeto es una elección válida (p. ej. que sea un estudiante)."""
+    widget = TypeaheadWidget()
+
+    def __init__(self, label=None, validators=None, model=None, allowed=None, get_label=str,
+                 search_endpoint=None, search_args=None, **kwargs):
+        super().__init__(label, validators, **kwargs)
+        self.model = model
+        self.allowed = allowed
+        self.get_label = get_label
+        self.search_endpoint = search_endpoint
+        self.search_args = search_args or {} # Se pueden ajustar en la vista, p. ej. {'asignatura': subject.id}
+        self._data = None
+        self._formdata = None
+        self._invalid = False
+
+    def _get_data(self):
+        if self._formdata is not None:
+            obj = db.session.get(self.model, self._formdata)
+            if obj is None or (self.allowed is not None and not self.allowed(obj)):
+                obj, self._invalid = None, True
+            self._set_data(obj)
+        return self._data
+
+    def _set_data(self, data):
+        self._data = data
+        self._formdata = None
+
+    data = property(_get_data, _set_data)
+
+    def _value(self):
+        return str(self.data.id) if self.data is not None else ''
+
+    def process_formdata(self, valuelist):
+        if valuelist and valuelist[0]:
+            try:
+                self._formdata = int(valuelist[0])
+            except ValueError:
+                self._invalid = True
+
+    def pre_validate(self, form):
+        if self.data is None and self._invalid:
+            # StopValidation: DataRequired no debe reemplazar este mensaje por "campo requerido"
+            raise StopValidation('Selección no válida.')
+
+
+def is_student(user):
+    return user.role == 'Estudiante'
+
+
 class SubjectForm(FlaskForm): 
     name = StringField('Nombre de la Asignatura', validators=[DataRequired(), Length(min=2, max=100)])
     code = StringField('Código de la Asignatura', validators=[DataRequired(), Length(min=2, max=20)])
@@ -69,11 +142,13 @@ class RegistrationForm(FlaskForm):
 
 # --- Nuevo Formulario: GradeForm ---
 class GradeForm(FlaskForm):
-    student = QuerySelectField(
+    # Solo el ID del estudiante; la búsqueda la resuelve /api/estudiantes/buscar
+    student = ModelIdField(
         'Estudiante',
-        query_factory=lambda: User.query.filter_by(role='Estudiante').order_by(User.first_name).all(),
-        get_pk=lambda a: a.id,
-        get_label=lambda a: f'{a.first_name} {a.last_name}',
+        model=User,
+        allowed=is_student,
+        get_label=student_label,
+        search_endpoint='search.search_students_api',
         validators=[DataRequired()]
     )
     
@@ -121,18 +196,19 @@ class AnnouncementForm(FlaskForm):
 
 # --- NUEVO: Formulario para Inscripciones (si el admin las gestiona directamente) ---
 class EnrollmentForm(FlaskForm):
-    student = QuerySelectField(
+    student = ModelIdField(
         'Estudiante',
-        query_factory=lambda: User.query.filter_by(role='Estudiante').order_by(User.first_name).all(),
-        get_pk=lambda a: a.id,
-        get_label=lambda a: f'{a.first_name} {a.last_name}',
+        model=User,
+        allowed=is_student,
+        get_label=student_label,
+        search_endpoint='search.search_students_api',
         validators=[DataRequired()]
     )
-    subject = QuerySelectField(
+    subject = ModelIdField(
         'Asignatura',
-        query_factory=lambda: Subject.query.order_by(Subject.name).all(),
-        get_pk=lambda a: a.id,
-        get_label=lambda a: a.name,
+        model=Subject,
+        get_label=subject_label,
+        search_endpoint='search.search_subjects_api',
         validators=[DataRequired()]
     )
     submit = SubmitField('Inscribir Estudiante')
@@ -163,8 +239,8 @@ class GradeChangeRequestForm(FlaskForm):
     
     submit = SubmitField('Enviar Solicitud')
 
-    def validate(self):
-        initial_validation = super().validate()
+    def validate(self, extra_validators=None):
+        initial_validation = super().validate(extra_validators=extra_validators)
         if not initial_validation:
             return False
 
@@ -197,7 +273,7 @@ class SubjectActivityConfigItemForm(FlaskForm):
     max_score = FloatField('Punteo Máximo', validators=[DataRequired(), NumberRange(min=0.1, max=60.0, message="El punteo debe ser entre 0.1 y 60.")])
     
     # Campo oculto para manejar el ID si se edita una actividad existente
-    id = IntegerField('ID de Actividad (oculto)', render_kw={'type': 'hidden'})
+    id = IntegerField('ID de Actividad (oculto)', validators=[Optional()], render_kw={'type': 'hidden'})
 
     def validate_max_score(self, field):
         # Esta validación se hará a nivel de formulario principal para la suma total
@@ -214,8 +290,8 @@ class SubjectActivitiesConfigForm(FlaskForm):
     )
     submit = SubmitField('Guardar Configuración de Actividades')
 
-    def validate(self):
-        if not super().validate():
+    def validate(self, extra_validators=None):
+        if not super().validate(extra_validators=extra_validators):
             return False
         
         total_zone_score = 0
@@ -229,3 +305,11 @@ class SubjectActivitiesConfigForm(FlaskForm):
             return False
         
         return True
+
+# --- NUEVO: Formulario para Importación Masiva de Notas (CSV) ---
+class GradeImportForm(FlaskForm):
+    csv_file = FileField('Archivo CSV', validators=[
+        FileRequired(message='Debe seleccionar un archivo.'),
+        FileAllowed(['csv'], message='Solo se permiten archivos .csv')
+    ])
+    submit = SubmitField('Importar Notas')
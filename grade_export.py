@@ -0,0 +1,212 @@
+# grade_export.py
+
+# Exportación del libro de notas (CSV y XLSX) como flujo de datos.
+# Las filas se leen con un cursor del lado del servidor (yield_per) y se escriben por bloques,
+# así la memoria usada es constante y el primer byte sale antes de terminar la consulta.
+
+import csv
+import io
+import re
+import zipfile
+from xml.sax.saxutils import escape
+from sqlalchemy import select
+from extensions import db
+from models import Grade, User, Subject, SubjectActivityConfig, subject_grade_level_association
+
+FETCH_SIZE = 1000 # Filas por viaje a la base de datos
+ROWS_PER_CHUNK = 500 # Filas por bloque enviado al cliente
+XLSX_MAX_ROWS = 1048576 # Límite de filas por hoja de Excel (incluye el encabezado)
+
+HEADER = ['Usuario', 'Nombre', 'Apellido', 'Código Asignatura', 'Asignatura', 'Unidad',
+          'Componente', 'Actividad', 'Nota', 'Punteo Máximo', 'Fecha Registro']
+
+
+def grade_rows(subject_id=None, grade_level_id=None):
+    """Genera tuplas con las columnas de HEADER, filtradas por asignatura, nivel o de todo el colegio."""
+    # Subconsulta escalar en lugar de JOIN para que una configuración duplicada no repita filas
+    max_score = (
+        select(SubjectActivityConfig.max_score)
+        .where(SubjectActivityConfig.subject_id == Grade.subject_id,
+               SubjectActivityConfig.unit_number == Grade.unit_number,
+               SubjectActivityConfig.activity_name == Grade.activity_name)
+        .limit(1)
+        .scalar_subquery()
+    )
+    stmt = (
+        select(User.username, User.first_name, User.last_name, Subject.code, Subject.name,
+               Grade.unit_number, Grade.component_type, Grade.activity_name, Grade.value,
+               max_score, Grade.date_recorded)
+        .join(User, User.id == Grade.student_id)
+        .join(Subject, Subject.id == Grade.subject_id)
+    )
+    if subject_id is not None:
+        stmt = stmt.where(Grade.subject_id == subject_id)
+    if grade_level_id is not None:
+        stmt = stmt.where(Grade.subject_id.in_(
+            select(subject_grade_level_association.c.subject_id)
+            .where(subject_grade_level_association.c.grade_level_id == grade_level_id)))
+    stmt = stmt.order_by(Grade.subject_id, Grade.student_id, Grade.unit_number, Grade.activity_name)
+
+    result = db.session.execute(stmt.execution_options(yield_per=FETCH_SIZE))
+    for row in result:
+        yield tuple(row)
+
+
+def _format_cell(value):
+    if hasattr(value, 'strftime'):
+        return value.strftime('%Y-%m-%d %H:%M')
+    return value
+
+
+def stream_csv(rows):
+    """Convierte las filas en bloques de texto CSV (UTF-8 con BOM para que Excel respete los acentos)."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(HEADER)
+    yield '\ufeff' + buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate()
+
+    count = 0
+    for row in rows:
+        writer.writerow([_format_cell(value) for value in row])
+        count += 1
+        if count % ROWS_PER_CHUNK == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+# --- XLSX ---
+# Un .xlsx es un ZIP de documentos XML. zipfile puede escribir sobre un flujo no posicionable
+# (usa descriptores de datos), así que cada hoja se comprime y se envía mientras se genera.
+
+_INVALID_XML_CHARS = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+
+class _ChunkSink(io.RawIOBase):
+    """Destino de escritura para zipfile que acumula bytes hasta que el generador los envía."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def _column_letter(index):
+    letters = ''
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(65 + remainder) + letters
+    return letters
+
+
+def _xlsx_row(row_number, values):
+    cells = []
+    for index, value in enumerate(values):
+        ref = f'{_column_letter(index)}{row_number}'
+        value = _format_cell(value)
+        if value is None:
+            continue
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            cells.append(f'<c r="{ref}"><v>{value}</v></c>')
+        else:
+            text = escape(_INVALID_XML_CHARS.sub('', str(value)))
+            cells.append(f'<c r="{ref}" t="inlineStr"><is><t>{text}</t></is></c>')
+    return f'<row r="{row_number}">{"".join(cells)}</row>'
+
+
+_SHEET_START = ('<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>')
+_SHEET_END = '</sheetData></worksheet>'
+
+
+def _workbook_parts(sheet_count):
+    sheets = ''.join(f'<sheet name="Notas{"" if i == 1 else f" {i}"}" sheetId="{i}" r:id="rId{i}"/>'
+                     for i in range(1, sheet_count + 1))
+    sheet_rels = ''.join(
+        f'<Relationship Id="rId{i}" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+        f'Target="worksheets/sheet{i}.xml"/>' for i in range(1, sheet_count + 1))
+    sheet_types = ''.join(
+        f'<Override PartName="/xl/worksheets/sheet{i}.xml" '
+        f'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        for i in range(1, sheet_count + 1))
+    return {
+        '[Content_Types].xml': (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+            '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+            '<Default Extension="xml" ContentType="application/xml"/>'
+            '<Override PartName="/xl/workbook.xml" '
+            'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+            f'{sheet_types}</Types>'),
+        '_rels/.rels': (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+            'Target="xl/workbook.xml"/></Relationships>'),
+        'xl/workbook.xml': (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+            'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+            f'<sheets>{sheets}</sheets></workbook>'),
+        'xl/_rels/workbook.xml.rels': (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            f'{sheet_rels}</Relationships>'),
+    }
+
+
+def stream_xlsx(rows):
+    """Genera los bytes de un .xlsx. Si se supera el límite de filas de Excel se abre otra hoja."""
+    sink = _ChunkSink()
+    archive = zipfile.ZipFile(sink, mode='w', compression=zipfile.ZIP_DEFLATED)
+    sheet_count = 0
+    sheet = None
+    row_number = 0
+    pending = []
+
+    def open_sheet():
+        nonlocal sheet, sheet_count, row_number
+        sheet_count += 1
+        sheet = archive.open(f'xl/worksheets/sheet{sheet_count}.xml', mode='w', force_zip64=True)
+        sheet.write(_SHEET_START.encode('utf-8'))
+        row_number = 1
+        sheet.write(_xlsx_row(row_number, HEADER).encode('utf-8'))
+
+    open_sheet()
+    for row in rows:
+        if row_number >= XLSX_MAX_ROWS:
+            sheet.write((''.join(pending) + _SHEET_END).encode('utf-8'))
+            pending = []
+            sheet.close()
+            open_sheet()
+        row_number += 1
+        pending.append(_xlsx_row(row_number, row))
+        if len(pending) >= ROWS_PER_CHUNK:
+            sheet.write(''.join(pending).encode('utf-8'))
+            pending = []
+            data = sink.drain()
+            if data:
+                yield data
+    sheet.write((''.join(pending) + _SHEET_END).encode('utf-8'))
+    sheet.close()
+
+    # Las partes que dependen del número de hojas se escriben al final
+    for name, content in _workbook_parts(sheet_count).items():
+        archive.writestr(name, content)
+    archive.close()
+    yield sink.drain()
@@ -0,0 +1,162 @@
+# grade_import.py
+
+# Importación masiva de notas desde CSV para una asignatura.
+# El archivo se lee fila por fila (sin cargarlo completo en memoria), se valida contra mapas
+# en memoria de la configuración de actividades y de las inscripciones de la asignatura,
+# y las notas válidas se insertan por lotes, un commit por lote.
+
+import csv
+from sqlalchemy import insert, select
+from extensions import db
+from models import Grade, User, Enrollment, PARCIAL_MAX_SCORE
+from grade_summary import new_deltas, add_grade_delta, apply_deltas
+from ledger import grade_event, record_events, current_actor_id
+from activity_config import subject_activities
+
+DEFAULT_BATCH_SIZE = 1000
+COMPONENT_TYPES = ('Zona', 'Parcial')
+
+# Nombres de columna aceptados en el encabezado del CSV
+COLUMN_ALIASES = {
+    'username': ('username', 'usuario', 'estudiante'),
+    'unit_number': ('unit_number', 'unidad'),
+    'activity_name': ('activity_name', 'actividad'),
+    'value': ('value', 'nota', 'valor'),
+    'component_type': ('component_type', 'componente'),
+}
+REQUIRED_COLUMNS = ('username', 'unit_number', 'activity_name', 'value')
+
+
+class ImportReport:
+    """Resultado de una importación: filas leídas, notas insertadas y errores por fila."""
+
+    def __init__(self):
+        self.rows_read = 0
+        self.inserted = 0
+        self.batches = 0
+        self.errors = [] # Lista de (número de línea, mensaje)
+
+    def add_error(self, line_number, message):
+        self.errors.append((line_number, message))
+
+    @property
+    def ok(self):
+        return not self.errors
+
+
+def _resolve_columns(fieldnames):
+    """Asocia cada columna lógica con el nombre real usado en el encabezado del archivo."""
+    normalized = {name.strip().lower(): name for name in (fieldnames or []) if name}
+    columns = {}
+    for column, aliases in COLUMN_ALIASES.items():
+        for alias in aliases:
+            if alias in normalized:
+                columns[column] = normalized[alias]
+                break
+    missing = [column for column in REQUIRED_COLUMNS if column not in columns]
+    return columns, missing
+
+
+def _insert_batch(rows):
+    """Inserta un lote de notas y actualiza GradeSummary y el historial en la misma transacción."""
+    # RETURNING en el mismo executemany: los IDs de las notas nuevas para sus eventos de alta
+    grade_ids = db.session.execute(insert(Grade).returning(Grade.id, sort_by_parameter_order=True), rows).scalars().all()
+    deltas = new_deltas()
+    for row in rows:
+        add_grade_delta(deltas, row['student_id'], row['subject_id'], row['unit_number'],
+                        row['component_type'], row['value'], 1)
+    apply_deltas(db.session.connection(), deltas)
+    record_events(db.session.connection(), [
+        grade_event('created', grade_id, row['student_id'], row['subject_id'], row['unit_number'],
+                    row['component_type'], row['activity_name'], row['value'])
+        for grade_id, row in zip(grade_ids, rows)], current_actor_id())
+    db.session.commit()
+
+
+def import_grades_csv(subject, text_stream, batch_size=DEFAULT_BATCH_SIZE):
+    """Importa notas para `subject` desde un flujo de texto CSV.
+
+    Columnas requeridas: username, unit_number, activity_name, value (también se aceptan
+    usuario, unidad, actividad, nota). La columna opcional component_type ('Zona' o 'Parcial')
+    vale 'Zona' por defecto. Las notas Zona deben corresponder a una actividad configurada
+    y no superar su punteo máximo; los parciales no pueden superar PARCIAL_MAX_SCORE.
+    Una nota que ya existe no se sobrescribe: los cambios siguen pasando por GradeChangeRequest.
+    """
+    report = ImportReport()
+    reader = csv.DictReader(text_stream)
+    columns, missing = _resolve_columns(reader.fieldnames)
+    if missing:
+        report.add_error(1, f'Faltan columnas en el encabezado: {", ".join(missing)}.')
+        return report
+
+    # Mapas en memoria: tres consultas en total, independientes del tamaño del archivo
+    # (los punteos máximos salen de la caché de configuración de la asignatura)
+    max_scores = subject_activities(subject.id).max_scores
+    enrolled = dict(db.session.execute(
+        select(User.username, User.id).join(Enrollment, Enrollment.student_id == User.id)
+        .where(Enrollment.subject_id == subject.id)).all())
+    existing = set(db.session.execute(
+        select(Grade.student_id, Grade.unit_number, Grade.activity_name, Grade.component_type)
+        .where(Grade.subject_id == subject.id)).all())
+
+    batch = []
+    for line_number, row in enumerate(reader, start=2):
+        report.rows_read += 1
+        username = (row.get(columns['username']) or '').strip()
+        unit_number = (row.get(columns['unit_number']) or '').strip()
+        activity_name = (row.get(columns['activity_name']) or '').strip()
+        raw_value = (row.get(columns['value']) or '').strip()
+        component_type = 'Zona'
+        if 'component_type' in columns:
+            component_type = (row.get(columns['component_type']) or '').strip() or 'Zona'
+
+        student_id = enrolled.get(username)
+        if student_id is None:
+            report.add_error(line_number, f'El estudiante "{username}" no está inscrito en la asignatura.')
+            continue
+        if component_type not in COMPONENT_TYPES:
+            report.add_error(line_number, f'Tipo de componente no válido: "{component_type}".')
+            continue
+        try:
+            value = float(raw_value.replace(',', '.'))
+        except ValueError:
+            report.add_error(line_number, f'La nota "{raw_value}" no es un número.')
+            continue
+
+        if component_type == 'Zona':
+            max_score = max_scores.get((unit_number, activity_name))
+            if max_score is None:
+                report.add_error(line_number, f'La actividad "{activity_name}" ({unit_number}) no está configurada.')
+                continue
+        else:
+            max_score = PARCIAL_MAX_SCORE
+        if value < 0 or value > max_score:
+            report.add_error(line_number, f'La nota {value} está fuera del rango permitido (0 - {max_score}).')
+            continue
+
+        key = (student_id, unit_number, activity_name, component_type)
+        if key in existing:
+            report.add_error(line_number, f'Ya existe una nota de "{username}" para {activity_name} ({unit_number}); use una solicitud de cambio.')
+            continue
+        existing.add(key)
+
+        batch.append({
+            'student_id': student_id,
+            'subject_id': subject.id,
+            'value': value,
+            'description': activity_name,
+            'activity_name': activity_name,
+            'unit_number': unit_number,
+            'component_type': component_type,
+        })
+        if len(batch) >= batch_size:
+            _insert_batch(batch)
+            report.inserted += len(batch)
+            report.batches += 1
+            batch = []
+
+    if batch:
+        _insert_batch(batch)
+        report.inserted += len(batch)
+        report.batches += 1
+    return report
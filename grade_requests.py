@@ -0,0 +1,159 @@
+# grade_requests.py
+
+# Procesamiento por lotes de solicitudes de cambio de nota.
+# Todas las ediciones y eliminaciones de un lote se aplican con sentencias UPDATE/DELETE
+# sobre conjuntos de filas y se confirman en una única transacción. Las solicitudes se reclaman
+# primero (UPDATE ... WHERE status='pending'): dos aprobaciones simultáneas de la misma solicitud
+# no pueden aplicar el cambio dos veces.
+
+from datetime import datetime
+from sqlalchemy import select, update, delete, bindparam
+from extensions import db
+from models import Grade, GradeChangeRequest
+from grade_summary import new_deltas, add_grade_delta, apply_deltas
+from ledger import grade_event, record_events
+from versions import grade_requests_changed
+
+ACTIONS = ('approve', 'reject')
+
+
+class RequestOutcome:
+    """Resultado de una solicitud dentro del lote."""
+
+    def __init__(self, request_id, status, message):
+        self.request_id = request_id
+        self.status = status # 'approved', 'rejected' o 'skipped'
+        self.message = message
+
+
+def process_grade_requests(request_ids, action, admin_id):
+    """Aprueba o rechaza un conjunto de solicitudes. Devuelve una lista de RequestOutcome en el orden recibido."""
+    if action not in ACTIONS:
+        raise ValueError(f'Acción no válida: {action}')
+
+    request_ids = list(dict.fromkeys(request_ids)) # Sin duplicados, conservando el orden
+    grade_table = Grade.__table__
+    request_table = GradeChangeRequest.__table__
+
+    # Una sola consulta trae las solicitudes y si su nota existe; se bloquean las filas donde el motor lo soporta
+    rows = db.session.execute(
+        select(request_table.c.id, request_table.c.status, request_table.c.request_type,
+               request_table.c.new_value, request_table.c.grade_id, request_table.c.request_date,
+               grade_table.c.student_id)
+        .outerjoin(grade_table, grade_table.c.id == request_table.c.grade_id)
+        .where(request_table.c.id.in_(request_ids))
+        .with_for_update(of=request_table)
+    ).all()
+    rows_by_id = {row.id: row for row in rows}
+
+    outcomes = {}
+    candidates = []
+    for request_id in request_ids:
+        row = rows_by_id.get(request_id)
+        if row is None:
+            continue
+        if row.status != 'pending':
+            outcomes[row.id] = RequestOutcome(row.id, 'skipped', f'Ya había sido procesada ({row.status}).')
+        elif action == 'approve' and row.student_id is None:
+            outcomes[row.id] = RequestOutcome(row.id, 'skipped', 'La nota ya no existe; la solicitud sigue pendiente.')
+        elif action == 'approve' and row.request_type not in ('edit', 'delete'):
+            outcomes[row.id] = RequestOutcome(row.id, 'skipped', f'Tipo de solicitud desconocido: {row.request_type}.')
+        else:
+            candidates.append(row.id)
+
+    # La lectura anterior no bloquea en SQLite (pysqlite la ejecuta fuera de la transacción): otra
+    # aprobación simultánea puede haber visto las mismas solicitudes pendientes. Solo se procesan
+    # las que este lote logra reclamar con el UPDATE condicionado a status='pending'.
+    status = 'approved' if action == 'approve' else 'rejected'
+    claimed = _claim_requests(candidates, status, admin_id, datetime.utcnow())
+    for request_id in candidates:
+        if request_id not in claimed:
+            outcomes[request_id] = RequestOutcome(request_id, 'skipped', 'Otra operación la procesó al mismo tiempo.')
+    if action == 'reject':
+        for request_id in claimed:
+            outcomes[request_id] = RequestOutcome(request_id, 'rejected', 'Solicitud rechazada.')
+
+    grade_values = {} # Valor vigente de cada nota a medida que se aplican las ediciones del lote
+    deleted_grades = set()
+    deltas = new_deltas()
+    events = [] # Historial (ledger.py): un evento por edición o eliminación aprobada, en orden
+    if action == 'approve' and claimed:
+        # Las notas se vuelven a leer dentro de la transacción que ya tiene las solicitudes reclamadas
+        grades = {row.id: row for row in db.session.execute(
+            select(grade_table.c.id, grade_table.c.student_id, grade_table.c.subject_id, grade_table.c.unit_number,
+                   grade_table.c.component_type, grade_table.c.activity_name, grade_table.c.value)
+            .where(grade_table.c.id.in_({rows_by_id[request_id].grade_id for request_id in claimed}))
+            .with_for_update())}
+        released = []
+
+        # Las solicitudes se aplican en el orden en que fueron hechas
+        ordered = sorted((rows_by_id[request_id] for request_id in claimed),
+                         key=lambda row: (row.request_date, row.id))
+        for row in ordered:
+            grade = grades.get(row.grade_id)
+            if grade is None or row.grade_id in deleted_grades:
+                released.append(row.id)
+                outcomes[row.id] = RequestOutcome(row.id, 'skipped', 'La nota ya no existe; la solicitud sigue pendiente.')
+                continue
+            current_value = grade_values.get(row.grade_id, grade.value)
+            add_grade_delta(deltas, grade.student_id, grade.subject_id, grade.unit_number, grade.component_type,
+                            current_value, -1)
+            if row.request_type == 'edit':
+                add_grade_delta(deltas, grade.student_id, grade.subject_id, grade.unit_number, grade.component_type,
+                                row.new_value, 1)
+                grade_values[row.grade_id] = row.new_value
+                events.append(grade_event('updated', row.grade_id, grade.student_id, grade.subject_id, grade.unit_number,
+                                          grade.component_type, grade.activity_name, row.new_value,
+                                          old_value=current_value))
+                message = f'Nota actualizada de {current_value} a {row.new_value}.'
+            else:
+                grade_values.pop(row.grade_id, None)
+                deleted_grades.add(row.grade_id)
+                events.append(grade_event('deleted', row.grade_id, grade.student_id, grade.subject_id, grade.unit_number,
+                                          grade.component_type, grade.activity_name, current_value))
+                message = 'Nota eliminada.'
+            outcomes[row.id] = RequestOutcome(row.id, 'approved', message)
+        if released:
+            # La nota desapareció antes de reclamarlas: vuelven a quedar pendientes
+            db.session.execute(
+                update(request_table).where(request_table.c.id.in_(released))
+                .values(status='pending', approved_by_user_id=None, approval_date=None))
+            claimed -= set(released)
+
+    if grade_values:
+        db.session.execute(
+            update(grade_table).where(grade_table.c.id == bindparam('g_id')).values(value=bindparam('g_value')),
+            [{'g_id': grade_id, 'g_value': value} for grade_id, value in grade_values.items()]
+        )
+    if deleted_grades:
+        # Las solicitudes conservan su historial aunque la nota desaparezca
+        db.session.execute(
+            update(request_table).where(request_table.c.grade_id.in_(deleted_grades)).values(grade_id=None))
+        db.session.execute(delete(grade_table).where(grade_table.c.id.in_(deleted_grades)))
+
+    if deltas:
+        apply_deltas(db.session.connection(), deltas)
+    record_events(db.session.connection(), events, admin_id)
+    if claimed:
+        grade_requests_changed() # Sentencias de Core: el evento after_flush de versions.py no las ve
+    db.session.commit()
+    # Los objetos ORM que ya estuvieran en la sesión no reflejan las sentencias masivas
+    db.session.expire_all()
+
+    return [outcomes.get(request_id) or RequestOutcome(request_id, 'skipped', 'La solicitud no existe.')
+            for request_id in request_ids]
+
+
+def _claim_requests(request_ids, status, admin_id, now):
+    """Pasa a `status` las solicitudes que siguen pendientes y devuelve el conjunto de IDs que cambió.
+    Con RETURNING es una sola sentencia; sin él (MySQL) se reclama una por una según rowcount."""
+    if not request_ids:
+        return set()
+    request_table = GradeChangeRequest.__table__
+    claim = (update(request_table).where(request_table.c.status == 'pending')
+             .values(status=status, approved_by_user_id=admin_id, approval_date=now))
+    if db.session.get_bind().dialect.update_returning:
+        return set(db.session.execute(
+            claim.where(request_table.c.id.in_(request_ids)).returning(request_table.c.id)).scalars())
+    return {request_id for request_id in request_ids
+            if db.session.execute(claim.where(request_table.c.id == request_id)).rowcount == 1}
@@ -0,0 +1,223 @@
+# grade_summary.py
+
+# Mantenimiento incremental de la tabla GradeSummary.
+# Cada flush del ORM que inserta, modifica o elimina un Grade se traduce en deltas por
+# (estudiante, asignatura, unidad) que se aplican con UPDATE ... SET total = total + delta
+# dentro de la misma transacción. Las rutas que escriben notas con sentencias masivas
+# (sin pasar por el ORM) deben llamar a apply_deltas() o rebuild_summaries() explícitamente.
+
+from collections import defaultdict
+from datetime import datetime
+from sqlalchemy import event, inspect, select, update, insert, delete, func, case, tuple_, bindparam
+from extensions import db
+from models import Grade, GradeSummary, Subject
+from versions import grades_changed
+
+# Columna de GradeSummary que acumula cada tipo de componente
+COMPONENT_COLUMNS = {'Zona': 'zona_total', 'Parcial': 'parcial_total'}
+TRACKED_ATTRS = ('student_id', 'subject_id', 'unit_number', 'component_type', 'value')
+TOLERANCE = 1e-6
+KEY_CHUNK_SIZE = 500
+
+
+def new_deltas():
+    return defaultdict(lambda: {'zona_total': 0.0, 'parcial_total': 0.0, 'grade_count': 0})
+
+
+def add_grade_delta(deltas, student_id, subject_id, unit_number, component_type, value, sign=1):
+    """Acumula en `deltas` el efecto de sumar (sign=1) o quitar (sign=-1) una nota."""
+    key = (student_id, subject_id, unit_number)
+    column = COMPONENT_COLUMNS.get(component_type)
+    if column:
+        deltas[key][column] += sign * (value or 0.0)
+    deltas[key]['grade_count'] += sign
+
+
+def apply_deltas(connection, deltas):
+    """Aplica los deltas acumulados con UPDATE atómicos (x = x + delta); inserta las filas que aún no existen.
+
+    Las claves existentes se averiguan con una consulta por bloque y las escrituras se envían
+    como executemany, de modo que un lote grande de notas cuesta pocas sentencias.
+    """
+    table = GradeSummary.__table__
+    now = datetime.utcnow()
+    pending = {
+        key: delta for key, delta in deltas.items()
+        if delta['grade_count'] or abs(delta['zona_total']) >= TOLERANCE or abs(delta['parcial_total']) >= TOLERANCE
+    }
+    if not pending:
+        return
+    # Todas las escrituras de notas pasan por aquí: se sellan las versiones de las páginas afectadas
+    grades_changed({(student_id, subject_id) for student_id, subject_id, _ in pending}, connection)
+
+    keys = list(pending)
+    existing = set()
+    for start in range(0, len(keys), KEY_CHUNK_SIZE):
+        chunk = keys[start:start + KEY_CHUNK_SIZE]
+        existing.update(tuple(row) for row in connection.execute(
+            select(table.c.student_id, table.c.subject_id, table.c.unit_number)
+            .where(tuple_(table.c.student_id, table.c.subject_id, table.c.unit_number).in_(chunk))
+        ))
+
+    key_filter = (
+        (table.c.student_id == bindparam('k_student_id'))
+        & (table.c.subject_id == bindparam('k_subject_id'))
+        & (table.c.unit_number == bindparam('k_unit_number'))
+    )
+    updates, inserts, shrunk = [], [], []
+    for (student_id, subject_id, unit_number), delta in pending.items():
+        if (student_id, subject_id, unit_number) in existing:
+            params = {'k_student_id': student_id, 'k_subject_id': subject_id, 'k_unit_number': unit_number}
+            updates.append(dict(params, d_zona=delta['zona_total'], d_parcial=delta['parcial_total'],
+                                d_count=delta['grade_count']))
+            if delta['grade_count'] < 0:
+                shrunk.append(params)
+        else:
+            inserts.append({'student_id': student_id, 'subject_id': subject_id, 'unit_number': unit_number,
+                            'zona_total': delta['zona_total'], 'parcial_total': delta['parcial_total'],
+                            'grade_count': delta['grade_count'], 'updated_at': now})
+
+    if updates:
+        connection.execute(
+            update(table).where(key_filter).values(
+                zona_total=table.c.zona_total + bindparam('d_zona'),
+                parcial_total=table.c.parcial_total + bindparam('d_parcial'),
+                grade_count=table.c.grade_count + bindparam('d_count'),
+                updated_at=now,
+            ),
+            updates,
+        )
+    if inserts:
+        connection.execute(insert(table), inserts)
+    if shrunk:
+        # Sin notas restantes en esa unidad: la fila ya no aporta nada
+        connection.execute(delete(table).where(key_filter & (table.c.grade_count <= 0)), shrunk)
+
+
+def previous_value(state, attr):
+    """Valor del atributo antes de los cambios pendientes de este flush."""
+    history = state.attrs[attr].history
+    if history.deleted:
+        return history.deleted[0]
+    if history.unchanged:
+        return history.unchanged[0]
+    return getattr(state.obj(), attr)
+
+
+@event.listens_for(db.session, 'after_flush')
+def _track_grade_changes(session, flush_context):
+    # En after_flush las colecciones new/dirty/deleted y el historial de atributos
+    # todavía reflejan el estado previo al flush.
+    deltas = new_deltas()
+
+    for obj in session.new:
+        if isinstance(obj, Grade):
+            add_grade_delta(deltas, obj.student_id, obj.subject_id, obj.unit_number, obj.component_type, obj.value, 1)
+
+    for obj in session.deleted:
+        if isinstance(obj, Grade):
+            state = inspect(obj)
+            old = [previous_value(state, attr) for attr in TRACKED_ATTRS]
+            add_grade_delta(deltas, *old, sign=-1)
+
+    for obj in session.dirty:
+        if isinstance(obj, Grade) and obj not in session.deleted:
+            state = inspect(obj)
+            if not any(state.attrs[attr].history.has_changes() for attr in TRACKED_ATTRS):
+                continue
+            old = [previous_value(state, attr) for attr in TRACKED_ATTRS]
+            new = [getattr(obj, attr) for attr in TRACKED_ATTRS]
+            add_grade_delta(deltas, *old, sign=-1)
+            add_grade_delta(deltas, *new, sign=1)
+
+    if deltas:
+        apply_deltas(session.connection(), deltas)
+
+
+def _expected_rows_query(subject_id=None, student_ids=None):
+    """Totales calculados directamente desde Grade, agrupados por (estudiante, asignatura, unidad)."""
+    query = select(
+        Grade.student_id, Grade.subject_id, Grade.unit_number,
+        func.coalesce(func.sum(case((Grade.component_type == 'Zona', Grade.value), else_=0.0)), 0.0).label('zona_total'),
+        func.coalesce(func.sum(case((Grade.component_type == 'Parcial', Grade.value), else_=0.0)), 0.0).label('parcial_total'),
+        func.count(Grade.id).label('grade_count'),
+    ).group_by(Grade.student_id, Grade.subject_id, Grade.unit_number)
+    if subject_id is not None:
+        query = query.where(Grade.subject_id == subject_id)
+    if student_ids is not None:
+        query = query.where(Grade.student_id.in_(student_ids))
+    return query
+
+
+def rebuild_summaries(session, subject_id=None, student_ids=None):
+    """Recalcula (con DELETE + INSERT ... SELECT) los resúmenes de una asignatura,
+    de un conjunto de estudiantes, o de toda la base si no se indica nada."""
+    table = GradeSummary.__table__
+    delete_stmt = delete(table)
+    if subject_id is not None:
+        delete_stmt = delete_stmt.where(table.c.subject_id == subject_id)
+    if student_ids is not None:
+        delete_stmt = delete_stmt.where(table.c.student_id.in_(student_ids))
+    session.execute(delete_stmt)
+
+    expected = _expected_rows_query(subject_id, student_ids).subquery()
+    session.execute(
+        insert(table).from_select(
+            ['student_id', 'subject_id', 'unit_number', 'zona_total', 'parcial_total', 'grade_count', 'updated_at'],
+            select(expected.c.student_id, expected.c.subject_id, expected.c.unit_number,
+                   expected.c.zona_total, expected.c.parcial_total, expected.c.grade_count,
+                   func.current_timestamp())
+        )
+    )
+
+
+def find_drift(session, subject_id):
+    """Compara GradeSummary con los totales reales de una asignatura.
+
+    Devuelve una lista de (clave, esperado, actual); esperado/actual son tuplas
+    (zona_total, parcial_total, grade_count) o None si la fila no existe.
+    """
+    expected = {
+        (row.student_id, row.subject_id, row.unit_number): (row.zona_total, row.parcial_total, row.grade_count)
+        for row in session.execute(_expected_rows_query(subject_id=subject_id))
+    }
+    actual = {
+        (row.student_id, row.subject_id, row.unit_number): (row.zona_total, row.parcial_total, row.grade_count)
+        for row in session.execute(
+            select(GradeSummary.student_id, GradeSummary.subject_id, GradeSummary.unit_number,
+                   GradeSummary.zona_total, GradeSummary.parcial_total, GradeSummary.grade_count)
+            .where(GradeSummary.subject_id == subject_id)
+        )
+    }
+
+    drift = []
+    for key in expected.keys() | actual.keys():
+        exp, act = expected.get(key), actual.get(key)
+        if exp is None or act is None:
+            drift.append((key, exp, act))
+        elif (abs(exp[0] - act[0]) > TOLERANCE or abs(exp[1] - act[1]) > TOLERANCE or exp[2] != act[2]):
+            drift.append((key, exp, act))
+    return drift
+
+
+def check_and_rebuild(session, fix=True, progress=None):
+    """Revisa asignatura por asignatura (memoria acotada) y reconstruye las que tienen diferencias.
+    `progress(revisadas, total)` se llama después de cada asignatura (trabajos en segundo plano)."""
+    report = []
+    subject_ids = session.execute(select(Subject.id).order_by(Subject.id)).scalars().all()
+    for done, subject_id in enumerate(subject_ids, start=1):
+        drift = find_drift(session, subject_id)
+        if drift:
+            report.extend(drift)
+            if fix:
+                rebuild_summaries(session, subject_id=subject_id)
+        if progress is not None:
+            progress(done, len(subject_ids))
+    # Resúmenes huérfanos de asignaturas que ya no existen
+    orphan_filter = GradeSummary.subject_id.notin_(select(Subject.id))
+    orphans = session.execute(select(func.count(GradeSummary.id)).where(orphan_filter)).scalar()
+    if orphans and fix:
+        session.execute(delete(GradeSummary).where(orphan_filter))
+    if fix:
+        session.commit()
+    return report, orphans
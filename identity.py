@@ -0,0 +1,150 @@
+# identity.py
+
+# Identidad del usuario autenticado para Flask-Login sin consultar la base en cada petición.
+# load_user devuelve un objeto Identity liviano (id, usuario, rol, nombre) guardado en una
+# caché por proceso con tamaño y TTL acotados. Con IDENTITY_SESSION_CLAIMS activado, esos
+# datos viajan además en la sesión firmada de Flask y las verificaciones de rol no tocan la
+# base hasta que vence IDENTITY_CLAIMS_MAX_AGE.
+
+import hashlib
+import time
+from flask import session, current_app
+from flask_login import UserMixin
+from sqlalchemy import event, inspect, select
+from extensions import db
+from models import User
+from cache import TTLCache
+
+CLAIMS_SESSION_KEY = '_identity'
+IDENTITY_FIELDS = ('id', 'username', 'role', 'first_name', 'last_name', 'stamp')
+
+
+def init_app(app):
+    app.extensions['identity_cache'] = TTLCache(maxsize=app.config['IDENTITY_CACHE_SIZE'], ttl=app.config['IDENTITY_CACHE_TTL'])
+
+
+def _cache():
+    return current_app.extensions['identity_cache']
+
+
+class Identity(UserMixin):
+    """Datos mínimos del usuario en sesión. Para trabajar con el modelo completo use get_user()."""
+
+    def __init__(self, id, username, role, first_name, last_name, stamp):
+        self.id = id
+        self.username = username
+        self.role = role
+        self.first_name = first_name
+        self.last_name = last_name
+        self.stamp = stamp # Huella de (contraseña, rol): cambia cuando cualquiera de los dos cambia
+
+    @property
+    def display_name(self):
+        return f'{self.first_name} {self.last_name}'
+
+    def get_user(self):
+        return db.session.get(User, self.id)
+
+    def to_claims(self):
+        return {field: getattr(self, field) for field in IDENTITY_FIELDS}
+
+
+def identity_stamp(password_hash, role):
+    """Huella corta que no expone el hash de la contraseña en la cookie de sesión."""
+    return hashlib.sha256(f'{password_hash}|{role}'.encode('utf-8')).hexdigest()[:16]
+
+
+def identity_from_user(user):
+    return Identity(user.id, user.username, user.role, user.first_name, user.last_name,
+                    identity_stamp(user.password, user.role))
+
+
+def _fetch_identity(user_id):
+    row = db.session.execute(
+        select(User.id, User.username, User.role, User.first_name, User.last_name, User.password)
+        .where(User.id == user_id)
+    ).first()
+    if row is None:
+        return None
+    return Identity(row.id, row.username, row.role, row.first_name, row.last_name,
+                    identity_stamp(row.password, row.role))
+
+
+def _store_claims(identity):
+    session[CLAIMS_SESSION_KEY] = dict(identity.to_claims(),
+                                       exp=time.time() + current_app.config['IDENTITY_CLAIMS_MAX_AGE'])
+
+
+def load_identity(user_id):
+    """Cargador para Flask-Login: sesión firmada (si está activada), luego caché, luego base de datos."""
+    use_claims = current_app.config['IDENTITY_SESSION_CLAIMS']
+    claims = session.get(CLAIMS_SESSION_KEY) if use_claims else None
+    if claims and claims.get('id') == user_id and claims.get('exp', 0) > time.time():
+        return Identity(*(claims[field] for field in IDENTITY_FIELDS))
+
+    identity = _cache().get(user_id)
+    if identity is None:
+        identity = _fetch_identity(user_id)
+        if identity is None:
+            return None
+        _cache().set(user_id, identity)
+
+    if use_claims:
+        if claims and claims.get('id') == user_id and claims.get('stamp') != identity.stamp:
+            # La contraseña o el rol cambiaron desde que se emitieron los claims: se cierra la sesión
+            session.pop(CLAIMS_SESSION_KEY, None)
+            return None
+        _store_claims(identity)
+    return identity
+
+
+def remember_identity(user):
+    """Se llama al iniciar sesión: guarda la identidad fresca en la caché y, si aplica, en la sesión."""
+    identity = identity_from_user(user)
+    _cache().set(user.id, identity)
+    if current_app.config['IDENTITY_SESSION_CLAIMS']:
+        _store_claims(identity)
+    return identity
+
+
+def forget_identity():
+    session.pop(CLAIMS_SESSION_KEY, None)
+
+
+def invalidate_identity(*user_ids):
+    """Para escrituras masivas que no pasan por el ORM (p. ej. cambios de rol con UPDATE directo)."""
+    cache = current_app.extensions.get('identity_cache') # No existe en procesos sin vistas (CLI, init_db)
+    if cache is None:
+        return
+    for user_id in user_ids:
+        cache.pop(user_id)
+
+
+# --- Invalidación automática ---
+# Los cambios de rol o contraseña hechos con el ORM se detectan en el flush y se aplican a la
+# caché tras el commit, para que otra petición no vuelva a cachear el valor anterior entre medio.
+# Otros workers ven el cambio al vencer IDENTITY_CACHE_TTL (o IDENTITY_CLAIMS_MAX_AGE).
+
+@event.listens_for(db.session, 'after_flush')
+def _track_identity_changes(session, flush_context):
+    changed = session.info.setdefault('identity_changed', set())
+    for obj in session.deleted:
+        if isinstance(obj, User):
+            changed.add(obj.id)
+    for obj in session.dirty:
+        if isinstance(obj, User):
+            state = inspect(obj)
+            if state.attrs.role.history.has_changes() or state.attrs.password.history.has_changes():
+                changed.add(obj.id)
+
+
+@event.listens_for(db.session, 'after_commit')
+def _invalidate_changed_identities(session):
+    changed = session.info.pop('identity_changed', None)
+    if changed:
+        invalidate_identity(*changed)
+
+
+@event.listens_for(db.session, 'after_rollback')
+def _discard_identity_changes(session):
+    session.info.pop('identity_changed', None)
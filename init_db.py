@@ -1,10 +1,13 @@
 # init_db.py
 
-from app import app, db
+from app import create_app
+from extensions import db
 from models import User, GradeLevel, Subject, Grade, Announcement, Enrollment, SubjectActivityConfig, GradeChangeRequest # ¡Nuevas importaciones!
-from werkzeug.security import generate_password_hash
+from passwords import hash_password # Misma política de hashing que el registro
 from datetime import datetime
 
+app = create_app(web=False) # Solo base de datos y modelos: no importa vistas ni formularios
+
 with app.app_context():
     print("Tablas de la base de datos creadas.")
     
@@ -24,10 +27,10 @@ with app.app_context():
     db.session.commit()
 
     # Crear usuarios
-    hashed_password_admin = generate_password_hash('adminpass')
-    hashed_password_teacher = generate_password_hash('teacherpass')
-    hashed_password_student1 = generate_password_hash('student1pass')
-    hashed_password_student2 = generate_password_hash('student2pass')
+    hashed_password_admin = hash_password('adminpass')
+    hashed_password_teacher = hash_password('teacherpass')
+    hashed_password_student1 = hash_password('student1pass')
+    hashed_password_student2 = hash_password('student2pass')
 
     admin_user = User(username='admin', email='admin@school.com', role='Administrador', first_name='Super', last_name='Admin', password=hashed_password_admin)
     teacher_user = User(username='profesor', email='profesor@school.com', role='Profesor', first_name='Carlos', last_name='Gomez', password=hashed_password_teacher)
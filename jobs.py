@@ -0,0 +1,308 @@
+# jobs.py
+
+# Trabajos en segundo plano sin broker externo: la tabla Job es la cola y cada proceso web
+# tiene un pool de hilos que los ejecuta.
+# - enqueue() inserta la fila y la envía al pool del proceso; el trabajo se reclama con un UPDATE
+#   condicionado a status='pending', así que nunca lo ejecutan dos procesos a la vez.
+# - Cada trabajo recibe un JobContext: ctx.progress() guarda el porcentaje (como mucho una vez por
+#   JOB_PROGRESS_INTERVAL), hace de latido y detecta la cancelación pedida desde la interfaz.
+#   ctx.progress() confirma la transacción en curso: los trabajos avanzan en pasos que se
+#   pueden confirmar por separado (una asignatura, un bloque de notas, un lote de boletas).
+# - Un trabajo 'running' sin latidos durante JOB_STALE_SECONDS (el proceso murió) se marca como fallido.
+# - `flask run-jobs` ejecuta los pendientes que quedaron sin procesar (p. ej. tras un reinicio).
+
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import select, update, delete, func, union
+from werkzeug.utils import secure_filename
+from extensions import db
+from models import (Job, Subject, Grade, GradeLevel, GradeSummary, Enrollment, GradeChangeRequest,
+                    SubjectActivityConfig, subject_grade_level_association)
+from grade_summary import check_and_rebuild
+from report_cards import generate_report_cards
+from versions import grades_changed, grade_requests_changed
+from ledger import record_grade_rows, take_snapshots
+
+FINISHED_STATUSES = ('succeeded', 'failed', 'cancelled')
+STATUS_LABELS = {'pending': 'En cola', 'running': 'En curso', 'succeeded': 'Terminado',
+                 'failed': 'Falló', 'cancelled': 'Cancelado'}
+MESSAGE_LENGTH = 255
+DELETE_CHUNK_SIZE = 5000 # Notas borradas por transacción al eliminar una asignatura
+
+_registry = {} # nombre -> (función, cancelable, título)
+
+
+def job(name, title, cancellable=True):
+    """Registra `función(ctx, **params)` como trabajo `name`. Lo que devuelva (serializable a JSON)
+    queda como resultado. Con cancellable=False la interfaz no ofrece cancelarlo."""
+    def decorator(f):
+        _registry[name] = (f, cancellable, title)
+        return f
+    return decorator
+
+
+def job_title(kind):
+    entry = _registry.get(kind)
+    return entry[2] if entry else kind
+
+
+def is_cancellable(kind):
+    entry = _registry.get(kind)
+    return bool(entry and entry[1])
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class JobContext:
+    def __init__(self, job_id, params, user_id, results_dir, interval):
+        self.job_id = job_id
+        self.params = params
+        self.user_id = user_id # Quien lo encoló (historial de notas)
+        self.results_dir = results_dir
+        self.interval = interval
+        self._last_write = 0.0
+
+    def result_path(self, filename):
+        """Ruta donde el trabajo puede dejar un archivo para descargar (admin.admin_job_result)."""
+        os.makedirs(self.results_dir, exist_ok=True)
+        return os.path.join(self.results_dir, f'{self.job_id}-{filename}')
+
+    def progress(self, done, total, message=None, force=False):
+        """Informa `done` de `total` pasos. Confirma lo hecho hasta ahora y lanza JobCancelled si
+        se pidió cancelar (solo en los trabajos cancelables)."""
+        now = time.monotonic()
+        if not force and now - self._last_write < self.interval:
+            return
+        self._last_write = now
+        values = {'progress': min(100.0, 100.0 * done / total) if total else 0.0, 'heartbeat_at': datetime.utcnow()}
+        if message is not None:
+            values['message'] = message[:MESSAGE_LENGTH]
+        db.session.execute(update(Job).where(Job.id == self.job_id).values(**values))
+        cancel_requested = db.session.execute(select(Job.cancel_requested).where(Job.id == self.job_id)).scalar()
+        db.session.commit()
+        if cancel_requested:
+            raise JobCancelled()
+
+
+# --- Encolar y consultar ---
+def enqueue(kind, params=None, user_id=None):
+    """Crea el trabajo (con commit) y lo envía al pool del proceso si existe. Devuelve su id."""
+    if kind not in _registry:
+        raise ValueError(f'Trabajo desconocido: {kind}')
+    job_row = Job(kind=kind, params=json.dumps(params or {}), status='pending', created_by_user_id=user_id)
+    db.session.add(job_row)
+    db.session.commit()
+    runner = current_app.extensions.get('job_runner')
+    if runner is not None:
+        runner.submit(job_row.id)
+    return job_row.id
+
+
+def request_cancel(job_id):
+    """Pide cancelar un trabajo. Uno pendiente se cancela en el acto; uno en curso se detiene en su
+    próximo ctx.progress(). Devuelve False si ya terminó o no es cancelable."""
+    job_row = db.session.get(Job, job_id)
+    if job_row is None or job_row.status in FINISHED_STATUSES or not is_cancellable(job_row.kind):
+        return False
+    now = datetime.utcnow()
+    cancelled_now = db.session.execute(
+        update(Job).where(Job.id == job_id, Job.status == 'pending')
+        .values(status='cancelled', cancel_requested=True, finished_at=now)).rowcount
+    if not cancelled_now:
+        db.session.execute(update(Job).where(Job.id == job_id).values(cancel_requested=True))
+    db.session.commit()
+    return True
+
+
+def job_result(job_row):
+    return json.loads(job_row.result) if job_row.result else None
+
+
+def job_status(job_row):
+    """Estado para el sondeo de las páginas (JSON)."""
+    return {
+        'id': job_row.id,
+        'kind': job_row.kind,
+        'title': job_title(job_row.kind),
+        'status': job_row.status,
+        'status_label': STATUS_LABELS.get(job_row.status, job_row.status),
+        'progress': round(job_row.progress, 1),
+        'message': job_row.message,
+        'error': job_row.error,
+        'cancel_requested': job_row.cancel_requested,
+        'finished': job_row.status in FINISHED_STATUSES,
+        'result': job_result(job_row),
+    }
+
+
+def fail_stale_jobs():
+    """Marca como fallidos los trabajos en curso cuyo proceso dejó de informar avances."""
+    limit = datetime.utcnow() - timedelta(seconds=current_app.config['JOB_STALE_SECONDS'])
+    stale = db.session.execute(
+        update(Job).where(Job.status == 'running', Job.heartbeat_at < limit)
+        .values(status='failed', error='El proceso que ejecutaba el trabajo dejó de responder.',
+                finished_at=datetime.utcnow())).rowcount
+    if stale:
+        db.session.commit()
+    return stale
+
+
+# --- Ejecución ---
+def run_job(job_id):
+    """Reclama y ejecuta un trabajo pendiente en el contexto de aplicación actual.
+    Devuelve False si otro proceso ya lo tomó (o fue cancelado antes de empezar)."""
+    now = datetime.utcnow()
+    claimed = db.session.execute(
+        update(Job).where(Job.id == job_id, Job.status == 'pending')
+        .values(status='running', started_at=now, heartbeat_at=now)).rowcount
+    db.session.commit()
+    if not claimed:
+        return False
+
+    job_row = db.session.get(Job, job_id)
+    kind, params = job_row.kind, json.loads(job_row.params or '{}')
+    context = JobContext(job_id, params, job_row.created_by_user_id, results_dir(),
+                         current_app.config['JOB_PROGRESS_INTERVAL'])
+    entry = _registry.get(kind)
+    values = {}
+    try:
+        if entry is None:
+            raise ValueError(f'Trabajo desconocido: {kind}')
+        result = entry[0](context, **params)
+        values = {'status': 'succeeded', 'progress': 100.0, 'result': json.dumps(result, ensure_ascii=False)}
+    except JobCancelled:
+        db.session.rollback()
+        values = {'status': 'cancelled', 'message': 'Cancelado a pedido del usuario.'}
+    except Exception as exc:
+        db.session.rollback()
+        current_app.logger.exception('El trabajo %s (%s) falló', job_id, kind)
+        values = {'status': 'failed', 'error': f'{type(exc).__name__}: {exc}'}
+    values['finished_at'] = datetime.utcnow()
+    db.session.execute(update(Job).where(Job.id == job_id).values(**values))
+    db.session.commit()
+    return True
+
+
+class JobRunner:
+    """Pool de hilos del proceso; cada trabajo corre en su propio contexto de aplicación (y sesión)."""
+
+    def __init__(self, app, workers):
+        self.app = app
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='job')
+
+    def submit(self, job_id):
+        self.executor.submit(self._run, job_id)
+
+    def _run(self, job_id):
+        with self.app.app_context():
+            try:
+                run_job(job_id)
+            except Exception:
+                self.app.logger.exception('No se pudo ejecutar el trabajo %s', job_id)
+
+
+def run_pending(limit=None):
+    """Ejecuta en primer plano los trabajos pendientes, del más antiguo al más nuevo (flask run-jobs)."""
+    executed = 0
+    while limit is None or executed < limit:
+        job_id = db.session.execute(
+            select(Job.id).where(Job.status == 'pending').order_by(Job.created_at, Job.id).limit(1)).scalar()
+        if job_id is None:
+            break
+        if run_job(job_id):
+            executed += 1
+    return executed
+
+
+def results_dir():
+    """Carpeta de los archivos generados: JOB_RESULTS_DIR o, por defecto, dentro de la carpeta
+    `instance` de la aplicación, que no forma parte del repositorio."""
+    return current_app.config['JOB_RESULTS_DIR'] or os.path.join(current_app.instance_path, 'job_results')
+
+
+def init_app(app):
+    app.extensions['job_runner'] = JobRunner(app, app.config['JOB_WORKERS'])
+
+
+# --- Trabajos disponibles ---
+@job('rebuild_grade_summary', 'Reconstruir totales de notas')
+def rebuild_grade_summary(ctx):
+    """check-grade-summary en segundo plano; cada asignatura corregida queda confirmada aunque se cancele."""
+    report, orphans = check_and_rebuild(
+        db.session, progress=lambda done, total: ctx.progress(done, total, f'{done} de {total} asignaturas revisadas'))
+    return {'differences': len(report), 'orphans': orphans}
+
+
+@job('delete_subject', 'Eliminar asignatura', cancellable=False)
+def delete_subject(ctx, subject_id):
+    """Elimina una asignatura con todas sus notas, totales, inscripciones y actividades.
+
+    Las notas se borran por bloques de DELETE_CHUNK_SIZE, una transacción por bloque (con sus
+    eventos de baja en el historial), para no bloquear la base durante todo el borrado. Las
+    solicitudes de cambio de sus notas se conservan como historial con grade_id en NULL. No es
+    cancelable: a medio camino la asignatura quedaría sin parte de sus notas.
+    """
+    subject = db.session.get(Subject, subject_id)
+    if subject is None:
+        return {'deleted': False, 'name': None, 'grades': 0}
+    name = subject.name
+    grade_ids = select(Grade.id).where(Grade.subject_id == subject_id)
+    pairs = {(student_id, subject_id) for student_id in db.session.execute(union(
+        select(Enrollment.student_id).where(Enrollment.subject_id == subject_id),
+        select(Grade.student_id).where(Grade.subject_id == subject_id))).scalars()}
+    total = db.session.execute(select(func.count()).select_from(grade_ids.subquery())).scalar()
+
+    requests = db.session.execute(
+        update(GradeChangeRequest.__table__).where(GradeChangeRequest.grade_id.in_(grade_ids)).values(grade_id=None)).rowcount
+    if requests:
+        grade_requests_changed()
+    db.session.execute(delete(GradeSummary.__table__).where(GradeSummary.subject_id == subject_id))
+    grades_changed(pairs)
+    ctx.progress(0, total, f'Eliminando {total} notas', force=True)
+
+    deleted = 0
+    while True:
+        chunk = db.session.execute(grade_ids.order_by(Grade.id).limit(DELETE_CHUNK_SIZE)).scalars().all()
+        if not chunk:
+            break
+        record_grade_rows(db.session.connection(), 'deleted', Grade.id.in_(chunk), ctx.user_id)
+        db.session.execute(delete(Grade.__table__).where(Grade.id.in_(chunk)))
+        deleted += len(chunk)
+        ctx.progress(deleted, total, f'{deleted} de {total} notas eliminadas', force=True)
+
+    db.session.execute(delete(Enrollment.__table__).where(Enrollment.subject_id == subject_id))
+    db.session.execute(delete(SubjectActivityConfig.__table__).where(SubjectActivityConfig.subject_id == subject_id))
+    db.session.execute(delete(subject_grade_level_association).where(subject_grade_level_association.c.subject_id == subject_id))
+    grades_changed(pairs) # Las inscripciones también forman parte de las notas de cada estudiante
+    db.session.delete(subject) # El flush sella subject:<id> y subjects (versions.py)
+    db.session.commit()
+    return {'deleted': True, 'name': name, 'grades': deleted}
+
+
+@job('report_cards', 'Generar boletas de calificaciones')
+def report_cards(ctx, grade_level_id=None):
+    """generate-report-cards en segundo plano; el zip queda en results_dir() para descargarlo."""
+    level = db.session.get(GradeLevel, grade_level_id) if grade_level_id is not None else None
+    if grade_level_id is not None and level is None:
+        raise ValueError(f'No existe el nivel de grado {grade_level_id}.')
+    filename = f"boletas-{secure_filename(level.name) if level is not None else 'colegio'}.zip"
+    report = generate_report_cards(
+        ctx.result_path(filename), grade_level=level, mp_context=multiprocessing.get_context('spawn'),
+        progress=lambda done, total: ctx.progress(done, total, f'{done} de {total} boletas'))
+    return {'file': os.path.basename(report.path), 'cards': report.cards, 'subjects': report.subjects,
+            'elapsed': round(report.elapsed, 1)}
+
+
+@job('grade_snapshots', 'Instantáneas del historial de notas')
+def grade_snapshots(ctx):
+    """flask snapshot-grades en segundo plano; cada instantánea queda confirmada aunque se cancele."""
+    taken = take_snapshots(current_app.config['GRADE_SNAPSHOT_MIN_EVENTS'],
+                           progress=lambda done, total: ctx.progress(done, total, f'{done} de {total} asignaturas'))
+    return {'snapshots': taken}
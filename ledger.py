@@ -0,0 +1,213 @@
+# ledger.py
+
+# Historial de notas de solo inserción (GradeEvent) con instantáneas por asignatura (GradeSnapshot).
+# - Toda escritura de notas agrega sus eventos en la misma transacción: las del ORM en after_flush
+#   (igual que GradeSummary) y las masivas con record_events() o record_grade_rows(), que copia
+#   las notas afectadas con INSERT ... SELECT.
+# - Cada evento guarda el estado completo de la nota después del cambio: el estado a una fecha
+#   es el último evento de cada nota hasta esa fecha.
+# - take_snapshots() guarda el estado completo de las asignaturas con al menos
+#   GRADE_SNAPSHOT_MIN_EVENTS eventos desde su última instantánea (flask snapshot-grades, o el
+#   trabajo en segundo plano). grades_as_of() parte de la última instantánea anterior a la fecha
+#   y aplica los eventos ocurridos desde GRADE_SNAPSHOT_REPLAY_MARGIN antes de tomarla.
+# - La reproducción es por fecha y no por id: en PostgreSQL/MySQL los ids salen de una secuencia
+#   y no siguen el orden de los commits (una transacción sin confirmar puede tener el id 100
+#   cuando el 101 ya entró en la instantánea). El margen debe superar la transacción de escritura
+#   de notas más larga; los eventos que la instantánea ya incluía se vuelven a aplicar sin efecto,
+#   porque cada evento reemplaza el estado completo de su nota (grade_id).
+
+import json
+import zlib
+from collections import namedtuple
+from datetime import datetime, timedelta
+from flask import has_request_context, current_app
+from flask_login import current_user
+from sqlalchemy import event, inspect, select, insert, func, literal, null, Integer, DateTime
+from extensions import db
+from models import Grade, GradeEvent, GradeSnapshot
+from grade_summary import previous_value
+
+DEFAULT_SNAPSHOT_MIN_EVENTS = 200
+DEFAULT_REPLAY_MARGIN = 300 # Segundos (GRADE_SNAPSHOT_REPLAY_MARGIN)
+STATE_ATTRS = ('student_id', 'subject_id', 'unit_number', 'component_type', 'activity_name', 'value')
+EVENT_COLUMNS = ('grade_id', 'student_id', 'subject_id', 'unit_number', 'component_type', 'activity_name',
+                 'value', 'old_value', 'event_type', 'changed_by_user_id', 'occurred_at')
+
+# Estado de una nota en una fecha (grades_as_of) y resultado de la reconstrucción
+GradeState = namedtuple('GradeState', 'grade_id student_id unit_number component_type activity_name value')
+GradesAsOf = namedtuple('GradesAsOf', 'grades snapshot_taken_at events_applied')
+
+
+def current_actor_id():
+    """Usuario de la petición en curso; None en comandos y trabajos en segundo plano."""
+    if has_request_context() and current_user.is_authenticated:
+        return current_user.id
+    return None
+
+
+# --- Registro de eventos ---
+def grade_event(event_type, grade_id, student_id, subject_id, unit_number, component_type, activity_name,
+                value, old_value=None):
+    """Evento con el estado de la nota después del cambio; en una baja, `value` es el valor eliminado."""
+    return {'grade_id': grade_id, 'student_id': student_id, 'subject_id': subject_id, 'unit_number': unit_number,
+            'component_type': component_type, 'activity_name': activity_name,
+            'value': None if event_type == 'deleted' else value,
+            'old_value': value if event_type == 'deleted' else old_value,
+            'event_type': event_type}
+
+
+def record_events(connection, events, changed_by_user_id=None):
+    """Agrega `events` (dicts de grade_event) con un INSERT executemany."""
+    if not events:
+        return
+    now = datetime.utcnow()
+    connection.execute(insert(GradeEvent.__table__), [
+        dict(item, changed_by_user_id=changed_by_user_id, occurred_at=now) for item in events])
+
+
+def record_grade_rows(connection, event_type, where, changed_by_user_id=None, occurred_at=None,
+                      unit_number=None, activity_name=None):
+    """Agrega un evento por cada nota que cumple `where` con un solo INSERT ... SELECT.
+
+    Las altas se registran después de insertar y las bajas antes de eliminar. `unit_number` y
+    `activity_name` (expresiones SQL) son el estado nuevo de las notas que se van a mover de
+    actividad; `occurred_at` puede ser una columna (p. ej. la fecha de carga de la nota).
+    """
+    table = Grade.__table__
+    rows = select(
+        table.c.id, table.c.student_id, table.c.subject_id,
+        table.c.unit_number if unit_number is None else unit_number,
+        table.c.component_type,
+        table.c.activity_name if activity_name is None else activity_name,
+        null() if event_type == 'deleted' else table.c.value,
+        null() if event_type == 'created' else table.c.value,
+        literal(event_type),
+        literal(changed_by_user_id, Integer),
+        literal(datetime.utcnow(), DateTime) if occurred_at is None else occurred_at,
+    ).where(where)
+    return connection.execute(insert(GradeEvent.__table__).from_select(list(EVENT_COLUMNS), rows)).rowcount
+
+
+@event.listens_for(db.session, 'after_flush')
+def _record_grade_changes(session, flush_context):
+    # Igual que en grade_summary: el historial de atributos todavía tiene los valores previos al flush
+    events = []
+    for obj in session.new:
+        if isinstance(obj, Grade):
+            events.append(grade_event('created', obj.id, *[getattr(obj, attr) for attr in STATE_ATTRS]))
+    for obj in session.deleted:
+        if isinstance(obj, Grade):
+            state = inspect(obj)
+            events.append(grade_event('deleted', obj.id, *[previous_value(state, attr) for attr in STATE_ATTRS]))
+    for obj in session.dirty:
+        if isinstance(obj, Grade) and obj not in session.deleted:
+            state = inspect(obj)
+            if not any(state.attrs[attr].history.has_changes() for attr in STATE_ATTRS):
+                continue
+            events.append(grade_event('updated', obj.id, *[getattr(obj, attr) for attr in STATE_ATTRS],
+                                      old_value=previous_value(state, 'value')))
+    if events:
+        record_events(session.connection(), events, current_actor_id())
+
+
+# --- Instantáneas ---
+def _encode(rows):
+    return zlib.compress(json.dumps(rows, separators=(',', ':')).encode('utf-8'))
+
+
+def _decode(data):
+    return json.loads(zlib.decompress(data).decode('utf-8'))
+
+
+def take_snapshot(subject_id):
+    """Guarda el estado actual de las notas de una asignatura (sin commit)."""
+    # La fecha se toma antes de leer: grades_as_of reproduce desde taken_at menos el margen
+    taken_at = datetime.utcnow()
+    last_event_id = select(func.coalesce(func.max(GradeEvent.id), 0)).where(
+        GradeEvent.subject_id == subject_id).scalar_subquery()
+    # Notas y último evento en la misma sentencia: la instantánea es consistente aunque otro
+    # proceso escriba notas de la asignatura mientras tanto (filas de la conexión, sin el ORM)
+    rows = db.session.connection().execute(
+        select(Grade.id, Grade.student_id, Grade.unit_number, Grade.component_type, Grade.activity_name,
+               Grade.value, last_event_id).where(Grade.subject_id == subject_id).order_by(Grade.id)).all()
+    if rows:
+        last_seen = rows[0][-1]
+    else:
+        last_seen = db.session.execute(select(last_event_id)).scalar()
+    snapshot = GradeSnapshot(subject_id=subject_id, taken_at=taken_at, last_event_id=last_seen,
+                             grade_count=len(rows), data=_encode([list(row[:-1]) for row in rows]))
+    db.session.add(snapshot)
+    return snapshot
+
+
+def due_snapshot_subjects(min_events):
+    """Asignaturas con al menos `min_events` eventos desde su última instantánea (o sin ninguna)."""
+    last = (select(GradeSnapshot.subject_id, func.max(GradeSnapshot.last_event_id).label('last_event_id'))
+            .group_by(GradeSnapshot.subject_id).subquery())
+    return db.session.execute(
+        select(GradeEvent.subject_id)
+        .outerjoin(last, last.c.subject_id == GradeEvent.subject_id)
+        .where(GradeEvent.id > func.coalesce(last.c.last_event_id, 0))
+        .group_by(GradeEvent.subject_id).having(func.count() >= min_events)
+        .order_by(GradeEvent.subject_id)).scalars().all()
+
+
+def take_snapshots(min_events=DEFAULT_SNAPSHOT_MIN_EVENTS, progress=None):
+    """Instantánea de cada asignatura que la necesita, un commit por asignatura. Devuelve cuántas se tomaron.
+    `progress(tomadas, total)` se llama después de cada una (trabajos en segundo plano)."""
+    subject_ids = due_snapshot_subjects(min_events)
+    for done, subject_id in enumerate(subject_ids, start=1):
+        take_snapshot(subject_id)
+        db.session.commit()
+        if progress is not None:
+            progress(done, len(subject_ids))
+    return len(subject_ids)
+
+
+# --- Consultas ---
+def grades_as_of(subject_id, when, student_id=None):
+    """Notas de una asignatura (o de uno de sus estudiantes) tal como estaban en `when`.
+
+    Lee la última instantánea anterior a `when` y aplica, en orden de fecha, los eventos hasta
+    `when` ocurridos desde GRADE_SNAPSHOT_REPLAY_MARGIN antes de ella; sin instantánea se
+    recorren los eventos de la asignatura desde el principio.
+    """
+    snapshot = db.session.execute(
+        select(GradeSnapshot.taken_at, GradeSnapshot.last_event_id, GradeSnapshot.data)
+        .where(GradeSnapshot.subject_id == subject_id, GradeSnapshot.taken_at <= when)
+        .order_by(GradeSnapshot.taken_at.desc(), GradeSnapshot.id.desc()).limit(1)).first()
+    state = {}
+    events = (select(GradeEvent.grade_id, GradeEvent.student_id, GradeEvent.unit_number, GradeEvent.component_type,
+                     GradeEvent.activity_name, GradeEvent.value, GradeEvent.event_type)
+              .where(GradeEvent.subject_id == subject_id, GradeEvent.occurred_at <= when)
+              .order_by(GradeEvent.occurred_at, GradeEvent.id))
+    if snapshot is not None:
+        margin = current_app.config.get('GRADE_SNAPSHOT_REPLAY_MARGIN', DEFAULT_REPLAY_MARGIN)
+        events = events.where(GradeEvent.occurred_at > snapshot.taken_at - timedelta(seconds=margin))
+        for row in _decode(snapshot.data):
+            if student_id is None or row[1] == student_id:
+                state[row[0]] = GradeState(*row)
+
+    if student_id is not None:
+        events = events.where(GradeEvent.student_id == student_id)
+    applied = 0
+    for row in db.session.execute(events):
+        applied += 1
+        if row.event_type == 'deleted':
+            state.pop(row.grade_id, None)
+        else:
+            state[row.grade_id] = GradeState(*row[:6])
+    grades = sorted(state.values(), key=lambda grade: (grade.student_id, grade.unit_number,
+                                                       grade.component_type != 'Zona', grade.activity_name))
+    return GradesAsOf(grades, snapshot.taken_at if snapshot is not None else None, applied)
+
+
+def changes_since(subject_id, since, student_id=None, limit=None):
+    """Eventos de una asignatura posteriores a `since`, del más antiguo al más nuevo."""
+    query = (select(GradeEvent).where(GradeEvent.subject_id == subject_id, GradeEvent.occurred_at > since)
+             .order_by(GradeEvent.occurred_at, GradeEvent.id))
+    if student_id is not None:
+        query = query.where(GradeEvent.student_id == student_id)
+    if limit is not None:
+        query = query.limit(limit)
+    return db.session.execute(query).scalars().all()
@@ -0,0 +1,64 @@
+# measure_startup.py
+
+# Mide el tiempo de arranque en frío de la aplicación en procesos nuevos de Python:
+#   python measure_startup.py [--runs 5]
+# 'web' es lo que hace cada worker (create_app()); 'cli' es lo que hacen los comandos de
+# mantenimiento e init_db.py (create_app(web=False)). También verifica que el modo consola
+# no cargue formularios ni WTForms-SQLAlchemy.
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+MODES = {
+    'web': 'create_app()',
+    'cli': 'create_app(web=False)',
+}
+
+HEAVY_MODULES = ('forms', 'wtforms_sqlalchemy', 'flask_wtf', 'routes_admin')
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+from app import create_app
+app = {factory}
+elapsed = time.perf_counter() - start
+print(json.dumps({{'seconds': elapsed, 'modules': len(sys.modules),
+                  'heavy': [name for name in {heavy!r} if name in sys.modules]}}))
+"""
+
+
+def measure(mode, runs):
+    code = PROBE.format(factory=MODES[mode], heavy=HEAVY_MODULES)
+    env = dict(os.environ, LOG_LEVEL='WARNING')
+    samples = []
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__)), env=env).stdout
+        samples.append(json.loads(output.strip().splitlines()[-1]))
+    seconds = [sample['seconds'] for sample in samples]
+    return {
+        'mode': mode,
+        'runs': runs,
+        'median_ms': round(statistics.median(seconds) * 1000, 1),
+        'min_ms': round(min(seconds) * 1000, 1),
+        'modules': samples[-1]['modules'],
+        'heavy_modules': samples[-1]['heavy'],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Tiempo de arranque en frío de la aplicación.')
+    parser.add_argument('--runs', type=int, default=5, help='Procesos nuevos por modo.')
+    args = parser.parse_args()
+    for mode in MODES:
+        result = measure(mode, args.runs)
+        print(f"{result['mode']:>4}: mediana {result['median_ms']} ms (mín. {result['min_ms']} ms), "
+              f"{result['modules']} módulos cargados, pesados: {', '.join(result['heavy_modules']) or 'ninguno'}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,41 @@
+"""Índices de expresión para la búsqueda por prefijo (search.py)
+
+Revision ID: 0007_search_indexes
+Revises: 0006_password_length
+Create Date: 2026-10-17 03:55:41.204518
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0007_search_indexes'
+down_revision = '0006_password_length'
+branch_labels = None
+depends_on = None
+
+# Escrita a mano: autogenerate no compara índices de expresión en SQLite
+USER_INDEXES = {
+    'ix_user_role_username_lower': 'username',
+    'ix_user_role_first_name_lower': 'first_name',
+    'ix_user_role_last_name_lower': 'last_name',
+}
+SUBJECT_INDEXES = {
+    'ix_subject_name_lower': 'name',
+    'ix_subject_code_lower': 'code',
+}
+
+
+def upgrade():
+    for name, column in USER_INDEXES.items():
+        op.create_index(name, 'user', ['role', sa.text(f'lower({column})')], unique=False)
+    for name, column in SUBJECT_INDEXES.items():
+        op.create_index(name, 'subject', [sa.text(f'lower({column})')], unique=False)
+
+
+def downgrade():
+    for name in SUBJECT_INDEXES:
+        op.drop_index(name, table_name='subject')
+    for name in USER_INDEXES:
+        op.drop_index(name, table_name='user')
@@ -0,0 +1,97 @@
+"""Columnas normalizadas (minúsculas y sin tildes) para la búsqueda por prefijo (search.py)
+
+Revision ID: 0011_search_keys
+Revises: 0010_grade_ledger
+Create Date: 2026-10-17 04:40:12.318204
+
+"""
+import unicodedata
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0011_search_keys'
+down_revision = '0010_grade_ledger'
+branch_labels = None
+depends_on = None
+
+# Escrita a mano: las columnas nuevas se rellenan en Python con la misma normalización que
+# models.search_key (copiada aquí para que la migración no dependa del código actual)
+SEARCH_COLUMNS = {
+    'user': {'username_search': ('username', 20), 'first_name_search': ('first_name', 50),
+             'last_name_search': ('last_name', 50)},
+    'subject': {'name_search': ('name', 128), 'code_search': ('code', 10)},
+}
+NEW_INDEXES = {
+    'user': {'ix_user_role_username_search': ['role', 'username_search'],
+             'ix_user_role_first_name_search': ['role', 'first_name_search'],
+             'ix_user_role_last_name_search': ['role', 'last_name_search']},
+    'subject': {'ix_subject_name_search': ['name_search'], 'ix_subject_code_search': ['code_search']},
+}
+# Índices de expresión de 0007_search_indexes, que dejan de usarse
+LOWER_INDEXES = {
+    'user': {'ix_user_role_username_lower': 'username', 'ix_user_role_first_name_lower': 'first_name',
+             'ix_user_role_last_name_lower': 'last_name'},
+    'subject': {'ix_subject_name_lower': 'name', 'ix_subject_code_lower': 'code'},
+}
+BACKFILL_CHUNK_SIZE = 5000
+
+
+def _search_key(text):
+    decomposed = unicodedata.normalize('NFKD', (text or '').casefold())
+    return ''.join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def _backfill(connection, table_name, columns):
+    table = sa.table(table_name, sa.column('id'), *[sa.column(name) for name in columns],
+                     *[sa.column(source) for source, _ in columns.values()])
+    update = table.update().where(table.c.id == sa.bindparam('row_id')).values(
+        {name: sa.bindparam(f'new_{name}') for name in columns})
+    last_id = 0
+    while True:
+        rows = connection.execute(
+            sa.select(table.c.id, *[table.c[source] for source, _ in columns.values()])
+            .where(table.c.id > last_id).order_by(table.c.id).limit(BACKFILL_CHUNK_SIZE)).all()
+        if not rows:
+            break
+        connection.execute(update, [
+            dict({'row_id': row[0]},
+                 **{f'new_{name}': _search_key(value) for name, value in zip(columns, row[1:])})
+            for row in rows])
+        last_id = rows[-1][0]
+
+
+def upgrade():
+    # Los índices de expresión se eliminan antes: el modo batch de SQLite no sabe recrearlos
+    for table_name, indexes in LOWER_INDEXES.items():
+        for name in indexes:
+            op.drop_index(name, table_name=table_name)
+
+    connection = op.get_bind()
+    for table_name, columns in SEARCH_COLUMNS.items():
+        for name, (_, length) in columns.items():
+            op.add_column(table_name, sa.Column(name, sa.String(length=length), nullable=True))
+        _backfill(connection, table_name, columns)
+        with op.batch_alter_table(table_name, schema=None) as batch_op:
+            for name, (_, length) in columns.items():
+                batch_op.alter_column(name, existing_type=sa.String(length=length), nullable=False)
+            for index_name, index_columns in NEW_INDEXES[table_name].items():
+                batch_op.create_index(index_name, index_columns, unique=False)
+
+
+def downgrade():
+    for table_name, columns in SEARCH_COLUMNS.items():
+        with op.batch_alter_table(table_name, schema=None) as batch_op:
+            for index_name in NEW_INDEXES[table_name]:
+                batch_op.drop_index(index_name)
+            for name in columns:
+                batch_op.drop_column(name)
+
+    for table_name, indexes in LOWER_INDEXES.items():
+        for name, column in indexes.items():
+            columns = [sa.text(f'lower({column})')]
+            if table_name == 'user':
+                columns.insert(0, 'role')
+            op.create_index(name, table_name, columns, unique=False)
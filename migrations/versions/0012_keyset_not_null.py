@@ -0,0 +1,51 @@
+"""Columnas de orden de la paginación por cursor sin NULL (pagination.keyset_page)
+
+Revision ID: 0012_keyset_not_null
+Revises: 0011_search_keys
+Create Date: 2026-10-17 05:02:41.517390
+
+"""
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0012_keyset_not_null'
+down_revision = '0011_search_keys'
+branch_labels = None
+depends_on = None
+
+# Escrita a mano: una fila con la clave de orden en NULL nunca aparecía después de la primera
+# página. Las fechas desconocidas se completan antes de exigirlas.
+APPROVAL_DATE_CHECK = "status = 'pending' OR approval_date IS NOT NULL"
+
+
+def upgrade():
+    now = datetime.utcnow()
+    requests = sa.table('grade_change_request', sa.column('status'), sa.column('request_date'),
+                        sa.column('approval_date'))
+    announcements = sa.table('announcement', sa.column('date_posted'))
+    # Sin fecha de solicitud se usa la de aprobación, si la hay
+    op.execute(requests.update().where(requests.c.request_date.is_(None))
+               .values(request_date=sa.func.coalesce(requests.c.approval_date, now)))
+    op.execute(requests.update().where(requests.c.status != 'pending', requests.c.approval_date.is_(None))
+               .values(approval_date=requests.c.request_date))
+    op.execute(announcements.update().where(announcements.c.date_posted.is_(None)).values(date_posted=now))
+
+    with op.batch_alter_table('grade_change_request', schema=None) as batch_op:
+        batch_op.alter_column('request_date', existing_type=sa.DateTime(), nullable=False)
+        batch_op.create_check_constraint('ck_grade_change_request_approval_date', APPROVAL_DATE_CHECK)
+
+    with op.batch_alter_table('announcement', schema=None) as batch_op:
+        batch_op.alter_column('date_posted', existing_type=sa.DateTime(), nullable=False)
+
+
+def downgrade():
+    with op.batch_alter_table('announcement', schema=None) as batch_op:
+        batch_op.alter_column('date_posted', existing_type=sa.DateTime(), nullable=True)
+
+    with op.batch_alter_table('grade_change_request', schema=None) as batch_op:
+        batch_op.drop_constraint('ck_grade_change_request_approval_date', type_='check')
+        batch_op.alter_column('request_date', existing_type=sa.DateTime(), nullable=True)
@@ -1,9 +1,36 @@
 # models.py
 
-from app import db # Importamos 'db' desde app.py
+from extensions import db # La instancia se inicializa en create_app() (app.py)
+import unicodedata
 from datetime import datetime
 from flask_login import UserMixin
-from werkzeug.security import generate_password_hash, check_password_hash
+from sqlalchemy import event
+from werkzeug.security import check_password_hash
+from passwords import hash_password
+
+# --- Columnas normalizadas para la búsqueda por prefijo (search.py) ---
+def search_key(text):
+    """Texto en minúsculas (casefold) y sin tildes: 'Álvarez' -> 'alvarez', 'ÉTICA' -> 'etica'."""
+    decomposed = unicodedata.normalize('NFKD', (text or '').casefold())
+    return ''.join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def _search_default(source):
+    # Default por fila: lo aplican también los INSERT masivos de Core (provision-users, datos sintéticos)
+    return lambda context: search_key(context.get_current_parameters().get(source))
+
+
+def _search_column(source, length):
+    return db.Column(db.String(length), nullable=False, default=_search_default(source))
+
+
+def _track_search_columns(model, columns):
+    """`columns` es {columna normalizada: columna de origen} del modelo."""
+    @event.listens_for(model, 'before_update')
+    def _refresh_search_columns(mapper, connection, target):
+        # Los cambios hechos con el ORM (edición de usuarios o asignaturas) recalculan sus claves
+        for column, source in columns.items():
+            setattr(target, column, search_key(getattr(target, source)))
 
 # Association table for many-to-many relationship between Subject and GradeLevel
 subject_grade_level_association = db.Table(
@@ -16,19 +43,29 @@ class User(db.Model, UserMixin):
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(20), unique=True, nullable=False)
     email = db.Column(db.String(120), unique=True, nullable=False)
-    password = db.Column(db.String(60), nullable=False)
-    role = db.Column(db.String(20), nullable=False, default='Estudiante') # Roles: 'Estudiante', 'Profesor', 'Administrador'
+    password = db.Column(db.String(255), nullable=False) # Los hashes scrypt de werkzeug superan los 60 caracteres
+    role = db.Column(db.String(20), nullable=False, default='Estudiante', index=True) # Roles: 'Estudiante', 'Profesor', 'Administrador'
     first_name = db.Column(db.String(50), nullable=False)
     last_name = db.Column(db.String(50), nullable=False)
 
     def set_password(self, password):
-        """Genera un hash de la contraseña y lo guarda."""
-        self.password = generate_password_hash(password).decode('utf-8')
+        """Genera un hash de la contraseña con la política configurada (PASSWORD_HASH_METHOD) y lo guarda."""
+        self.password = hash_password(password)
 
     def check_password(self, password):
         """Verifica si la contraseña proporcionada coincide con el hash almacenado."""
         return check_password_hash(self.password, password)
 
+    # Búsqueda por prefijo de estudiantes (search.py): rangos sobre las columnas normalizadas dentro de un rol
+    username_search = _search_column('username', 20)
+    first_name_search = _search_column('first_name', 50)
+    last_name_search = _search_column('last_name', 50)
+    __table_args__ = (
+        db.Index('ix_user_role_username_search', 'role', 'username_search'),
+        db.Index('ix_user_role_first_name_search', 'role', 'first_name_search'),
+        db.Index('ix_user_role_last_name_search', 'role', 'last_name_search'),
+    )
+
     def __repr__(self):
         return f"User('{self.username}', '{self.email}', '{self.role}')"
 
@@ -38,7 +75,7 @@ class Subject(db.Model):
     code = db.Column(db.String(10), unique=True, nullable=False)
     description = db.Column(db.Text)
     
-    teacher_id = db.Column(db.Integer, db.ForeignKey('user.id'))
+    teacher_id = db.Column(db.Integer, db.ForeignKey('user.id'), index=True)
     teacher_obj = db.relationship('User', backref='subjects_taught', lazy=True)
 
     grade_levels = db.relationship(
@@ -48,9 +85,24 @@ class Subject(db.Model):
     activity_configs = db.relationship('SubjectActivityConfig', backref='subject_obj', lazy='dynamic')
     enrollments = db.relationship('Enrollment', backref='subject_obj', lazy='dynamic')
 
+    # Búsqueda por prefijo de asignaturas (search.py)
+    name_search = _search_column('name', 128)
+    code_search = _search_column('code', 10)
+    __table_args__ = (
+        db.Index('ix_subject_name_search', 'name_search'),
+        db.Index('ix_subject_code_search', 'code_search'),
+    )
+
     def __repr__(self):
         return f'<Subject {self.name} ({self.code})>'
 
+_track_search_columns(User, {'username_search': 'username', 'first_name_search': 'first_name',
+                             'last_name_search': 'last_name'})
+_track_search_columns(Subject, {'name_search': 'name', 'code_search': 'code'})
+
+# Punteo máximo de un parcial (no tienen configuración por actividad): validación, boletas y estadísticas
+PARCIAL_MAX_SCORE = 20.0
+
 class Grade(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     student_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
@@ -71,6 +123,15 @@ class Grade(db.Model):
 
     student = db.relationship('User', backref='grades', lazy=True)
     subject = db.relationship('Subject', backref='grades', lazy=True)
+
+    __table_args__ = (
+        # Búsqueda de una nota concreta (estudiante + asignatura + actividad)
+        db.Index('ix_grade_lookup', 'student_id', 'subject_id', 'component_type', 'unit_number', 'activity_name'),
+        # Matriz de notas de una asignatura completa (teacher_manage_grades)
+        db.Index('ix_grade_subject_student', 'subject_id', 'student_id'),
+        # Rendimiento por actividad (analytics.py): el GROUP BY se resuelve recorriendo solo este índice
+        db.Index('ix_grade_subject_activity', 'subject_id', 'unit_number', 'component_type', 'activity_name', 'value'),
+    )
     
     def __repr__(self):
         return f'<Grade {self.value} for {self.student.username} in {self.subject.name} - {self.activity_name} ({self.unit_number})>'
@@ -80,13 +141,15 @@ class Announcement(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(128), nullable=False)
     content = db.Column(db.Text, nullable=False)
-    date_posted = db.Column(db.DateTime, default=datetime.utcnow)
+    date_posted = db.Column(db.DateTime, nullable=False, default=datetime.utcnow) # Clave de la paginación por cursor
     
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     target_role = db.Column(db.String(20), nullable=False)
 
     user = db.relationship('User', backref='announcements', lazy=True)
 
+    __table_args__ = (db.Index('ix_announcement_target_role_date', 'target_role', 'date_posted'),)
+
     def __repr__(self):
         return f'<Announcement {self.title} by {self.user.username}>'
 
@@ -97,7 +160,10 @@ class Enrollment(db.Model):
     subject_id = db.Column(db.Integer, db.ForeignKey('subject.id'), nullable=False)
     enrollment_date = db.Column(db.DateTime, default=datetime.utcnow)
 
-    __table_args__ = (db.UniqueConstraint('student_id', 'subject_id', name='_student_subject_uc'),)
+    __table_args__ = (
+        db.UniqueConstraint('student_id', 'subject_id', name='_student_subject_uc'),
+        db.Index('ix_enrollment_subject_id', 'subject_id'),
+    )
 
     def __repr__(self):
         return f'<Enrollment Student:{self.student_obj.username} Subject:{self.subject_obj.name}>'
@@ -119,7 +185,8 @@ class SubjectActivityConfig(db.Model):
 # --- NUEVO MODELO: GradeChangeRequest (Solicitud de Cambio de Nota) ---
 class GradeChangeRequest(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    grade_id = db.Column(db.Integer, db.ForeignKey('grade.id'), nullable=False)
+    # Queda en NULL cuando una solicitud de eliminación aprobada borra la nota; la solicitud se conserva como historial
+    grade_id = db.Column(db.Integer, db.ForeignKey('grade.id'), nullable=True)
     
     # Quién solicitó el cambio (el profesor)
     requested_by_user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
@@ -131,11 +198,11 @@ class GradeChangeRequest(db.Model):
 
     status = db.Column(db.String(20), default='pending', nullable=False) # 'pending', 'approved', 'rejected'
     
-    request_date = db.Column(db.DateTime, default=datetime.utcnow)
+    request_date = db.Column(db.DateTime, nullable=False, default=datetime.utcnow) # Clave de la paginación por cursor
     
     # Quién aprobó/rechazó (el administrador)
     approved_by_user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=True)
-    approval_date = db.Column(db.DateTime, nullable=True)
+    approval_date = db.Column(db.DateTime, nullable=True) # NULL solo mientras está pendiente (ver el CHECK)
 
     # ¡¡¡AÑADE ESTAS DOS LÍNEAS!!! Son las que faltan.
     # Relación con el usuario que solicitó el cambio
@@ -144,6 +211,14 @@ class GradeChangeRequest(db.Model):
     approved_by = db.relationship('User', backref='grade_requests_approved', lazy=True, foreign_keys=[approved_by_user_id])
     # La relación con el modelo Grade se maneja por backref='grade_obj' en el modelo Grade
 
+    __table_args__ = (
+        db.Index('ix_grade_change_request_status_date', 'status', 'request_date'),
+        db.Index('ix_grade_change_request_status_approval', 'status', 'approval_date'),
+        # Los listados de aprobadas y rechazadas se paginan por approval_date: una fila sin fecha no aparecería
+        db.CheckConstraint("status = 'pending' OR approval_date IS NOT NULL",
+                           name='ck_grade_change_request_approval_date'),
+    )
+
     def __repr__(self):
         return f'<GradeChangeRequest ID:{self.id} Grade:{self.grade_id} Type:{self.request_type} Status:{self.status}>'
     
@@ -157,4 +232,114 @@ class GradeLevel(db.Model):
     )
 
     def __repr__(self):
-        return f'<GradeLevel {self.name}>'    
\ No newline at end of file
+        return f'<GradeLevel {self.name}>'    
+
+# --- NUEVO MODELO: GradeSummary (Totales precalculados por estudiante, asignatura y unidad) ---
+# Se mantiene al día en la misma transacción que cada cambio de Grade (ver grade_summary.py),
+# así los dashboards y reportes leen totales ya calculados en lugar de recorrer todas las notas.
+class GradeSummary(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    student_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    subject_id = db.Column(db.Integer, db.ForeignKey('subject.id'), nullable=False)
+    unit_number = db.Column(db.String(20), nullable=False)
+
+    zona_total = db.Column(db.Float, nullable=False, default=0.0)
+    parcial_total = db.Column(db.Float, nullable=False, default=0.0)
+    grade_count = db.Column(db.Integer, nullable=False, default=0)
+
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        db.UniqueConstraint('student_id', 'subject_id', 'unit_number', name='_summary_student_subject_unit_uc'),
+        # Por asignatura; incluye estudiante y totales para que los puntajes de analytics.py
+        # se calculen recorriendo solo el índice, ya agrupado por (asignatura, estudiante)
+        db.Index('ix_grade_summary_subject_scores', 'subject_id', 'student_id', 'zona_total', 'parcial_total'),
+    )
+
+    @property
+    def total(self):
+        return self.zona_total + self.parcial_total
+
+    def __repr__(self):
+        return f'<GradeSummary Student:{self.student_id} Subject:{self.subject_id} {self.unit_number} Zona:{self.zona_total} Parcial:{self.parcial_total}>'
+
+# --- NUEVO MODELO: CacheVersion (Sellos de versión para invalidar cachés entre procesos) ---
+# Cada escritura relevante incrementa la versión de su clave (p. ej. 'announcements') en la misma
+# transacción; los demás workers comparan la versión guardada con la de su caché local.
+class CacheVersion(db.Model):
+    key = db.Column(db.String(64), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<CacheVersion {self.key}={self.version}>'
+
+# --- NUEVO MODELO: Job (Trabajos en segundo plano, ver jobs.py) ---
+# Acciones largas del Administrador (reconstruir totales, eliminar asignaturas, generar boletas):
+# la petición solo crea la fila y un hilo del proceso la ejecuta; las páginas consultan su estado.
+class Job(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(50), nullable=False) # Nombre registrado con @job en jobs.py
+    params = db.Column(db.Text, nullable=False, default='{}') # JSON
+    status = db.Column(db.String(20), nullable=False, default='pending') # 'pending', 'running', 'succeeded', 'failed', 'cancelled'
+    progress = db.Column(db.Float, nullable=False, default=0.0) # Porcentaje
+    message = db.Column(db.String(255))
+    result = db.Column(db.Text) # JSON devuelto por el trabajo
+    error = db.Column(db.Text)
+    cancel_requested = db.Column(db.Boolean, nullable=False, default=False)
+
+    created_by_user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=True)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+    heartbeat_at = db.Column(db.DateTime) # Último avance informado; un trabajo sin avances por mucho tiempo se da por perdido
+
+    created_by = db.relationship('User', lazy=True)
+
+    __table_args__ = (db.Index('ix_job_status_created', 'status', 'created_at'),)
+
+    def __repr__(self):
+        return f'<Job {self.id} {self.kind} {self.status} {self.progress:.0f}%>'
+
+# --- NUEVOS MODELOS: GradeEvent y GradeSnapshot (Historial de notas, ver ledger.py) ---
+# Cada alta, cambio o baja de una nota agrega un GradeEvent con el estado de la nota después del
+# cambio; las filas nunca se modifican. GradeSnapshot guarda cada cierto tiempo el estado completo
+# de las notas de una asignatura para reconstruir fechas pasadas sin recorrer todo el historial.
+class GradeEvent(db.Model):
+    id = db.Column(db.Integer, primary_key=True) # Orden de los eventos
+    # Sin clave foránea: el historial se conserva aunque la nota, el estudiante o la asignatura se eliminen
+    grade_id = db.Column(db.Integer, nullable=False)
+    student_id = db.Column(db.Integer, nullable=False)
+    subject_id = db.Column(db.Integer, nullable=False)
+    unit_number = db.Column(db.String(20), nullable=False)
+    component_type = db.Column(db.String(20), nullable=False)
+    activity_name = db.Column(db.String(128), nullable=False)
+    value = db.Column(db.Float) # Valor después del cambio (NULL si la nota se eliminó)
+    old_value = db.Column(db.Float) # Valor antes del cambio (NULL si la nota se creó)
+    event_type = db.Column(db.String(10), nullable=False) # 'created', 'updated', 'deleted'
+    changed_by_user_id = db.Column(db.Integer, nullable=True) # NULL: comandos y trabajos en segundo plano
+    occurred_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (
+        # Eventos desde la última instantánea de cada asignatura (ledger.due_snapshot_subjects)
+        db.Index('ix_grade_event_subject_id', 'subject_id', 'id'),
+        # Cambios de una asignatura desde una fecha (ledger.changes_since y ledger.grades_as_of)
+        db.Index('ix_grade_event_subject_time', 'subject_id', 'occurred_at'),
+    )
+
+    def __repr__(self):
+        return f'<GradeEvent {self.id} {self.event_type} Grade:{self.grade_id} {self.old_value} -> {self.value}>'
+
+
+class GradeSnapshot(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    subject_id = db.Column(db.Integer, nullable=False)
+    taken_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    last_event_id = db.Column(db.Integer, nullable=False) # Mayor GradeEvent.id visible al tomarla (solo para contar eventos nuevos)
+    grade_count = db.Column(db.Integer, nullable=False)
+    data = db.Column(db.LargeBinary, nullable=False) # JSON comprimido con zlib (ledger.py)
+
+    __table_args__ = (db.Index('ix_grade_snapshot_subject_taken', 'subject_id', 'taken_at'),)
+
+    def __repr__(self):
+        return f'<GradeSnapshot Subject:{self.subject_id} {self.taken_at} ({self.grade_count} notas)>'
@@ -0,0 +1,116 @@
+# page_cache.py
+
+# Caché de páginas completas para visitantes anónimos y de fragmentos compartidos de base.html.
+# - @cached_page guarda la respuesta de una vista GET pública por URL (ruta y query string). Un
+#   acierto se responde desde la caché del proceso sin consultar la base ni renderizar plantillas;
+#   los usuarios autenticados, o con mensajes flash pendientes, siempre ejecutan la vista.
+# - Las altas, bajas y cambios de profesores hechos con el ORM vacían la caché de páginas tras el
+#   commit (como identity.py); una escritura masiva desde una vista debe llamar a invalidate_pages().
+#   Otros workers, y las cargas de comandos de consola (provision-users), se ven al vencer PAGE_CACHE_TTL.
+# - cached_fragment() renderiza una plantilla parcial una sola vez por combinación de valores
+#   (p. ej. rol y usuario para el menú) y la reutiliza en todas las páginas.
+
+from functools import wraps
+from flask import request, session, current_app, render_template
+from flask_login import current_user
+from markupsafe import Markup
+from sqlalchemy import event, inspect
+from extensions import db
+from models import User
+from cache import TTLCache
+
+TEACHER_ROLE = 'Profesor'
+TEACHER_ATTRS = ('role', 'first_name', 'last_name', 'email') # Lo que muestra la lista pública
+CACHED_HEADERS = ('Content-Type',)
+
+
+def init_app(app):
+    app.extensions['page_cache'] = TTLCache(maxsize=app.config['PAGE_CACHE_SIZE'], ttl=app.config['PAGE_CACHE_TTL'])
+    app.extensions['fragment_cache'] = TTLCache(maxsize=app.config['FRAGMENT_CACHE_SIZE'],
+                                                ttl=app.config['FRAGMENT_CACHE_TTL'])
+    app.add_template_global(cached_fragment)
+
+
+def _page_cache():
+    return current_app.extensions['page_cache']
+
+
+def invalidate_pages():
+    """Vacía la caché de páginas de este proceso. No existe en procesos sin vistas (CLI, init_db)."""
+    cache = current_app.extensions.get('page_cache')
+    if cache is not None:
+        cache.clear()
+
+
+def _cacheable_request():
+    return (request.method == 'GET' and not current_user.is_authenticated
+            and not session.get('_flashes'))
+
+
+def cached_page(f):
+    """Decorador para vistas públicas cuya respuesta no depende de la sesión."""
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        if not _cacheable_request():
+            return f(*args, **kwargs)
+        key = request.full_path
+        cached = _page_cache().get(key)
+        if cached is not None:
+            body, headers = cached
+            response = current_app.response_class(body, status=200, headers=headers)
+            response.headers['X-Page-Cache'] = 'HIT'
+            return response
+
+        response = current_app.make_response(f(*args, **kwargs))
+        # Solo respuestas completas que no escribieron en la sesión (la cookie es de cada visitante)
+        if response.status_code == 200 and not response.direct_passthrough and not session.modified:
+            headers = [(name, response.headers[name]) for name in CACHED_HEADERS if name in response.headers]
+            _page_cache().set(key, (response.get_data(), headers))
+        return response
+    return decorated_function
+
+
+def cached_fragment(template_name, *vary):
+    """Plantilla parcial renderizada una vez por `vary` (los valores de los que depende su contenido)."""
+    cache = current_app.extensions['fragment_cache']
+    key = (template_name,) + vary
+    fragment = cache.get(key)
+    if fragment is None:
+        fragment = Markup(render_template(template_name))
+        cache.set(key, fragment)
+    return fragment
+
+
+# --- Invalidación automática ---
+# Igual que identity.py: el cambio se anota en el flush y la caché se vacía después del commit,
+# para que otra petición no vuelva a guardar la lista anterior entre medio.
+
+def _was_teacher(obj):
+    state = inspect(obj)
+    history = state.attrs.role.history
+    return obj.role == TEACHER_ROLE or TEACHER_ROLE in (history.deleted or ())
+
+
+@event.listens_for(db.session, 'after_flush')
+def _track_teacher_changes(session, flush_context):
+    for obj in list(session.new) + list(session.deleted):
+        if isinstance(obj, User) and _was_teacher(obj):
+            session.info['teacher_pages_changed'] = True
+            return
+    for obj in session.dirty:
+        if isinstance(obj, User) and _was_teacher(obj):
+            state = inspect(obj)
+            if any(state.attrs[attr].history.has_changes() for attr in TEACHER_ATTRS):
+                session.info['teacher_pages_changed'] = True
+                return
+
+
+@event.listens_for(db.session, 'after_commit')
+def _invalidate_teacher_pages(session):
+    if session.info.pop('teacher_pages_changed', None):
+        invalidate_pages()
+
+
+@event.listens_for(db.session, 'after_rollback')
+def _discard_teacher_changes(session):
+    session.info.pop('teacher_pages_changed', None)
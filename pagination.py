@@ -0,0 +1,93 @@
+# pagination.py
+
+# Paginación por cursor (keyset) para los listados que crecen sin límite.
+# En lugar de OFFSET, cada página continúa a partir del último par (clave de orden, id)
+# mostrado, así el costo de cada petición depende del tamaño de página y no del tamaño de la tabla.
+
+from datetime import datetime
+from flask import request
+from sqlalchemy import and_, or_
+
+DEFAULT_PAGE_SIZE = 25
+MAX_PAGE_SIZE = 100
+
+
+class KeysetPage:
+    """Una página de resultados y el cursor para pedir la siguiente (None si no hay más)."""
+
+    def __init__(self, items, next_cursor):
+        self.items = items
+        self.next_cursor = next_cursor
+
+    @property
+    def has_more(self):
+        return self.next_cursor is not None
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+    def __bool__(self):
+        return bool(self.items)
+
+
+def get_page_size(default=DEFAULT_PAGE_SIZE):
+    """Lee ?por_pagina= de la petición, acotado a MAX_PAGE_SIZE."""
+    size = request.args.get('por_pagina', default, type=int)
+    return max(1, min(size, MAX_PAGE_SIZE))
+
+
+def encode_cursor(sort_value, row_id):
+    if isinstance(sort_value, datetime):
+        sort_value = sort_value.isoformat()
+    return f'{sort_value}|{row_id}'
+
+
+def decode_cursor(raw, sort_column):
+    """Convierte 'valor|id' de vuelta a (valor, id). Devuelve None si el cursor no es válido."""
+    if not raw or '|' not in raw:
+        return None
+    sort_value, row_id = raw.rsplit('|', 1)
+    try:
+        python_type = sort_column.type.python_type
+        if python_type is datetime:
+            sort_value = datetime.fromisoformat(sort_value)
+        elif python_type is int:
+            sort_value = int(sort_value)
+        return sort_value, int(row_id)
+    except (ValueError, NotImplementedError):
+        return None
+
+
+def keyset_page(query, sort_column, id_column, cursor=None, page_size=DEFAULT_PAGE_SIZE, descending=False):
+    """Ejecuta `query` ordenada por (sort_column, id_column) y devuelve un KeysetPage.
+
+    `cursor` es el valor recibido en la URL (p. ej. request.args.get('desde')). Ninguna fila de
+    `query` puede tener sort_column en NULL: la comparación con el cursor la excluiría de todas
+    las páginas siguientes (por eso las columnas de orden de los listados son NOT NULL).
+    Se pide una fila extra para saber si existe una página siguiente sin hacer un COUNT.
+    """
+    position = decode_cursor(cursor, sort_column)
+    if position is not None:
+        sort_value, last_id = position
+        if descending:
+            query = query.filter(or_(sort_column < sort_value,
+                                     and_(sort_column == sort_value, id_column < last_id)))
+        else:
+            query = query.filter(or_(sort_column > sort_value,
+                                     and_(sort_column == sort_value, id_column > last_id)))
+
+    if descending:
+        query = query.order_by(sort_column.desc(), id_column.desc())
+    else:
+        query = query.order_by(sort_column.asc(), id_column.asc())
+
+    rows = query.limit(page_size + 1).all()
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        last = rows[-1]
+        next_cursor = encode_cursor(getattr(last, sort_column.key), getattr(last, id_column.key))
+    return KeysetPage(rows, next_cursor)
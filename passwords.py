@@ -0,0 +1,132 @@
+# passwords.py
+
+# Política de hashing de contraseñas y protección del inicio de sesión.
+# - Todos los hashes se generan con PASSWORD_HASH_METHOD (config.py).
+# - La verificación corre en un pool de hilos acotado: como máximo PASSWORD_VERIFY_WORKERS
+#   hashes a la vez (scrypt/pbkdf2 liberan el GIL) y una cola de PASSWORD_VERIFY_QUEUE; si
+#   la cola está llena se rechaza el intento en lugar de dejar que los demás workers se atasquen.
+# - Un usuario inexistente se verifica contra un hash de relleno con la misma política: la
+#   respuesta tarda lo mismo y no revela qué nombres de usuario existen.
+# - Token buckets en memoria por (usuario, IP) y por IP limitan cuántos intentos llegan al
+#   hashing. El de usuario incluye la IP para que nadie pueda bloquear a otro desde fuera.
+
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from flask import current_app
+from werkzeug.security import generate_password_hash, check_password_hash
+
+
+class VerificationBusy(Exception):
+    """El pool de verificación está saturado; el cliente debe reintentar más tarde."""
+
+
+def hash_password(password):
+    return generate_password_hash(password, method=current_app.config['PASSWORD_HASH_METHOD'])
+
+
+_policy_hashes = {}
+
+def _policy_hash(method):
+    # Hash de una contraseña aleatoria con la política `method`: de relleno para los usuarios
+    # inexistentes, y su prefijo da los parámetros completos (p. ej. 'scrypt:32768:8:1')
+    if method not in _policy_hashes:
+        _policy_hashes[method] = generate_password_hash(secrets.token_urlsafe(16), method=method)
+    return _policy_hashes[method]
+
+
+def needs_rehash(password_hash):
+    """True si el hash se generó con un método o factor de trabajo distinto al configurado."""
+    return password_hash.split('$', 1)[0] != _policy_hash(current_app.config['PASSWORD_HASH_METHOD']).split('$', 1)[0]
+
+
+# --- Pool de verificación con contrapresión ---
+def verify_password(password_hash, password):
+    """Verifica la contraseña en el pool. Lanza VerificationBusy si no hay lugar en la cola.
+
+    Con `password_hash=None` (usuario inexistente) hace el mismo trabajo contra el hash de
+    relleno de la política actual y devuelve False.
+    """
+    guard = current_app.extensions['login_guard']
+    if not guard.slots.acquire(timeout=current_app.config['PASSWORD_VERIFY_WAIT']):
+        raise VerificationBusy()
+    try:
+        checked_hash = password_hash or _policy_hash(current_app.config['PASSWORD_HASH_METHOD'])
+        valid = guard.pool.submit(check_password_hash, checked_hash, password).result()
+        return valid and password_hash is not None
+    finally:
+        guard.slots.release()
+
+
+# --- Límite de intentos (token bucket) ---
+class TokenBucket:
+    """Un bucket por clave: `capacity` intentos seguidos y uno nuevo cada `refill_seconds`.
+
+    Las claves se guardan en un OrderedDict acotado (se descartan las menos recientes), así que
+    una ráfaga de usuarios inventados no hace crecer la memoria sin límite.
+    """
+
+    def __init__(self, capacity, refill_seconds, maxsize=10000):
+        self.capacity = capacity
+        self.refill_seconds = refill_seconds
+        self.maxsize = maxsize
+        self._buckets = OrderedDict() # clave -> (tokens, última actualización)
+        self._lock = threading.Lock()
+
+    def consume(self, key):
+        """Descuenta un intento; devuelve False si la clave no tiene intentos disponibles."""
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (self.capacity, now))
+            tokens = min(self.capacity, tokens + (now - updated) / self.refill_seconds)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self.maxsize:
+                self._buckets.popitem(last=False)
+            return allowed
+
+    def reset(self, key):
+        with self._lock:
+            self._buckets.pop(key, None)
+
+
+class LoginGuard:
+    """Estado por aplicación: pool de verificación y buckets de intentos (ver init_app).
+
+    ThreadPoolExecutor crea sus hilos en el primer submit, así que con gunicorn --preload
+    cada worker arranca los suyos después del fork.
+    """
+
+    def __init__(self, config):
+        self.pool = ThreadPoolExecutor(max_workers=config['PASSWORD_VERIFY_WORKERS'], thread_name_prefix='password-verify')
+        self.slots = threading.BoundedSemaphore(config['PASSWORD_VERIFY_WORKERS'] + config['PASSWORD_VERIFY_QUEUE'])
+        self.username_attempts = TokenBucket(config['LOGIN_RATE_USER_CAPACITY'], config['LOGIN_RATE_USER_REFILL_SECONDS'])
+        # Más holgado que el de usuario: un colegio entero puede salir a internet por la misma IP
+        self.ip_attempts = TokenBucket(config['LOGIN_RATE_IP_CAPACITY'], config['LOGIN_RATE_IP_REFILL_SECONDS'])
+
+
+def init_app(app):
+    app.extensions['login_guard'] = LoginGuard(app.config)
+    _policy_hash(app.config['PASSWORD_HASH_METHOD']) # Precalculado: el primer usuario inexistente no tarda más
+
+
+def _username_key(username, remote_addr):
+    return ((username or '').strip().lower(), remote_addr)
+
+
+def allow_login_attempt(username, remote_addr):
+    """Cada intento consume del bucket del usuario en esa IP y del de la IP; ambos deben tener saldo."""
+    guard = current_app.extensions['login_guard']
+    user_ok = guard.username_attempts.consume(_username_key(username, remote_addr))
+    ip_ok = guard.ip_attempts.consume(remote_addr)
+    return user_ok and ip_ok
+
+
+def reset_login_attempts(username, remote_addr):
+    """Tras un inicio de sesión correcto, los intentos fallidos previos del usuario desde esa IP dejan de contar."""
+    current_app.extensions['login_guard'].username_attempts.reset(_username_key(username, remote_addr))
@@ -0,0 +1,253 @@
+# report_cards.py
+
+# Boletas de calificaciones: desglose por unidad (zona y parciales) de cada asignatura de un estudiante.
+# - unit_breakdown() es el mismo cálculo que muestra student_view_grades para una asignatura.
+# - generate_report_cards() arma las boletas de un nivel de grado o de todo el colegio y las guarda
+#   en un .zip (un HTML imprimible por estudiante). Los datos se leen por lotes de estudiantes con
+#   consultas IN (notas, totales por unidad e inscripciones), no por estudiante; asignaturas y
+#   actividades configuradas se leen una sola vez y llegan a cada proceso al iniciarlo.
+# - El render de las plantillas, que es CPU puro, se reparte en un pool de procesos mientras el
+#   proceso principal lee el lote siguiente y escribe el zip.
+
+import os
+import time
+import zipfile
+from collections import defaultdict, deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from flask import current_app
+from jinja2 import Environment, FileSystemLoader, select_autoescape
+from sqlalchemy import select
+from werkzeug.utils import secure_filename
+from extensions import db
+from models import (User, Subject, Grade, Enrollment, SubjectActivityConfig, GradeSummary, subject_grade_level_association,
+                    PARCIAL_MAX_SCORE)
+
+DEFAULT_BATCH_SIZE = 200 # Estudiantes por lote de consultas y por tarea del pool
+CARD_TEMPLATE = 'report_cards/card.html'
+
+# Filas livianas con los atributos que usa unit_breakdown (se envían o se arman en los procesos del pool)
+CardSubject = namedtuple('CardSubject', 'id name code teacher_name')
+CardConfig = namedtuple('CardConfig', 'unit_number activity_name max_score')
+CardGrade = namedtuple('CardGrade', 'unit_number component_type activity_name value')
+CardSummary = namedtuple('CardSummary', 'unit_number zona_total parcial_total')
+CardStudent = namedtuple('CardStudent', 'id username first_name last_name')
+
+
+def unit_breakdown(configured_activities, grades, summaries):
+    """Desglose de las notas de un estudiante en una asignatura.
+
+    `configured_activities` ordenadas por unidad y número de actividad, `grades` por unidad y nombre
+    de actividad y `summaries` sus filas de GradeSummary. Sirven modelos del ORM o las filas Card*.
+    Devuelve grades_by_unit, zona_total, parcial_total y total_general, como los usa la plantilla.
+    """
+    zona_total = sum(summary.zona_total for summary in summaries)
+    parcial_total = sum(summary.parcial_total for summary in summaries)
+
+    grades_by_unit = {}
+    for config in configured_activities:
+        if config.unit_number not in grades_by_unit:
+            grades_by_unit[config.unit_number] = {'activities': {}, 'zona_subtotal': 0.0, 'zona_max_subtotal': 0.0}
+        grades_by_unit[config.unit_number]['activities'][config.activity_name] = {
+            'value': 'N/A',
+            'max_score': config.max_score,
+            'grade_obj': None
+        }
+
+    for summary in summaries:
+        if summary.unit_number in grades_by_unit:
+            grades_by_unit[summary.unit_number]['zona_subtotal'] = summary.zona_total
+
+    for grade in grades:
+        if grade.component_type == 'Zona':
+            if grade.unit_number in grades_by_unit and grade.activity_name in grades_by_unit[grade.unit_number]['activities']:
+                grades_by_unit[grade.unit_number]['activities'][grade.activity_name]['value'] = grade.value
+                grades_by_unit[grade.unit_number]['activities'][grade.activity_name]['grade_obj'] = grade
+                grades_by_unit[grade.unit_number]['zona_max_subtotal'] += grades_by_unit[grade.unit_number]['activities'][grade.activity_name]['max_score']
+        elif grade.component_type == 'Parcial':
+            if 'parciales' not in grades_by_unit:
+                grades_by_unit['parciales'] = {}
+            grades_by_unit['parciales'][grade.activity_name] = {
+                'value': grade.value,
+                'max_score': PARCIAL_MAX_SCORE,
+                'grade_obj': grade
+            }
+
+    return {
+        'grades_by_unit': grades_by_unit,
+        'zona_total': zona_total,
+        'parcial_total': parcial_total,
+        'total_general': zona_total + parcial_total,
+    }
+
+
+class ReportCardReport:
+    """Resultado de una generación de boletas."""
+
+    def __init__(self, path):
+        self.path = path
+        self.cards = 0
+        self.batches = 0
+        self.subjects = 0
+        self.elapsed = 0.0
+
+
+# --- Render (se ejecuta en los procesos del pool) ---
+_worker = {}
+
+
+def _init_worker(template_folder, subjects, configs, scope_name, generated_at):
+    """Estado de cada proceso: el entorno de Jinja y los datos comunes a todas las boletas."""
+    _worker['template'] = Environment(
+        loader=FileSystemLoader(template_folder), autoescape=select_autoescape(['html']),
+    ).get_template(CARD_TEMPLATE)
+    _worker['subjects'] = subjects
+    _worker['configs'] = configs
+    _worker['scope_name'] = scope_name
+    _worker['generated_at'] = generated_at
+
+
+def _render_batch(students):
+    """`students` son (CardStudent, {asignatura: (notas, totales por unidad)}) con las filas de
+    _load_batch; devuelve (nombre en el zip, bytes) de cada boleta."""
+    template, subjects, configs = _worker['template'], _worker['subjects'], _worker['configs']
+    files = []
+    for student, by_subject in students:
+        cards = []
+        for subject_id in sorted(by_subject, key=lambda subject_id: (subjects[subject_id].name, subject_id)):
+            grades, summaries = by_subject[subject_id]
+            cards.append(dict(unit_breakdown(configs.get(subject_id, ()), [CardGrade._make(row) for row in grades],
+                                             [CardSummary._make(row) for row in summaries]),
+                              subject=subjects[subject_id]))
+        html = template.render(student=student, cards=cards, scope_name=_worker['scope_name'],
+                               generated_at=_worker['generated_at'])
+        name = secure_filename(f'{student.last_name} {student.first_name} {student.username}') or str(student.id)
+        files.append((f'{name}.html', html.encode('utf-8')))
+    return files
+
+
+# --- Lectura por lotes ---
+def _scope_subject_ids(grade_level_id):
+    if grade_level_id is None:
+        return select(Subject.id)
+    return select(subject_grade_level_association.c.subject_id).where(
+        subject_grade_level_association.c.grade_level_id == grade_level_id)
+
+
+def _load_subjects(subject_ids):
+    teacher_name = (User.first_name + ' ' + User.last_name).label('teacher_name')
+    rows = db.session.execute(
+        select(Subject.id, Subject.name, Subject.code, teacher_name)
+        .outerjoin(User, User.id == Subject.teacher_id).where(Subject.id.in_(subject_ids)))
+    return {row.id: CardSubject(row.id, row.name, row.code, row.teacher_name) for row in rows}
+
+
+def _load_configs(subject_ids):
+    configs = defaultdict(list)
+    rows = db.session.execute(
+        select(SubjectActivityConfig.subject_id, SubjectActivityConfig.unit_number,
+               SubjectActivityConfig.activity_name, SubjectActivityConfig.max_score)
+        .where(SubjectActivityConfig.subject_id.in_(subject_ids))
+        .order_by(SubjectActivityConfig.subject_id, SubjectActivityConfig.unit_number, SubjectActivityConfig.activity_number))
+    for row in rows:
+        configs[row.subject_id].append(CardConfig(row.unit_number, row.activity_name, row.max_score))
+    return dict(configs)
+
+
+def _load_batch(students, subject_ids):
+    """Inscripciones, notas y totales por unidad de un lote de estudiantes: tres consultas.
+
+    Las filas quedan como tuplas simples: este trabajo corre en el proceso principal, y convertirlas
+    a CardGrade / CardSummary se hace en paralelo en los procesos del pool (_render_batch).
+    """
+    # Lecturas de solo columnas directamente sobre la conexión: sin el procesamiento de filas del ORM
+    connection = db.session.connection()
+    student_ids = [student.id for student in students]
+    data = {student_id: {} for student_id in student_ids}
+    for student_id, subject_id in connection.execute(
+            select(Enrollment.student_id, Enrollment.subject_id)
+            .where(Enrollment.student_id.in_(student_ids), Enrollment.subject_id.in_(subject_ids))):
+        data[student_id][subject_id] = ([], [])
+
+    grades = connection.execute(
+        select(Grade.student_id, Grade.subject_id, Grade.unit_number, Grade.component_type,
+               Grade.activity_name, Grade.value)
+        .where(Grade.student_id.in_(student_ids), Grade.subject_id.in_(subject_ids))
+        .order_by(Grade.student_id, Grade.subject_id, Grade.unit_number, Grade.activity_name, Grade.id))
+    for student_id, subject_id, unit_number, component_type, activity_name, value in grades:
+        entry = data[student_id].get(subject_id)
+        if entry is not None: # Notas de asignaturas sin inscripción no salen en la boleta
+            entry[0].append((unit_number, component_type, activity_name, value))
+
+    summaries = connection.execute(
+        select(GradeSummary.student_id, GradeSummary.subject_id, GradeSummary.unit_number,
+               GradeSummary.zona_total, GradeSummary.parcial_total)
+        .where(GradeSummary.student_id.in_(student_ids), GradeSummary.subject_id.in_(subject_ids)))
+    for student_id, subject_id, unit_number, zona_total, parcial_total in summaries:
+        entry = data[student_id].get(subject_id)
+        if entry is not None:
+            entry[1].append((unit_number, zona_total, parcial_total))
+    return [(student, data[student.id]) for student in students]
+
+
+def generate_report_cards(path, grade_level=None, workers=None, batch_size=DEFAULT_BATCH_SIZE,
+                          progress=None, mp_context=None):
+    """Guarda en `path` (.zip) una boleta HTML por estudiante inscrito en las asignaturas del
+    nivel `grade_level` (un GradeLevel) o de todo el colegio, y devuelve un ReportCardReport.
+
+    El zip se escribe primero en un archivo temporal y solo reemplaza a `path` al terminar.
+    `progress(boletas, total)` se llama tras escribir cada lote; `mp_context` es el contexto de
+    multiprocessing del pool (jobs.py usa 'spawn': hacer fork desde un hilo no es seguro).
+    """
+    start = time.perf_counter()
+    report = ReportCardReport(path)
+    scope_ids = _scope_subject_ids(grade_level.id if grade_level is not None else None)
+    subjects = _load_subjects(scope_ids)
+    configs = _load_configs(scope_ids)
+    report.subjects = len(subjects)
+    students = [CardStudent(*row) for row in db.session.execute(
+        select(User.id, User.username, User.first_name, User.last_name)
+        .where(User.id.in_(select(Enrollment.student_id).where(Enrollment.subject_id.in_(scope_ids))))
+        .order_by(User.last_name, User.first_name, User.id))]
+
+    template_folder = os.path.join(current_app.root_path, current_app.template_folder)
+    init_args = (template_folder, subjects, configs, grade_level.name if grade_level is not None else 'Todo el colegio',
+                 datetime.now().strftime('%d/%m/%Y'))
+    workers = workers or os.cpu_count() or 1
+    folder = secure_filename(grade_level.name) if grade_level is not None else 'colegio'
+    temporary_path = f'{path}.tmp'
+
+    def write(archive, files):
+        for name, content in files:
+            archive.writestr(f'{folder}/{name}', content)
+        report.cards += len(files)
+        if progress is not None:
+            progress(report.cards, len(students))
+
+    try:
+        with zipfile.ZipFile(temporary_path, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+            batches = (_load_batch(students[offset:offset + batch_size], scope_ids)
+                       for offset in range(0, len(students), batch_size))
+            if workers == 1:
+                _init_worker(*init_args)
+                for batch in batches:
+                    write(archive, _render_batch(batch))
+                    report.batches += 1
+            else:
+                with ProcessPoolExecutor(max_workers=workers, mp_context=mp_context,
+                                         initializer=_init_worker, initargs=init_args) as pool:
+                    # Hasta dos lotes por proceso en vuelo: se leen de la base mientras otros se renderizan
+                    pending = deque()
+                    for batch in batches:
+                        pending.append(pool.submit(_render_batch, batch))
+                        report.batches += 1
+                        if len(pending) >= workers * 2:
+                            write(archive, pending.popleft().result())
+                    while pending:
+                        write(archive, pending.popleft().result())
+        os.replace(temporary_path, path)
+    finally:
+        if os.path.exists(temporary_path):
+            os.remove(temporary_path)
+    report.elapsed = time.perf_counter() - start
+    return report
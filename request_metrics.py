@@ -0,0 +1,225 @@
+# request_metrics.py
+
+# Instrumentación por petición:
+# - Eventos del motor de SQLAlchemy cuentan las sentencias de cada petición y suman su tiempo.
+# - Cada respuesta deja una línea JSON en el logger 'app.requests'. La cabecera Server-Timing
+#   (db, app) solo se envía con SERVER_TIMING_HEADER o en modo debug: expone datos internos.
+# - Las sentencias que superan SLOW_QUERY_MS se registran en 'app.slow_sql' con el SQL
+#   normalizado (literales y listas IN colapsados, sin parámetros: pueden contener datos personales).
+# - Latencia y sentencias por petición de cada endpoint se acumulan en histogramas de tamaño
+#   fijo sobre una ventana deslizante; /admin/metricas muestra sus percentiles p50/p95/p99.
+# Las métricas son del proceso: con varios workers cada uno muestra solo lo que atendió.
+# En las respuestas en streaming (exportaciones) se mide hasta el primer byte, no el envío completo.
+
+import bisect
+import json
+import re
+import threading
+import time
+from flask import g, has_request_context, request, current_app
+from sqlalchemy import event
+from extensions import db
+
+# Límites superiores de cada cubeta; la última recoge todo lo que queda por encima
+LATENCY_BUCKETS_MS = (1, 2, 3, 5, 7.5, 10, 15, 20, 30, 50, 75, 100, 150, 200, 300, 500, 750,
+                      1000, 1500, 2000, 3000, 5000, 10000, float('inf'))
+QUERY_BUCKETS = (0, 1, 2, 3, 4, 5, 6, 8, 10, 15, 20, 30, 50, 100, 200, 500, float('inf'))
+PERCENTILES = (50, 95, 99)
+
+
+class RollingHistogram:
+    """Histograma de cubetas fijas sobre una ventana de `window_seconds`, dividida en `slots`
+    tramos. Al vencer un tramo sus cuentas se descartan, así que la memoria no depende del
+    número de observaciones. Los percentiles se estiman interpolando dentro de la cubeta."""
+
+    def __init__(self, bounds, window_seconds, slots, interpolate=True):
+        self.bounds = bounds
+        self.slot_seconds = window_seconds / slots
+        self.interpolate = interpolate
+        self._counts = [[0] * len(bounds) for _ in range(slots)]
+        self._max = [0.0] * slots
+        self._slot_ids = [None] * slots # Tramo absoluto (tiempo // slot_seconds) que ocupa cada posición
+
+    def _slot(self, now):
+        slot_id = int(now // self.slot_seconds)
+        position = slot_id % len(self._counts)
+        if self._slot_ids[position] != slot_id:
+            self._counts[position] = [0] * len(self.bounds)
+            self._max[position] = 0.0
+            self._slot_ids[position] = slot_id
+        return position
+
+    def record(self, value, now):
+        position = self._slot(now)
+        self._counts[position][bisect.bisect_left(self.bounds, value)] += 1
+        self._max[position] = max(self._max[position], value)
+
+    def snapshot(self, now):
+        """(cuentas por cubeta, máximo) de los tramos que siguen dentro de la ventana."""
+        current = int(now // self.slot_seconds)
+        totals = [0] * len(self.bounds)
+        maximum = 0.0
+        for position, slot_id in enumerate(self._slot_ids):
+            if slot_id is None or current - slot_id >= len(self._counts):
+                continue
+            for index, count in enumerate(self._counts[position]):
+                totals[index] += count
+            maximum = max(maximum, self._max[position])
+        return totals, maximum
+
+    def percentiles(self, now, percentiles=PERCENTILES):
+        counts, maximum = self.snapshot(now)
+        total = sum(counts)
+        if not total:
+            return {p: None for p in percentiles}
+        result = {}
+        for p in percentiles:
+            rank = total * p / 100
+            cumulative = 0
+            for index, count in enumerate(counts):
+                if count and cumulative + count >= rank:
+                    lower = self.bounds[index - 1] if index else 0
+                    upper = min(self.bounds[index], maximum)
+                    if self.interpolate:
+                        value = lower + (upper - lower) * (rank - cumulative) / count
+                    else:
+                        value = upper
+                    result[p] = round(min(value, maximum), 2)
+                    break
+                cumulative += count
+        return result
+
+
+class EndpointStats:
+    def __init__(self, window_seconds, slots):
+        self.latency = RollingHistogram(LATENCY_BUCKETS_MS, window_seconds, slots)
+        self.queries = RollingHistogram(QUERY_BUCKETS, window_seconds, slots, interpolate=False)
+        self.requests = 0 # Totales desde el arranque del proceso
+        self.errors = 0
+        self.db_ms = 0.0
+
+
+class MetricsRegistry:
+    def __init__(self, config):
+        self.window_seconds = config['METRICS_WINDOW_SECONDS']
+        self.slots = config['METRICS_WINDOW_SLOTS']
+        self.started_at = time.time()
+        self._endpoints = {}
+        self._lock = threading.Lock()
+
+    def record(self, endpoint, elapsed_ms, sql_count, sql_ms, status):
+        now = time.time()
+        with self._lock:
+            stats = self._endpoints.get(endpoint)
+            if stats is None:
+                stats = self._endpoints[endpoint] = EndpointStats(self.window_seconds, self.slots)
+            stats.latency.record(elapsed_ms, now)
+            stats.queries.record(sql_count, now)
+            stats.requests += 1
+            stats.db_ms += sql_ms
+            if status >= 500:
+                stats.errors += 1
+
+    def report(self):
+        """Una fila por endpoint, ordenadas por p95 de latencia descendente."""
+        now = time.time()
+        rows = []
+        with self._lock:
+            for endpoint, stats in self._endpoints.items():
+                counts, _ = stats.latency.snapshot(now)
+                rows.append({
+                    'endpoint': endpoint,
+                    'window_requests': sum(counts),
+                    'requests': stats.requests,
+                    'errors': stats.errors,
+                    'latency': stats.latency.percentiles(now),
+                    'queries': stats.queries.percentiles(now),
+                    'avg_db_ms': round(stats.db_ms / stats.requests, 2),
+                })
+        rows.sort(key=lambda row: row['latency'][95] or 0, reverse=True)
+        return rows
+
+
+# --- Normalización del SQL para el log de consultas lentas ---
+_STRING_LITERALS = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERALS = re.compile(r'\b\d+(?:\.\d+)?\b')
+_PLACEHOLDER = r'(?:\?|%s|%\(\w+\)s|:\w+)'
+_IN_LISTS = re.compile(r'\(\s*' + _PLACEHOLDER + r'(?:\s*,\s*' + _PLACEHOLDER + r')+\s*\)')
+_WHITESPACE = re.compile(r'\s+')
+
+
+def normalize_sql(statement):
+    """Misma forma para todas las ejecuciones de una consulta: `IN (?, ?, ?)` con cualquier
+    número de elementos queda como `IN (?...)` y los literales como `?`."""
+    statement = _STRING_LITERALS.sub('?', statement)
+    statement = _NUMBER_LITERALS.sub('?', statement)
+    statement = _IN_LISTS.sub('(?...)', statement)
+    return _WHITESPACE.sub(' ', statement).strip()
+
+
+# --- Registro en la aplicación ---
+def init_app(app):
+    app.extensions['request_metrics'] = MetricsRegistry(app.config)
+    request_log = app.logger.getChild('requests')
+    slow_log = app.logger.getChild('slow_sql')
+    slow_query_ms = app.config['SLOW_QUERY_MS']
+
+    with app.app_context():
+        engine = db.engine
+
+    @event.listens_for(engine, 'before_cursor_execute')
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context._metrics_start = time.perf_counter()
+
+    @event.listens_for(engine, 'after_cursor_execute')
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        start = getattr(context, '_metrics_start', None)
+        if start is None:
+            return
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        endpoint = None
+        if has_request_context():
+            endpoint = request.endpoint
+            stats = g.get('_sql_stats')
+            if stats is not None:
+                stats[0] += 1
+                stats[1] += elapsed_ms
+        if elapsed_ms >= slow_query_ms:
+            slow_log.warning(json.dumps({'ms': round(elapsed_ms, 1), 'endpoint': endpoint,
+                                         'sql': normalize_sql(statement)}, ensure_ascii=False))
+
+    @app.before_request
+    def _start_request_metrics():
+        g._request_start = time.perf_counter()
+        g._sql_stats = [0, 0.0] # [sentencias, ms en la base]
+
+    @app.after_request
+    def _finish_request_metrics(response):
+        start = g.get('_request_start')
+        if start is None:
+            return response
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        sql_count, sql_ms = g._sql_stats
+        endpoint = request.endpoint or 'sin_ruta'
+        app.extensions['request_metrics'].record(endpoint, elapsed_ms, sql_count, sql_ms, response.status_code)
+        if app.config['SERVER_TIMING_HEADER'] or app.debug:
+            response.headers.add('Server-Timing', f'db;dur={sql_ms:.1f};desc="{sql_count} consultas"')
+            response.headers.add('Server-Timing', f'app;dur={elapsed_ms:.1f}')
+        if app.config['REQUEST_LOG']:
+            request_log.info(json.dumps({
+                'method': request.method, 'path': request.path, 'endpoint': endpoint,
+                'status': response.status_code, 'ms': round(elapsed_ms, 1),
+                'sql': sql_count, 'sql_ms': round(sql_ms, 1),
+            }, ensure_ascii=False))
+        return response
+
+
+def metrics_report():
+    return current_app.extensions['request_metrics'].report()
+
+
+def metrics_window():
+    """(segundos de la ventana, segundos desde el arranque del proceso) para la página de métricas."""
+    registry = current_app.extensions['request_metrics']
+    return registry.window_seconds, int(time.time() - registry.started_at)
@@ -0,0 +1,454 @@
+# routes_admin.py
+
+# Vistas del rol Administrador: asignaturas, anuncios, usuarios, solicitudes de cambio de notas y exportaciones.
+
+from flask import (Blueprint, render_template, request, redirect, url_for, flash, Response, stream_with_context, abort,
+                   jsonify, send_from_directory)
+from datetime import datetime, time
+from flask_login import current_user, login_required
+from sqlalchemy import func, select
+from sqlalchemy.orm import joinedload, selectinload
+from extensions import db
+from models import User, Subject, GradeLevel, Grade, Announcement, GradeChangeRequest, Job, Enrollment
+from forms import SubjectForm, AnnouncementForm
+from decorators import admin_required, api_roles_required
+from pagination import keyset_page, get_page_size
+from announcements import announcements_page, announcements_changed, clear_local_cache
+from grade_export import grade_rows, stream_csv, stream_xlsx
+from grade_requests import process_grade_requests, ACTIONS as GRADE_REQUEST_ACTIONS
+from request_metrics import metrics_report, metrics_window, PERCENTILES
+from analytics import school_overview, subject_report, PERCENTILES as SCORE_PERCENTILES, HISTOGRAM_BINS
+from conditional import conditional_page
+from versions import SUBJECTS_KEY, GRADE_REQUESTS_KEY, ANNOUNCEMENTS_KEY
+from ledger import grades_as_of, changes_since
+from jobs import (enqueue, request_cancel, fail_stale_jobs, job_status, job_title, job_result, is_cancellable, results_dir,
+                  STATUS_LABELS)
+
+admin_bp = Blueprint('admin', __name__)
+
+# --- Opciones de carga anticipada ---
+def grade_request_load_options():
+    """Relaciones que los listados de solicitudes muestran en cada fila (nota, estudiante,
+    asignatura, solicitante y aprobador), cargadas con JOINs en la misma consulta."""
+    return (
+        joinedload(GradeChangeRequest.grade).joinedload(Grade.student),
+        joinedload(GradeChangeRequest.grade).joinedload(Grade.subject),
+        joinedload(GradeChangeRequest.requested_by),
+        joinedload(GradeChangeRequest.approved_by),
+    )
+
+def grade_request_counts():
+    """Número de solicitudes por estado con una sola consulta agrupada (cubierta por el índice de status)."""
+    rows = db.session.query(GradeChangeRequest.status, func.count(GradeChangeRequest.id)).group_by(
+        GradeChangeRequest.status).all()
+    return {status: total for status, total in rows}
+
+# --- Dashboard del Administrador ---
+@admin_bp.route('/admin/dashboard')
+@login_required
+@admin_required
+@conditional_page(lambda: [SUBJECTS_KEY, GRADE_REQUESTS_KEY, ANNOUNCEMENTS_KEY], with_forms=True)
+def admin_dashboard():
+    # Profesor (JOIN) y niveles (una consulta IN adicional) precargados para toda la tabla.
+    # El dashboard solo muestra la primera página; el listado completo está en admin_list_subjects.
+    subjects = keyset_page(
+        Subject.query.options(joinedload(Subject.teacher_obj), selectinload(Subject.grade_levels)),
+        Subject.name, Subject.id, page_size=get_page_size())
+    
+    # Obtener solicitudes de cambio de notas pendientes (las más antiguas primero)
+    pending_grade_requests = keyset_page(
+        GradeChangeRequest.query.options(*grade_request_load_options()).filter_by(status='pending'),
+        GradeChangeRequest.request_date, GradeChangeRequest.id, page_size=get_page_size())
+    pending_count = grade_request_counts().get('pending', 0)
+
+    # Obtener anuncios para el administrador ---
+    admin_announcements = announcements_page('Administrador')
+
+    grade_levels = GradeLevel.query.order_by(GradeLevel.name).all() # Para el formulario de exportación
+
+    current_year = datetime.now().year
+    return render_template('admin/admin_dashboard.html', 
+                           title='Dashboard de Administrador',
+                           subjects=subjects,
+                           pending_grade_requests=pending_grade_requests, # Pasa las solicitudes al template
+                           pending_count=pending_count,
+                           admin_announcements=admin_announcements,
+                           grade_levels=grade_levels,
+                           current_year=current_year)
+
+# --- Gestión de Asignaturas (Admin) ---
+@admin_bp.route('/admin/asignaturas')
+@login_required
+@admin_required
+def admin_list_subjects():
+    subjects = keyset_page(
+        Subject.query.options(joinedload(Subject.teacher_obj), selectinload(Subject.grade_levels)),
+        Subject.name, Subject.id, cursor=request.args.get('desde'), page_size=get_page_size())
+    current_year = datetime.now().year
+    return render_template('admin/list_subjects.html', 
+                           title='Gestión de Asignaturas', 
+                           subjects=subjects, 
+                           current_year=current_year)
+
+@admin_bp.route('/admin/asignatura/crear', methods=['GET', 'POST'])
+@login_required
+@admin_required
+def admin_create_subject():
+    form = SubjectForm()
+    if form.validate_on_submit():
+        teacher_obj = form.teacher.data 
+        
+        subject = Subject(
+            name=form.name.data,
+            code=form.code.data,
+            description=form.description.data,
+            teacher_obj=teacher_obj 
+        )
+        
+        for level in form.grade_levels.data:
+            subject.grade_levels.append(level)
+            
+        db.session.add(subject)
+        db.session.commit()
+        flash('Asignatura creada exitosamente!', 'success')
+        return redirect(url_for('admin.admin_dashboard'))
+    return render_template('admin/create_subject.html', title='Crear Asignatura', form=form, current_year=datetime.now().year)
+
+@admin_bp.route('/admin/asignatura/<int:subject_id>/editar', methods=['GET', 'POST'])
+@login_required
+@admin_required
+def admin_edit_subject(subject_id):
+    subject = Subject.query.get_or_404(subject_id)
+    form = SubjectForm(obj=subject) 
+
+    if form.validate_on_submit():
+        form.populate_obj(subject) 
+        
+        subject.grade_levels.clear() 
+        for level in form.grade_levels.data:
+            subject.grade_levels.append(level) 
+            
+        db.session.commit()
+        flash('Asignatura actualizada exitosamente!', 'success')
+        return redirect(url_for('admin.admin_dashboard'))
+    return render_template('admin/edit_subject.html', title='Editar Asignatura', form=form, subject=subject, current_year=datetime.now().year)
+
+@admin_bp.route('/admin/asignatura/<int:subject_id>/eliminar', methods=['POST'])
+@login_required
+@admin_required
+def admin_delete_subject(subject_id):
+    # Con todas sus notas puede ser un borrado de cientos de miles de filas: se hace en segundo plano
+    subject = Subject.query.get_or_404(subject_id)
+    job_id = enqueue('delete_subject', {'subject_id': subject.id}, user_id=current_user.id)
+    flash(f'La asignatura "{subject.name}" se está eliminando.', 'info')
+    return redirect(url_for('admin.admin_job_detail', job_id=job_id))
+
+# --- Gestión de Anuncios (Admin) ---
+@admin_bp.route('/admin/anuncio/crear', methods=['GET', 'POST'])
+@login_required
+@admin_required
+def admin_create_announcement():
+    form = AnnouncementForm()
+    if form.validate_on_submit():
+        announcement = Announcement(
+            title=form.title.data,
+            content=form.content.data,
+            target_role=form.target_role.data,
+            user_id=current_user.id
+        )
+        db.session.add(announcement)
+        announcements_changed()
+        db.session.commit()
+        clear_local_cache()
+        flash('Anuncio publicado exitosamente!', 'success')
+        return redirect(url_for('admin.admin_dashboard'))
+    return render_template('announcements/create_announcement.html', title='Crear Anuncio', form=form, current_year=datetime.now().year)
+
+# --- NUEVAS RUTAS ADMIN: Gestión de Solicitudes de Cambio de Notas ---
+@admin_bp.route('/admin/solicitudes_cambio_notas')
+@login_required
+@admin_required
+def admin_view_grade_change_requests():
+    # Cada listado es una sola consulta con sus relaciones precargadas (ver grade_request_load_options)
+    # y se pagina por cursor de forma independiente: el historial crece sin límite.
+    requests_query = GradeChangeRequest.query.options(*grade_request_load_options())
+    page_size = get_page_size()
+    pending_requests = keyset_page(
+        requests_query.filter_by(status='pending'),
+        GradeChangeRequest.request_date, GradeChangeRequest.id,
+        cursor=request.args.get('pendientes_desde'), page_size=page_size)
+    approved_requests = keyset_page(
+        requests_query.filter_by(status='approved'),
+        GradeChangeRequest.approval_date, GradeChangeRequest.id,
+        cursor=request.args.get('aprobadas_desde'), page_size=page_size, descending=True)
+    rejected_requests = keyset_page(
+        requests_query.filter_by(status='rejected'),
+        GradeChangeRequest.approval_date, GradeChangeRequest.id,
+        cursor=request.args.get('rechazadas_desde'), page_size=page_size, descending=True)
+    request_counts = grade_request_counts()
+    
+    current_year = datetime.now().year
+    return render_template('admin/manage_grade_requests.html',
+                           title='Gestión de Solicitudes de Cambio de Notas',
+                           pending_requests=pending_requests,
+                           approved_requests=approved_requests,
+                           rejected_requests=rejected_requests,
+                           request_counts=request_counts,
+                           current_year=current_year)
+
+@admin_bp.route('/admin/solicitud_cambio_nota/<int:request_id>/<action>', methods=['POST'])
+@login_required
+@admin_required
+def admin_process_grade_change_request(request_id, action):
+    req = GradeChangeRequest.query.get_or_404(request_id)
+
+    if req.status != 'pending':
+        flash('Esta solicitud ya ha sido procesada.', 'warning')
+        return redirect(url_for('admin.admin_view_grade_change_requests'))
+
+    if action == 'approve':
+        grade = req.grade # Accede a la nota relacionada
+        if grade is None:
+            flash('La nota de esta solicitud ya fue eliminada; solo puede rechazarse.', 'warning')
+            return redirect(url_for('admin.admin_view_grade_change_requests'))
+        if req.request_type == 'edit':
+            grade.value = req.new_value
+            flash(f'Nota de {grade.student.first_name} en {grade.subject.name} (Actividad: {grade.activity_name}) actualizada a {req.new_value}.', 'success')
+        elif req.request_type == 'delete':
+            db.session.delete(grade)
+            flash(f'Nota de {grade.student.first_name} en {grade.subject.name} (Actividad: {grade.activity_name}) eliminada.', 'success')
+        
+        req.status = 'approved'
+        req.approved_by_user_id = current_user.id
+        req.approval_date = datetime.utcnow()
+        db.session.commit()
+        flash(f'Solicitud de cambio de nota aprobada para {grade.student.first_name}.', 'success')
+    elif action == 'reject':
+        req.status = 'rejected'
+        req.approved_by_user_id = current_user.id
+        req.approval_date = datetime.utcnow()
+        db.session.commit()
+        flash('Solicitud de cambio de nota rechazada.', 'info')
+    else:
+        flash('Acción no válida.', 'danger')
+
+    return redirect(url_for('admin.admin_view_grade_change_requests'))
+
+# --- Procesamiento por Lotes de Solicitudes (Admin) ---
+# Todas las solicitudes seleccionadas se aprueban o rechazan en una sola transacción.
+@admin_bp.route('/admin/solicitudes_cambio_notas/lote', methods=['POST'])
+@login_required
+@admin_required
+def admin_batch_process_grade_change_requests():
+    action = request.form.get('action')
+    request_ids = request.form.getlist('request_ids', type=int)
+    if action not in GRADE_REQUEST_ACTIONS:
+        flash('Acción no válida.', 'danger')
+        return redirect(url_for('admin.admin_view_grade_change_requests'))
+    if not request_ids:
+        flash('No se seleccionó ninguna solicitud.', 'warning')
+        return redirect(url_for('admin.admin_view_grade_change_requests'))
+
+    outcomes = process_grade_requests(request_ids, action, current_user.id)
+    processed = sum(1 for outcome in outcomes if outcome.status != 'skipped')
+    flash(f'{processed} de {len(outcomes)} solicitudes procesadas.', 'success' if processed == len(outcomes) else 'warning')
+    return render_template('admin/grade_requests_batch_result.html', outcomes=outcomes, action=action)
+
+# --- Exportación del Libro de Notas (Admin) ---
+# Sin filtros exporta todo el colegio; ?asignatura_id= o ?nivel_id= acotan la exportación.
+EXPORT_FORMATS = {
+    'csv': (stream_csv, 'text/csv; charset=utf-8'),
+    'xlsx': (stream_xlsx, 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'),
+}
+
+@admin_bp.route('/admin/exportar/notas.<formato>')
+@login_required
+@admin_required
+def admin_export_grades(formato):
+    if formato not in EXPORT_FORMATS:
+        abort(404)
+    subject_id = request.args.get('asignatura_id', type=int)
+    grade_level_id = request.args.get('nivel_id', type=int)
+
+    filename = 'notas_colegio'
+    if subject_id is not None:
+        filename = f'notas_{Subject.query.get_or_404(subject_id).code}'
+    elif grade_level_id is not None:
+        filename = f'notas_nivel_{GradeLevel.query.get_or_404(grade_level_id).id}'
+
+    writer, mimetype = EXPORT_FORMATS[formato]
+    # stream_with_context mantiene la sesión de base de datos abierta mientras se envían los bloques
+    body = stream_with_context(writer(grade_rows(subject_id=subject_id, grade_level_id=grade_level_id)))
+    return Response(body, mimetype=mimetype, headers={
+        'Content-Disposition': f'attachment; filename="{filename}.{formato}"',
+        'X-Accel-Buffering': 'no', # Evita que un proxy nginx acumule la respuesta completa
+    })
+
+# --- Gestión de Usuarios (Admin) ---
+@admin_bp.route('/admin/usuarios')
+@login_required
+@admin_required
+def admin_manage_users():
+    users = keyset_page(User.query, User.last_name, User.id,
+                        cursor=request.args.get('desde'), page_size=get_page_size())
+    current_year = datetime.now().year
+    return render_template('admin/manage_users.html', title='Gestionar Usuarios', users=users, current_year=current_year)
+
+# NUEVA RUTA: Listar Profesores
+@admin_bp.route('/admin/listar_profesores')
+@login_required
+@admin_required
+def admin_list_teachers():
+    professors = User.query.filter_by(role='Profesor').order_by(User.last_name).all()
+    current_year = datetime.now().year
+    return render_template('admin/list_teachers.html',
+                           title='Lista de Profesores', 
+                           professors=professors, 
+                           current_year=current_year)
+
+# --- Métricas de rendimiento (del proceso que atiende la petición) ---
+@admin_bp.route('/admin/metricas')
+@login_required
+@admin_required
+def admin_metrics():
+    window_seconds, uptime_seconds = metrics_window()
+    current_year = datetime.now().year
+    return render_template('admin/metrics.html', title='Métricas de Rendimiento',
+                           rows=metrics_report(), percentiles=PERCENTILES,
+                           window_minutes=window_seconds // 60, uptime_minutes=uptime_seconds // 60,
+                           current_year=current_year)
+
+
+# --- Estadísticas de notas (Admin) ---
+@admin_bp.route('/admin/estadisticas')
+@login_required
+@admin_required
+def admin_analytics():
+    overview = school_overview()
+    current_year = datetime.now().year
+    return render_template('admin/analytics.html', title='Estadísticas de Notas',
+                           overview=overview, percentiles=SCORE_PERCENTILES,
+                           current_year=current_year)
+
+
+@admin_bp.route('/admin/estadisticas/asignatura/<int:subject_id>')
+@login_required
+@admin_required
+def admin_subject_analytics(subject_id):
+    subject = Subject.query.get_or_404(subject_id)
+    report = subject_report(subject.id)
+    bin_width = 100 // HISTOGRAM_BINS
+    current_year = datetime.now().year
+    return render_template('admin/subject_analytics.html', title=f'Estadísticas: {subject.name}',
+                           subject=subject, report=report, percentiles=SCORE_PERCENTILES,
+                           bins=[(index * bin_width, (index + 1) * bin_width) for index in range(HISTOGRAM_BINS)],
+                           current_year=current_year)
+
+
+# --- Historial de notas (ledger.py) ---
+HISTORY_GRADE_ROWS = 1000 # Notas mostradas sin filtrar por estudiante
+HISTORY_CHANGE_ROWS = 500
+
+
+@admin_bp.route('/admin/asignatura/<int:subject_id>/historial')
+@login_required
+@admin_required
+def admin_subject_grade_history(subject_id):
+    # Notas tal como estaban al final del día elegido y todo lo que cambió desde entonces
+    subject = Subject.query.get_or_404(subject_id)
+    try:
+        day = datetime.strptime(request.args.get('fecha', ''), '%Y-%m-%d').date()
+    except ValueError:
+        day = datetime.utcnow().date()
+    when = datetime.combine(day, time.max)
+    student_id = request.args.get('estudiante_id', type=int)
+
+    as_of = grades_as_of(subject.id, when, student_id=student_id)
+    changes = changes_since(subject.id, when, student_id=student_id, limit=HISTORY_CHANGE_ROWS)
+    grades = as_of.grades[:HISTORY_GRADE_ROWS]
+    user_ids = ({grade.student_id for grade in grades} | {change.student_id for change in changes}
+                | {change.changed_by_user_id for change in changes if change.changed_by_user_id})
+    names = {row.id: f'{row.first_name} {row.last_name}' for row in db.session.execute(
+        select(User.id, User.first_name, User.last_name).where(User.id.in_(user_ids)))} if user_ids else {}
+    students = db.session.execute(
+        select(User.id, User.first_name, User.last_name).join(Enrollment, Enrollment.student_id == User.id)
+        .where(Enrollment.subject_id == subject.id).order_by(User.last_name, User.first_name)).all()
+    current_year = datetime.now().year
+    return render_template('admin/grade_history.html', title=f'Historial de Notas: {subject.name}',
+                           subject=subject, day=day, student_id=student_id, students=students,
+                           as_of=as_of, grades=grades, changes=changes, names=names,
+                           change_limit=HISTORY_CHANGE_ROWS, current_year=current_year)
+
+
+# --- Trabajos en segundo plano (jobs.py) ---
+JOB_LIST_SIZE = 50
+
+
+@admin_bp.route('/admin/trabajos', methods=['GET', 'POST'])
+@login_required
+@admin_required
+def admin_jobs():
+    if request.method == 'POST':
+        # Solo los trabajos que se lanzan desde esta página; eliminar asignaturas se lanza desde el panel
+        kind = request.form.get('kind')
+        if kind in ('rebuild_grade_summary', 'grade_snapshots'):
+            job_id = enqueue(kind, user_id=current_user.id)
+        elif kind == 'report_cards':
+            level_id = request.form.get('grade_level_id', type=int)
+            if level_id is not None:
+                GradeLevel.query.get_or_404(level_id)
+            job_id = enqueue(kind, {'grade_level_id': level_id}, user_id=current_user.id)
+        else:
+            abort(400)
+        return redirect(url_for('admin.admin_job_detail', job_id=job_id))
+
+    fail_stale_jobs()
+    jobs = Job.query.options(joinedload(Job.created_by)).order_by(Job.created_at.desc(), Job.id.desc()).limit(JOB_LIST_SIZE).all()
+    grade_levels = GradeLevel.query.order_by(GradeLevel.name).all()
+    current_year = datetime.now().year
+    return render_template('admin/jobs.html', title='Trabajos en Segundo Plano', jobs=jobs,
+                           grade_levels=grade_levels, job_title=job_title, status_labels=STATUS_LABELS,
+                           current_year=current_year)
+
+
+@admin_bp.route('/admin/trabajos/<int:job_id>')
+@login_required
+@admin_required
+def admin_job_detail(job_id):
+    job = Job.query.get_or_404(job_id)
+    current_year = datetime.now().year
+    return render_template('admin/job_detail.html', title=job_title(job.kind), job=job, status=job_status(job),
+                           cancellable=is_cancellable(job.kind), current_year=current_year)
+
+
+@admin_bp.route('/admin/trabajos/<int:job_id>/estado')
+@api_roles_required('Administrador')
+def admin_job_status(job_id):
+    # La consultan las páginas de trabajos cada pocos segundos en lugar de esperar la respuesta
+    job = db.session.get(Job, job_id)
+    if job is None:
+        return jsonify(error='Trabajo no encontrado.'), 404
+    return jsonify(job_status(job))
+
+
+@admin_bp.route('/admin/trabajos/<int:job_id>/cancelar', methods=['POST'])
+@login_required
+@admin_required
+def admin_cancel_job(job_id):
+    Job.query.get_or_404(job_id)
+    if request_cancel(job_id):
+        flash('Cancelación solicitada.', 'info')
+    else:
+        flash('El trabajo ya terminó o no se puede cancelar.', 'warning')
+    return redirect(url_for('admin.admin_job_detail', job_id=job_id))
+
+
+@admin_bp.route('/admin/trabajos/<int:job_id>/resultado')
+@login_required
+@admin_required
+def admin_job_result(job_id):
+    job = Job.query.get_or_404(job_id)
+    result = job_result(job) if job.status == 'succeeded' else None
+    if not result or not result.get('file'):
+        abort(404)
+    return send_from_directory(results_dir(), result['file'], as_attachment=True)
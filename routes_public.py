@@ -0,0 +1,120 @@
+# routes_public.py
+
+# Páginas públicas y autenticación.
+
+from flask import Blueprint, render_template, request, redirect, url_for, flash
+from datetime import datetime
+from flask_login import login_user, logout_user, current_user, login_required
+from extensions import db
+from models import User
+from forms import LoginForm, RegistrationForm
+from identity import remember_identity, forget_identity
+from passwords import verify_password, needs_rehash, allow_login_attempt, reset_login_attempts, VerificationBusy
+from page_cache import cached_page
+
+public_bp = Blueprint('public', __name__)
+
+# --- Rutas Públicas ---
+@public_bp.route('/')
+@public_bp.route('/home')
+@cached_page
+def home():
+    current_year = datetime.now().year
+    return render_template('index.html', title='Inicio', current_year=current_year)
+
+@public_bp.route('/about')
+@cached_page
+def about():
+    current_year = datetime.now().year
+    return render_template('about.html', title='Acerca de', current_year=current_year)
+
+# --- Rutas de Autenticación ---
+@public_bp.route('/register', methods=['GET', 'POST'])
+def register():
+    if current_user.is_authenticated:
+        return redirect(url_for('public.home'))
+    
+    form = RegistrationForm()
+    if form.validate_on_submit():
+        user = User(
+            username=form.username.data,
+            email=form.email.data,
+            first_name=form.first_name.data,
+            last_name=form.last_name.data,
+            role=form.role.data
+        )
+        user.set_password(form.password.data)
+        db.session.add(user)
+        db.session.commit()
+        flash('¡Tu cuenta ha sido creada exitosamente!', 'success')
+        return redirect(url_for('public.login'))
+    return render_template('register.html', title='Registrarse', form=form, current_year=datetime.now().year)
+
+@public_bp.route('/login', methods=['GET', 'POST'])
+def login():
+    if current_user.is_authenticated:
+        if current_user.role == 'Administrador':
+            return redirect(url_for('admin.admin_dashboard'))
+        elif current_user.role == 'Profesor':
+            return redirect(url_for('teacher.teacher_dashboard'))
+        elif current_user.role == 'Estudiante':
+            return redirect(url_for('student.student_dashboard'))
+        else:
+            return redirect(url_for('public.home'))
+    
+    form = LoginForm()
+    if form.validate_on_submit():
+        # El límite se aplica antes de consultar la base o calcular ningún hash
+        if not allow_login_attempt(form.username.data, request.remote_addr):
+            flash('Demasiados intentos de inicio de sesión. Espera un momento e inténtalo de nuevo.', 'danger')
+            return render_template('login.html', title='Iniciar Sesión', form=form, current_year=datetime.now().year), 429
+        user = User.query.filter_by(username=form.username.data).first()
+        try:
+            # Sin usuario se verifica igual (contra un hash de relleno): el tiempo no revela si existe
+            valid = verify_password(user.password if user is not None else None, form.password.data)
+        except VerificationBusy:
+            flash('El servidor está ocupado. Inténtalo de nuevo en unos segundos.', 'warning')
+            return render_template('login.html', title='Iniciar Sesión', form=form, current_year=datetime.now().year), 503, {'Retry-After': '5'}
+        if not valid:
+            flash('Usuario o contraseña inválidos', 'danger')
+            return redirect(url_for('public.login'))
+        reset_login_attempts(form.username.data, request.remote_addr)
+        if needs_rehash(user.password):
+            # Hash generado con una política anterior: se actualiza ahora que tenemos la contraseña en claro
+            user.set_password(form.password.data)
+            db.session.commit()
+        login_user(user)
+        remember_identity(user)
+        flash('Has iniciado sesión exitosamente!', 'success')
+        
+        if user.role == 'Administrador':
+            return redirect(url_for('admin.admin_dashboard'))
+        elif user.role == 'Profesor':
+            return redirect(url_for('teacher.teacher_dashboard'))
+        elif user.role == 'Estudiante':
+            return redirect(url_for('student.student_dashboard'))
+        else:
+            return redirect(url_for('public.home'))
+            
+    return render_template('login.html', title='Iniciar Sesión', form=form, current_year=datetime.now().year)
+
+@public_bp.route('/logout')
+@login_required
+def logout():
+    logout_user()
+    forget_identity()
+    flash('Has cerrado sesión.', 'info')
+    return redirect(url_for('public.home'))
+
+# NUEVA RUTA: Listar Profesores (Pública)
+# Esta ruta es para que cualquier usuario pueda ver la lista de profesores sin necesidad de autenticación
+@public_bp.route('/profesores') 
+@cached_page # Las visitas anónimas se sirven desde memoria; los cambios de profesores la vacían
+def listar_profesores(): 
+    # Obtener solo usuarios con rol 'Profesor'
+    professors = User.query.filter_by(role='Profesor').order_by(User.last_name).all()
+    current_year = datetime.now().year
+    return render_template('public_list_teachers.html', # Asegúrate de que esta plantilla exista
+                           title='Nuestros Profesores', 
+                           professors=professors, 
+                           current_year=current_year)
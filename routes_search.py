@@ -0,0 +1,34 @@
+# routes_search.py
+
+# Endpoints JSON para los campos con búsqueda (typeahead) de los formularios: en lugar de
+# renderizar un <option> por estudiante o asignatura, el navegador pide solo las coincidencias.
+
+from flask import Blueprint, request, jsonify
+from flask_login import current_user
+from decorators import api_roles_required
+from search import search_students, search_subjects, DEFAULT_LIMIT
+
+search_bp = Blueprint('search', __name__)
+
+
+def _search_args():
+    return request.args.get('q', ''), request.args.get('limite', DEFAULT_LIMIT, type=int)
+
+
+@search_bp.route('/api/estudiantes/buscar')
+@api_roles_required('Administrador', 'Profesor')
+def search_students_api():
+    term, limit = _search_args()
+    # Un profesor solo ve a los estudiantes inscritos en sus asignaturas
+    teacher_id = current_user.id if current_user.role == 'Profesor' else None
+    results = search_students(term, limit, teacher_id=teacher_id,
+                              subject_id=request.args.get('asignatura', type=int))
+    return jsonify(results=results)
+
+
+@search_bp.route('/api/asignaturas/buscar')
+@api_roles_required('Administrador', 'Profesor')
+def search_subjects_api():
+    term, limit = _search_args()
+    teacher_id = current_user.id if current_user.role == 'Profesor' else None
+    return jsonify(results=search_subjects(term, limit, teacher_id=teacher_id))
@@ -0,0 +1,95 @@
+# routes_student.py
+
+# Vistas del rol Estudiante: dashboard y notas por asignatura.
+
+from flask import Blueprint, render_template, redirect, url_for, flash
+from datetime import datetime
+from flask_login import current_user, login_required
+from sqlalchemy import func
+from sqlalchemy.orm import joinedload
+from extensions import db
+from models import Subject, Grade, Enrollment, GradeSummary
+from decorators import student_required
+from announcements import announcements_page
+from conditional import conditional_page
+from report_cards import unit_breakdown
+from activity_config import subject_activities
+from versions import student_grades_key, subject_key, SUBJECTS_KEY, ANNOUNCEMENTS_KEY
+
+student_bp = Blueprint('student', __name__)
+
+# --- Dashboard del Estudiante ---
+@student_bp.route('/estudiante/dashboard')
+@login_required
+@student_required
+@conditional_page(lambda: [student_grades_key(current_user.id), SUBJECTS_KEY, ANNOUNCEMENTS_KEY])
+def student_dashboard():
+    estudiante = current_user
+    
+    enrolled_subjects = Subject.query.join(Enrollment, Enrollment.subject_id == Subject.id).filter(
+        Enrollment.student_id == estudiante.id
+    ).options(joinedload(Subject.teacher_obj)).order_by(Subject.name).all()
+
+    # Promedios leídos de GradeSummary: una fila por asignatura, sin cargar las notas individuales
+    summary_rows = db.session.query(
+        GradeSummary.subject_id,
+        func.sum(GradeSummary.zona_total + GradeSummary.parcial_total),
+        func.sum(GradeSummary.grade_count)
+    ).filter(GradeSummary.student_id == estudiante.id).group_by(GradeSummary.subject_id).all()
+    totals_by_subject = {subject_id: (total, count) for subject_id, total, count in summary_rows}
+
+    total_grade_sum = sum(total for total, _ in totals_by_subject.values())
+    total_grade_count = sum(count for _, count in totals_by_subject.values())
+    overall_average_grade = (total_grade_sum / total_grade_count) if total_grade_count else 0
+    
+    subjects_data = []
+    for subject in enrolled_subjects:
+        total, count = totals_by_subject.get(subject.id, (0, 0))
+        subjects_data.append({
+            'subject_obj': subject,
+            'average_grade': (total / count) if count else None
+        })
+
+    # --- Obtener anuncios para el estudiante ---
+    student_announcements = announcements_page('Estudiante')
+
+    current_year = datetime.now().year
+    return render_template('estudiantes/student_dashboard.html', 
+                           estudiante=estudiante,
+                           subjects_data=subjects_data,
+                           overall_average_grade=overall_average_grade, 
+                           student_announcements=student_announcements,
+                           title=f'Dashboard de {estudiante.first_name}',
+                           current_year=current_year)
+
+# --- Ruta para Estudiante: Ver Notas por Asignatura ---
+@student_bp.route('/estudiante/asignatura/<int:subject_id>/mis_notas')
+@login_required
+@student_required
+@conditional_page(lambda subject_id: [student_grades_key(current_user.id), subject_key(subject_id)])
+def student_view_grades(subject_id):
+    estudiante = current_user
+    subject = Subject.query.get_or_404(subject_id)
+
+    enrollment = Enrollment.query.filter_by(student_id=estudiante.id, subject_id=subject.id).first()
+    if not enrollment:
+        flash('No estás inscrito en esta asignatura.', 'danger')
+        return redirect(url_for('student.student_dashboard'))
+
+    grades = Grade.query.filter_by(student_id=estudiante.id, subject_id=subject.id).order_by(
+        Grade.unit_number, Grade.activity_name).all()
+
+    configured_activities = subject_activities(subject.id).activities
+    
+    # Totales precalculados por unidad (GradeSummary); las notas individuales solo se usan para el detalle
+    summaries = GradeSummary.query.filter_by(student_id=estudiante.id, subject_id=subject.id).all()
+    breakdown = unit_breakdown(configured_activities, grades, summaries) # El mismo desglose de las boletas
+
+    current_year = datetime.now().year
+    return render_template('estudiantes/view_grades.html',
+                           title=f'Mis Notas en {subject.name}',
+                           estudiante=estudiante,
+                           subject=subject,
+                           grades=grades, 
+                           current_year=current_year,
+                           **breakdown)
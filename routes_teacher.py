@@ -0,0 +1,309 @@
+# routes_teacher.py
+
+# Vistas del rol Profesor: dashboard, configuración de actividades, notas e importación.
+
+import io
+from flask import Blueprint, render_template, request, redirect, url_for, flash
+from datetime import datetime
+from flask_login import current_user, login_required
+from extensions import db
+from models import User, Subject, Grade, Enrollment, GradeChangeRequest, PARCIAL_MAX_SCORE
+from forms import SubjectActivitiesConfigForm, GradeChangeRequestForm, GradeImportForm
+from decorators import teacher_required
+from announcements import announcements_page
+from grade_import import import_grades_csv
+from activity_config import sync_activity_configs, subject_activities
+from conditional import conditional_page
+from versions import subject_grades_key, subject_key, SUBJECTS_KEY, ANNOUNCEMENTS_KEY
+
+teacher_bp = Blueprint('teacher', __name__)
+
+# --- Dashboard de Profesor ---
+@teacher_bp.route('/profesor/dashboard')
+@login_required
+@teacher_required 
+@conditional_page(lambda: [SUBJECTS_KEY, ANNOUNCEMENTS_KEY])
+def teacher_dashboard():
+    profesor = current_user
+    
+    subjects_taught = Subject.query.filter_by(teacher_id=profesor.id).all()
+    
+    relevant_announcements = announcements_page('Profesor')
+    
+    current_year = datetime.now().year
+    return render_template('profesores/teacher_dashboard.html',
+                           profesor=profesor,
+                           subjects_taught=subjects_taught,
+                           relevant_announcements=relevant_announcements,
+                           title=f'Dashboard de {profesor.first_name}',
+                           current_year=current_year)
+
+
+# --- Ruta: Configuración de Actividades para una Asignatura (Profesor) ---
+@teacher_bp.route('/profesor/asignatura/<int:subject_id>/configurar_actividades', methods=['GET', 'POST'])
+@login_required
+@teacher_required
+def teacher_configure_subject_activities(subject_id):
+    subject = Subject.query.get_or_404(subject_id)
+
+    if subject.teacher_id != current_user.id:
+        flash('No tienes permiso para configurar esta asignatura.', 'danger')
+        return redirect(url_for('teacher.teacher_dashboard'))
+
+    form = SubjectActivitiesConfigForm()
+
+    if request.method == 'GET':
+        existing_configs = subject_activities(subject.id).activities
+        
+        while len(form.activities) > 0:
+            form.activities.pop_entry()
+
+        for config in existing_configs:
+            activity_entry = form.activities.append_entry()
+            activity_entry.form.id.data = config.id
+            activity_entry.form.unit_number.data = config.unit_number
+            activity_entry.form.activity_name.data = config.activity_name
+            activity_entry.form.max_score.data = config.max_score
+        
+        if not existing_configs:
+            for _ in range(4): 
+                form.activities.append_entry()
+
+    if form.validate_on_submit():
+        submitted = [
+            {'id': entry_form.form.id.data,
+             'unit_number': entry_form.form.unit_number.data,
+             'activity_name': entry_form.form.activity_name.data.strip(),
+             'max_score': entry_form.form.max_score.data}
+            for entry_form in form.activities.entries
+            if entry_form.form.activity_name.data and entry_form.form.max_score.data is not None
+        ]
+        try:
+            result = sync_activity_configs(subject.id, submitted)
+        except ValueError as e:
+            flash(str(e), 'danger')
+            return redirect(url_for('teacher.teacher_configure_subject_activities', subject_id=subject.id))
+
+        for config_id in result.invalid_ids:
+            flash(f'Error: Intento de modificar una configuración no válida con ID {config_id}.', 'warning')
+        if result.grades_moved:
+            flash(f'{result.grades_moved} notas de zona se actualizaron con el nuevo nombre o unidad de su actividad.', 'info')
+        flash('Configuración de actividades guardada exitosamente!', 'success')
+        return redirect(url_for('teacher.teacher_dashboard'))
+    
+    current_year = datetime.now().year
+    return render_template('profesores/configure_activities.html',
+                           title=f'Configurar Actividades: {subject.name}',
+                           subject=subject,
+                           form=form,
+                           current_year=current_year)
+
+
+# --- Ruta para Profesor: Gestionar Notas de una Asignatura ---
+# ESTA ES LA RUTA PRINCIPAL PARA LA GESTIÓN DE NOTAS DEL PROFESOR
+@teacher_bp.route('/profesor/asignatura/<int:subject_id>/gestionar_notas')
+@login_required
+@teacher_required
+@conditional_page(lambda subject_id: [subject_grades_key(subject_id), subject_key(subject_id)])
+def teacher_manage_grades(subject_id):
+    subject = Subject.query.get_or_404(subject_id)
+
+    if subject.teacher_id != current_user.id:
+        flash('No tienes permiso para gestionar notas en esta asignatura.', 'danger')
+        return redirect(url_for('teacher.teacher_dashboard'))
+
+    # Estudiantes inscritos en una sola consulta (JOIN con Enrollment), sin cargas perezosas por inscripción
+    enrolled_students = User.query.join(Enrollment, Enrollment.student_id == User.id).filter(
+        Enrollment.subject_id == subject.id
+    ).order_by(User.last_name, User.first_name).all()
+
+    configured_activities = subject_activities(subject.id).activities
+
+    # Todas las notas de la asignatura en una sola consulta; la matriz se arma en memoria
+    subject_grades = Grade.query.filter_by(subject_id=subject.id).order_by(
+        Grade.student_id, Grade.activity_name, Grade.id).all()
+
+    zona_grades = {}
+    parciales_by_student = {}
+    for grade in subject_grades:
+        if grade.component_type == 'Zona':
+            # Se conserva la primera nota encontrada, igual que el antiguo .first()
+            zona_grades.setdefault((grade.student_id, grade.unit_number, grade.activity_name), grade)
+        elif grade.component_type == 'Parcial':
+            parciales_by_student.setdefault(grade.student_id, []).append(grade)
+
+    grades_data = {}
+    for student in enrolled_students:
+        grades_data[student.id] = {}
+        for activity_config in configured_activities:
+            grades_data[student.id][activity_config.id] = zona_grades.get(
+                (student.id, activity_config.unit_number, activity_config.activity_name))
+        grades_data[student.id]['parciales'] = parciales_by_student.get(student.id, [])
+
+
+    current_year = datetime.now().year
+    return render_template('profesores/manage_grades.html',
+                           title=f'Gestionar Notas: {subject.name}',
+                           subject=subject,
+                           enrolled_students=enrolled_students,
+                           configured_activities=configured_activities,
+                           grades_data=grades_data,
+                           current_year=current_year)
+
+
+# --- NUEVA RUTA: Profesor importa notas desde un archivo CSV ---
+@teacher_bp.route('/profesor/asignatura/<int:subject_id>/importar_notas', methods=['GET', 'POST'])
+@login_required
+@teacher_required
+def teacher_import_grades(subject_id):
+    subject = Subject.query.get_or_404(subject_id)
+
+    if subject.teacher_id != current_user.id:
+        flash('No tienes permiso para importar notas en esta asignatura.', 'danger')
+        return redirect(url_for('teacher.teacher_dashboard'))
+
+    form = GradeImportForm()
+    report = None
+    if form.validate_on_submit():
+        # El archivo se procesa como flujo de texto, fila por fila
+        stream = io.TextIOWrapper(form.csv_file.data.stream, encoding='utf-8-sig', newline='')
+        report = import_grades_csv(subject, stream)
+        if report.inserted:
+            flash(f'Se importaron {report.inserted} notas.', 'success')
+        if report.errors:
+            flash(f'{len(report.errors)} filas no se importaron. Revisa el detalle.', 'warning')
+
+    current_year = datetime.now().year
+    return render_template('profesores/import_grades.html',
+                           title=f'Importar Notas: {subject.name}',
+                           subject=subject,
+                           form=form,
+                           report=report,
+                           current_year=current_year)
+
+
+# --- NUEVA RUTA: Profesor solicita añadir/editar nota ---
+# El profesor ya NO puede añadir/editar directamente, debe solicitar.
+@teacher_bp.route('/profesor/asignatura/<int:subject_id>/estudiante/<int:student_id>/solicitar_nota', methods=['GET', 'POST'])
+@teacher_bp.route('/profesor/asignatura/<int:subject_id>/estudiante/<int:student_id>/solicitar_nota/<int:grade_id>', methods=['GET', 'POST'])
+@login_required
+@teacher_required
+def teacher_request_grade_change(subject_id, student_id, grade_id=None):
+    subject = Subject.query.get_or_404(subject_id)
+    student = User.query.get_or_404(student_id)
+
+    if subject.teacher_id != current_user.id:
+        flash('No tienes permiso para gestionar notas en esta asignatura.', 'danger')
+        return redirect(url_for('teacher.teacher_dashboard'))
+
+    enrollment = Enrollment.query.filter_by(student_id=student.id, subject_id=subject.id).first()
+    if not enrollment:
+        flash('El estudiante no está inscrito en esta asignatura.', 'danger')
+        return redirect(url_for('teacher.teacher_manage_grades', subject_id=subject.id))
+
+    grade_to_change = None
+    original_value = None
+    if grade_id:
+        grade_to_change = Grade.query.get_or_404(grade_id)
+        if grade_to_change.subject_id != subject.id or grade_to_change.student_id != student.id:
+            flash('Nota no válida para esta asignatura o estudiante.', 'danger')
+            return redirect(url_for('teacher.teacher_manage_grades', subject_id=subject.id))
+        original_value = grade_to_change.value
+        form = GradeChangeRequestForm(obj=grade_to_change) # Pre-rellena algunos campos si es edición
+        form.request_type.data = 'edit' # Asegura que el tipo de solicitud es edición
+        form.grade_id.data = grade_to_change.id # Pasa el ID de la nota a cambiar
+        title = 'Solicitar Edición de Nota'
+    else:
+        # Si no hay grade_id, es una solicitud para AÑADIR una nueva nota (en realidad, se edita a 0 y luego se cambia)
+        # O es una solicitud para añadir una nota completamente nueva (no un cambio de una existente).
+        # Para simplificar el flujo con GradeChangeRequest, vamos a asumir que para "añadir",
+        # el profesor primero debería haber puesto un 0 (o una nota temporal) para luego "editarla" formalmente.
+        # Si la nota no existe, el profesor DEBE crearla con un valor temporal (ej. 0) antes de solicitar un cambio.
+        # Por ahora, esta ruta es primariamente para CAMBIAR/EDITAR una nota EXISTENTE.
+        # Para "añadir nueva", necesitaríamos una lógica diferente o que se añada primero con valor 0.
+        # Si el profesor quiere añadir una nota que no existe, no puede usar esta ruta directamente como "editar".
+        
+        # Para el propósito de esta solicitud, esta ruta es para EDITAR o ELIMINAR una nota existente.
+        # La funcionalidad de 'añadir' una nota inicial se puede hacer mediante una ruta separada
+        # que permita al profesor registrar una nota (inicialmente con 0 o N/A) y luego la edita.
+        
+        flash("Para añadir una nota por primera vez, utiliza la opción de 'Añadir Nueva Nota' (se implementará por separado). Esta función es para editar o eliminar notas existentes.", "info")
+        return redirect(url_for('teacher.teacher_manage_grades', subject_id=subject.id))
+        
+        # Originalmente (sin solicitud de admin), aquí se añadía la nota directamente:
+        # form = GradeForm()
+        # title = 'Añadir Nueva Nota'
+        # if request.method == 'GET':
+        #     form.student.data = student
+
+    # Aquí poblaríamos las opciones dinámicamente si fuese un GradeForm directo.
+    # Para GradeChangeRequestForm, el foco es el `grade_id`, `request_type`, `new_value`, `reason`.
+    
+    # Se debe deshabilitar o pre-seleccionar los campos de estudiante y asignatura
+    form.student_id.data = student.id # Esto es un HiddenField, se establece el ID
+    form.subject_id.data = subject.id # Esto es un HiddenField, se establece el ID
+
+    if form.validate_on_submit():
+        if grade_to_change is None:
+            # Esto no debería pasar si la lógica de arriba redirige para "añadir nueva"
+            flash('Error: No se encontró la nota a modificar.', 'danger')
+            return redirect(url_for('teacher.teacher_manage_grades', subject_id=subject.id))
+
+        req_type = form.request_type.data
+        new_val = form.new_value.data if req_type == 'edit' else None
+
+        # Validar que si es edición, el nuevo valor no exceda el máximo de la actividad
+        if req_type == 'edit':
+            max_score_for_activity = subject_activities(grade_to_change.subject_id).max_scores.get(
+                (grade_to_change.unit_number, grade_to_change.activity_name))
+            if max_score_for_activity is None and grade_to_change.component_type == 'Parcial':
+                max_score_for_activity = PARCIAL_MAX_SCORE # Valor fijo para parciales
+            
+            if max_score_for_activity is not None and new_val > max_score_for_activity:
+                flash(f'El nuevo valor ({new_val}) excede el punteo máximo de la actividad ({max_score_for_activity}).', 'danger')
+                return render_template('profesores/request_grade_change.html', 
+                                       title=title, 
+                                       subject=subject, 
+                                       student=student, 
+                                       grade=grade_to_change, 
+                                       original_value=original_value,
+                                       form=form, 
+                                       current_year=datetime.now().year)
+            
+            if new_val == original_value:
+                flash('El nuevo valor es igual al valor original. No se necesita una solicitud de cambio.', 'info')
+                return redirect(url_for('teacher.teacher_manage_grades', subject_id=subject.id))
+
+
+        new_request = GradeChangeRequest(
+            grade_id=grade_to_change.id,
+            requested_by_user_id=current_user.id,
+            reason=form.reason.data,
+            request_type=req_type,
+            new_value=new_val,
+            status='pending' # Siempre inicia como pendiente
+        )
+        db.session.add(new_request)
+        db.session.commit()
+        flash('Solicitud de cambio de nota enviada a administración.', 'success')
+        return redirect(url_for('teacher.teacher_manage_grades', subject_id=subject.id))
+
+    current_year = datetime.now().year
+    return render_template('profesores/request_grade_change.html',
+                           title=title,
+                           subject=subject,
+                           student=student,
+                           grade=grade_to_change, # Pasa el objeto grade_to_change para acceder a sus datos
+                           original_value=original_value,
+                           form=form,
+                           current_year=current_year)
+
+
+# --- ELIMINADA: Ruta directa para Añadir/Editar Nota Individual (ahora es solicitud) ---
+# Ya no es @teacher_bp.route('/profesor/asignatura/<int:subject_id>/estudiante/<int:student_id>/nota', methods=['GET', 'POST'])
+# Ya no es @teacher_bp.route('/profesor/asignatura/<int:subject_id>/estudiante/<int:student_id>/nota/<int:grade_id>/editar', methods=['GET', 'POST'])
+# La lógica ha sido reemplazada por teacher_request_grade_change
+
+# --- ELIMINADA: Ruta directa para Eliminar Nota (ahora es solicitud) ---
+# Ya no es @teacher_bp.route('/profesor/nota/<int:grade_id>/eliminar', methods=['POST'])
+# La lógica ha sido reemplazada por teacher_request_grade_change
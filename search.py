@@ -0,0 +1,84 @@
+# search.py
+
+# Búsqueda por prefijo (typeahead) de estudiantes y asignaturas.
+# Cada término se busca como rango sobre una columna normalizada (models.search_key: minúsculas
+# Unicode y sin tildes, escrita al guardar cada usuario o asignatura): `col >= 'alv' AND col < 'alw'`.
+# Ese rango lo resuelven los índices ix_user_role_*_search e ix_subject_*_search (LIKE 'alv%' no
+# usaría el índice en SQLite), y cada consulta devuelve como máximo `limit` filas. Los términos se
+# normalizan igual: 'Álvarez', 'ÁLVAREZ' y 'alvarez' encuentran el mismo apellido.
+
+from sqlalchemy import select, and_, or_
+from extensions import db
+from models import User, Subject, Enrollment, search_key
+
+SEARCH_MIN_CHARS = 2 # Con un solo carácter el rango abarca demasiadas filas
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 25
+
+
+def _tokens(term):
+    return [token for token in (search_key(word) for word in (term or '').split()) if token][:3]
+
+
+def _prefix_range(expression, prefix):
+    # El límite superior es el prefijo con su último carácter incrementado: 'mar' -> 'mas'
+    upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+    return and_(expression >= prefix, expression < upper)
+
+
+def _matches_any(columns, token, *conditions):
+    # `conditions` se repiten dentro de cada rama del OR: así SQLite resuelve cada rama con su
+    # índice (role, col) y une los resultados (MULTI-INDEX OR) en lugar de recorrer el rol entero
+    return or_(*(and_(*conditions, _prefix_range(column, token)) for column in columns))
+
+
+def clamp_limit(limit):
+    return max(1, min(limit or DEFAULT_LIMIT, MAX_LIMIT))
+
+
+def student_label(student):
+    return f'{student.first_name} {student.last_name} ({student.username})'
+
+
+def subject_label(subject):
+    return f'{subject.name} ({subject.code})'
+
+
+def search_students(term, limit=DEFAULT_LIMIT, teacher_id=None, subject_id=None):
+    """Estudiantes cuyo usuario, nombre o apellido empieza por cada palabra de `term`.
+
+    Con `teacher_id` solo se devuelven estudiantes inscritos en asignaturas de ese profesor;
+    con `subject_id`, solo los inscritos en esa asignatura.
+    """
+    tokens = _tokens(term)
+    if not tokens or len(tokens[0]) < SEARCH_MIN_CHARS:
+        return []
+    columns = (User.username_search, User.first_name_search, User.last_name_search)
+    query = select(User.id, User.username, User.first_name, User.last_name).where(
+        _matches_any(columns, tokens[0], User.role == 'Estudiante'))
+    for token in tokens[1:]:
+        query = query.where(_matches_any(columns, token))
+    if teacher_id is not None or subject_id is not None:
+        enrolled = select(Enrollment.student_id)
+        if teacher_id is not None:
+            enrolled = enrolled.join(Subject, Subject.id == Enrollment.subject_id).where(Subject.teacher_id == teacher_id)
+        if subject_id is not None:
+            enrolled = enrolled.where(Enrollment.subject_id == subject_id)
+        query = query.where(User.id.in_(enrolled))
+    rows = db.session.execute(
+        query.order_by(User.last_name, User.first_name, User.id).limit(clamp_limit(limit)))
+    return [{'id': row.id, 'label': student_label(row)} for row in rows]
+
+
+def search_subjects(term, limit=DEFAULT_LIMIT, teacher_id=None):
+    """Asignaturas cuyo nombre o código empieza por cada palabra de `term`."""
+    tokens = _tokens(term)
+    if not tokens or len(tokens[0]) < SEARCH_MIN_CHARS:
+        return []
+    query = select(Subject.id, Subject.name, Subject.code)
+    for token in tokens:
+        query = query.where(_matches_any((Subject.name_search, Subject.code_search), token))
+    if teacher_id is not None:
+        query = query.where(Subject.teacher_id == teacher_id)
+    rows = db.session.execute(query.order_by(Subject.name, Subject.id).limit(clamp_limit(limit)))
+    return [{'id': row.id, 'label': subject_label(row)} for row in rows]
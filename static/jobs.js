@@ -0,0 +1,52 @@
+// static/jobs.js
+// Progreso de los trabajos en segundo plano (jobs.py): cada elemento con data-job-status-url
+// consulta ese endpoint JSON cada pocos segundos y actualiza su barra, estado y mensaje.
+// Al terminar el trabajo recarga la página (data-job-reload) para mostrar el resultado.
+(function () {
+    var INTERVAL_MS = 2000;
+
+    function setup(element) {
+        var bar = element.querySelector('[data-job-bar]');
+        var percent = element.querySelector('[data-job-percent]');
+        var status = element.querySelector('[data-job-status]');
+        var message = element.querySelector('[data-job-message]');
+
+        function update(data) {
+            if (bar) {
+                bar.style.width = data.progress + '%';
+            }
+            if (percent) {
+                percent.textContent = data.progress + '%';
+            }
+            if (status) {
+                status.textContent = data.status_label;
+            }
+            if (message) {
+                message.textContent = data.message || '';
+            }
+        }
+
+        function poll() {
+            fetch(element.dataset.jobStatusUrl, {credentials: 'same-origin', headers: {'Accept': 'application/json'}})
+                .then(function (response) { return response.ok ? response.json() : null; })
+                .then(function (data) {
+                    if (!data) {
+                        return; // Sesión vencida o trabajo eliminado: se deja de consultar
+                    }
+                    update(data);
+                    if (!data.finished) {
+                        setTimeout(poll, INTERVAL_MS);
+                    } else if (element.hasAttribute('data-job-reload')) {
+                        window.location.reload();
+                    }
+                })
+                .catch(function () { setTimeout(poll, INTERVAL_MS * 2); });
+        }
+
+        setTimeout(poll, INTERVAL_MS);
+    }
+
+    document.addEventListener('DOMContentLoaded', function () {
+        document.querySelectorAll('[data-job-status-url]').forEach(setup);
+    });
+})();
@@ -0,0 +1,49 @@
+// static/typeahead.js
+// Cuadros de búsqueda de los campos ModelIdField (forms.py): consultan el endpoint JSON
+// mientras se escribe y guardan el ID elegido en el input oculto que se envía con el formulario.
+(function () {
+    function setup(input) {
+        var hidden = document.getElementById(input.dataset.typeaheadFor);
+        var list = document.getElementById(input.list.id);
+        var minChars = parseInt(input.dataset.typeaheadMin, 10) || 2;
+        var ids = {}; // Etiqueta mostrada -> ID
+        var timer = null;
+        var pending = null;
+
+        function search() {
+            var term = input.value.trim();
+            if (term.length < minChars) {
+                return;
+            }
+            if (pending) {
+                pending.abort(); // Solo interesa la respuesta de lo último que se escribió
+            }
+            pending = new AbortController();
+            var url = input.dataset.typeaheadUrl + (input.dataset.typeaheadUrl.indexOf('?') < 0 ? '?' : '&') +
+                'q=' + encodeURIComponent(term);
+            fetch(url, {credentials: 'same-origin', signal: pending.signal})
+                .then(function (response) { return response.ok ? response.json() : {results: []}; })
+                .then(function (data) {
+                    list.innerHTML = '';
+                    data.results.forEach(function (item) {
+                        ids[item.label] = item.id;
+                        var option = document.createElement('option');
+                        option.value = item.label;
+                        list.appendChild(option);
+                    });
+                })
+                .catch(function () {});
+        }
+
+        input.addEventListener('input', function () {
+            // El ID solo es válido si el texto coincide exactamente con una opción sugerida
+            hidden.value = ids.hasOwnProperty(input.value) ? ids[input.value] : '';
+            clearTimeout(timer);
+            timer = setTimeout(search, 200);
+        });
+    }
+
+    document.addEventListener('DOMContentLoaded', function () {
+        document.querySelectorAll('input[data-typeahead-for]').forEach(setup);
+    });
+})();
@@ -0,0 +1,217 @@
+# synthetic_data.py
+
+# Generador de un colegio sintético a escala real para medir rendimiento (ver benchmark.py).
+# A diferencia de init_db.py, que crea un puñado de filas con el ORM, aquí las filas se
+# insertan con INSERT de Core en lotes (executemany) y con IDs asignados de antemano, así las
+# claves foráneas se arman sin volver a leer lo insertado. GradeSummary se reconstruye una sola
+# vez al final con rebuild_summaries y el historial con record_grade_rows (los INSERT de Core no
+# pasan por el evento after_flush).
+#
+#   flask --app "app:create_app(web=False)" generate-synthetic-data --students 10000 --subjects 400
+#
+# Con los valores por defecto: 10.000 estudiantes, 400 asignaturas, 6 actividades de zona por
+# asignatura (el máximo del formulario de configuración) más un parcial por unidad y 8 asignaturas
+# por estudiante: 800.000 notas. Con --subjects-per-student 20 se llega a 2 millones.
+
+import random
+from datetime import datetime, timedelta
+from sqlalchemy import select, insert, func
+from extensions import db
+from models import (User, GradeLevel, Subject, Grade, Announcement, Enrollment, SubjectActivityConfig,
+                    GradeChangeRequest, GradeSummary, subject_grade_level_association)
+from passwords import hash_password
+from grade_summary import rebuild_summaries
+from ledger import record_grade_rows
+
+UNITS = ['Unidad I', 'Unidad II', 'Unidad III', 'Unidad IV']
+ZONA_POINTS = 60 # Puntos de zona por unidad, repartidos entre sus actividades
+PARCIAL_POINTS = 40
+USERNAME_PREFIX = 'syn.' # Todos los usuarios sintéticos; benchmark.py los busca por este prefijo
+SYNTHETIC_PASSWORD = 'sintetico123' # Una sola contraseña (y un solo hash) para todos los usuarios sintéticos
+GRADE_LEVEL_NAMES = ['Primero Básico', 'Segundo Básico', 'Tercero Básico', 'Cuarto Bachillerato', 'Quinto Bachillerato']
+SCHOOL_YEAR_START = datetime(2025, 1, 15)
+DEFAULT_BATCH_SIZE = 20000
+
+
+class SyntheticReport:
+    """Filas insertadas por tabla."""
+
+    def __init__(self):
+        self.counts = {}
+
+    def add(self, table, rows):
+        self.counts[table] = self.counts.get(table, 0) + rows
+
+
+def _next_id(model):
+    return (db.session.execute(select(func.max(model.id))).scalar() or 0) + 1
+
+
+def _insert_batches(table, rows, batch_size, report, progress):
+    """Inserta `rows` (un iterable de dicts) en lotes de `batch_size`; un commit por lote."""
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            db.session.execute(insert(table), batch)
+            db.session.commit()
+            report.add(table.name, len(batch))
+            if progress:
+                progress(table.name, report.counts[table.name])
+            batch = []
+    if batch:
+        db.session.execute(insert(table), batch)
+        db.session.commit()
+        report.add(table.name, len(batch))
+        if progress:
+            progress(table.name, report.counts[table.name])
+
+
+def _activity_plan(activities):
+    """Actividades de zona de cada asignatura: (unidad, número, nombre, punteo máximo)."""
+    plan = []
+    for unit_index, unit in enumerate(UNITS):
+        # Reparto lo más parejo posible de `activities` entre las unidades
+        count = activities // len(UNITS) + (1 if unit_index < activities % len(UNITS) else 0)
+        for number in range(1, count + 1):
+            plan.append((unit, number, f'Actividad {number}', round(ZONA_POINTS / count, 2)))
+    return plan
+
+
+def generate_school(students=10000, teachers=200, admins=3, subjects=400, activities=6,
+                    subjects_per_student=8, change_requests=500, announcements=60,
+                    seed=1, batch_size=DEFAULT_BATCH_SIZE, progress=None):
+    """Agrega un colegio sintético a la base actual (no borra nada) y devuelve un SyntheticReport.
+
+    Es determinista para un mismo `seed` y una misma base de partida. `progress(tabla, filas)`
+    se llama después de cada lote insertado.
+    """
+    rng = random.Random(seed)
+    report = SyntheticReport()
+    password_hash = hash_password(SYNTHETIC_PASSWORD)
+
+    # --- Niveles de grado (se reutilizan los existentes) ---
+    levels = {row.name: row.id for row in db.session.execute(select(GradeLevel.id, GradeLevel.name))}
+    missing = [name for name in GRADE_LEVEL_NAMES if name not in levels]
+    if missing:
+        _insert_batches(GradeLevel.__table__, ({'name': name} for name in missing), batch_size, report, progress)
+        levels = {row.name: row.id for row in db.session.execute(select(GradeLevel.id, GradeLevel.name))}
+    level_ids = [levels[name] for name in GRADE_LEVEL_NAMES]
+
+    # --- Usuarios: administradores, profesores y estudiantes con IDs consecutivos ---
+    next_user_id = _next_id(User)
+    admin_ids = list(range(next_user_id, next_user_id + admins))
+    teacher_ids = list(range(next_user_id + admins, next_user_id + admins + teachers))
+    student_ids = list(range(next_user_id + admins + teachers, next_user_id + admins + teachers + students))
+    first_names = ['Ana', 'Luis', 'María', 'José', 'Sofía', 'Carlos', 'Lucía', 'Diego', 'Elena', 'Pedro']
+    last_names = ['García', 'López', 'Pérez', 'González', 'Rodríguez', 'Hernández', 'Morales', 'Castillo']
+
+    def user_rows():
+        for role, letter, ids in (('Administrador', 'a', admin_ids), ('Profesor', 'p', teacher_ids),
+                                  ('Estudiante', 'e', student_ids)):
+            for user_id in ids:
+                username = f'{USERNAME_PREFIX}{letter}{user_id}'
+                yield {'id': user_id, 'username': username, 'email': f'{username}@sintetico.school',
+                       'password': password_hash, 'role': role,
+                       'first_name': rng.choice(first_names), 'last_name': rng.choice(last_names)}
+
+    _insert_batches(User.__table__, user_rows(), batch_size, report, progress)
+
+    # --- Asignaturas, cada una con un nivel y un profesor ---
+    first_subject_id = _next_id(Subject)
+    subject_ids = list(range(first_subject_id, first_subject_id + subjects))
+    subject_level = {subject_id: level_ids[index % len(level_ids)] for index, subject_id in enumerate(subject_ids)}
+    _insert_batches(Subject.__table__, (
+        {'id': subject_id, 'name': f'Asignatura {subject_id}', 'code': f'SYN{subject_id}',
+         'description': 'Asignatura generada para pruebas de rendimiento.',
+         'teacher_id': teacher_ids[index % len(teacher_ids)] if teacher_ids else None}
+        for index, subject_id in enumerate(subject_ids)), batch_size, report, progress)
+    _insert_batches(subject_grade_level_association, (
+        {'subject_id': subject_id, 'grade_level_id': level_id} for subject_id, level_id in subject_level.items()),
+        batch_size, report, progress)
+
+    plan = _activity_plan(activities)
+    _insert_batches(SubjectActivityConfig.__table__, (
+        {'subject_id': subject_id, 'unit_number': unit, 'activity_number': number,
+         'activity_name': name, 'max_score': max_score}
+        for subject_id in subject_ids for unit, number, name, max_score in plan), batch_size, report, progress)
+
+    # --- Inscripciones: cada estudiante en asignaturas de su nivel ---
+    subjects_by_level = {level_id: [] for level_id in level_ids}
+    for subject_id, level_id in subject_level.items():
+        subjects_by_level[level_id].append(subject_id)
+    enrollments = []
+    for index, student_id in enumerate(student_ids):
+        pool = subjects_by_level[level_ids[index % len(level_ids)]]
+        for subject_id in rng.sample(pool, min(subjects_per_student, len(pool))):
+            enrollments.append((student_id, subject_id))
+    _insert_batches(Enrollment.__table__, (
+        {'student_id': student_id, 'subject_id': subject_id, 'enrollment_date': SCHOOL_YEAR_START}
+        for student_id, subject_id in enrollments), batch_size, report, progress)
+
+    # --- Notas: todas las actividades de zona y el parcial de cada unidad, por inscripción ---
+    first_grade_id = _next_id(Grade)
+    plan_by_unit = {unit: [item for item in plan if item[0] == unit] for unit in UNITS}
+
+    def grade_rows():
+        grade_id = first_grade_id
+        for student_id, subject_id in enrollments:
+            for unit_index, unit in enumerate(UNITS):
+                unit_date = SCHOOL_YEAR_START + timedelta(days=60 * unit_index)
+                for position, (_, _, name, max_score) in enumerate(plan_by_unit[unit]):
+                    posted = unit_date + timedelta(days=position, minutes=rng.randrange(600))
+                    yield {'id': grade_id, 'student_id': student_id, 'subject_id': subject_id,
+                           'value': round(rng.uniform(max_score * 0.4, max_score), 2), 'description': name,
+                           'date_posted': posted, 'date_recorded': posted, 'activity_name': name,
+                           'unit_number': unit, 'component_type': 'Zona'}
+                    grade_id += 1
+                posted = unit_date + timedelta(days=55)
+                yield {'id': grade_id, 'student_id': student_id, 'subject_id': subject_id,
+                       'value': round(rng.uniform(PARCIAL_POINTS * 0.4, PARCIAL_POINTS), 2),
+                       'description': f'Examen Parcial {unit}', 'date_posted': posted, 'date_recorded': posted,
+                       'activity_name': 'Examen Parcial', 'unit_number': unit, 'component_type': 'Parcial'}
+                grade_id += 1
+
+    _insert_batches(Grade.__table__, grade_rows(), batch_size, report, progress)
+    grade_count = report.counts.get(Grade.__table__.name, 0)
+    # Eventos de alta en el historial (ledger.py) con la fecha de carga de cada nota, en una sentencia
+    record_grade_rows(db.session.connection(), 'created', Grade.id >= first_grade_id,
+                      occurred_at=Grade.date_recorded)
+    db.session.commit()
+
+    # GradeSummary completo de una vez con INSERT ... SELECT (los INSERT de Core no disparan after_flush)
+    rebuild_summaries(db.session)
+    db.session.commit()
+    report.add(GradeSummary.__table__.name, db.session.execute(select(func.count(GradeSummary.id))).scalar())
+    if progress:
+        progress(GradeSummary.__table__.name, report.counts[GradeSummary.__table__.name])
+
+    # --- Solicitudes de cambio (pendientes y ya resueltas) y anuncios ---
+    if grade_count and teacher_ids:
+        teacher_of = {subject_id: teacher_ids[index % len(teacher_ids)] for index, subject_id in enumerate(subject_ids)}
+        grades_per_enrollment = len(plan) + len(UNITS)
+
+        def request_rows():
+            for number in range(change_requests):
+                offset = rng.randrange(grade_count)
+                student_id, subject_id = enrollments[offset // grades_per_enrollment]
+                status = rng.choice(['pending', 'pending', 'approved', 'rejected'])
+                request_type = 'edit' if rng.random() < 0.8 else 'delete'
+                requested = SCHOOL_YEAR_START + timedelta(days=rng.randrange(240), minutes=number)
+                yield {'grade_id': first_grade_id + offset, 'requested_by_user_id': teacher_of[subject_id],
+                       'reason': 'Corrección solicitada (dato sintético).', 'request_type': request_type,
+                       'new_value': round(rng.uniform(0, 10), 2) if request_type == 'edit' else None,
+                       'status': status, 'request_date': requested,
+                       'approved_by_user_id': admin_ids[0] if status != 'pending' and admin_ids else None,
+                       'approval_date': requested + timedelta(days=1) if status != 'pending' else None}
+
+        _insert_batches(GradeChangeRequest.__table__, request_rows(), batch_size, report, progress)
+
+    if admin_ids:
+        _insert_batches(Announcement.__table__, (
+            {'title': f'Anuncio {number + 1}', 'content': 'Contenido de un anuncio generado para pruebas.',
+             'date_posted': SCHOOL_YEAR_START + timedelta(days=number), 'user_id': admin_ids[0],
+             'target_role': ['Todos', 'Estudiante', 'Profesor'][number % 3]}
+            for number in range(announcements)), batch_size, report, progress)
+
+    return report
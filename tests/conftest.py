@@ -0,0 +1,118 @@
+# tests/conftest.py
+
+# Aplicación sobre SQLite en memoria (una sola conexión compartida) y contador de sentencias SQL.
+
+import os
+import sys
+
+import pytest
+from flask import g, request_started
+from sqlalchemy import event
+from sqlalchemy.pool import StaticPool
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import create_app
+from config import Config, ENGINE_PROFILES
+from extensions import db
+from models import User
+
+
+class TestConfig(Config):
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = 'sqlite://'
+    DB_PROFILE = 'sqlite'
+    SQLALCHEMY_ENGINE_OPTIONS = {'poolclass': StaticPool, 'connect_args': {'check_same_thread': False}}
+    WTF_CSRF_ENABLED = False
+
+
+def _fresh_request_globals(sender, **extra):
+    # Las pruebas mantienen un contexto de aplicación abierto y las peticiones del cliente lo
+    # reutilizan: sin esto, `g` (p. ej. el usuario que guarda Flask-Login) pasaría de una a otra
+    for name in list(vars(g)):
+        delattr(g, name)
+
+
+def _testing_app(config_class):
+    app = create_app(config_class)
+    request_started.connect(_fresh_request_globals, app)
+    return app
+
+
+@pytest.fixture
+def app(tmp_path):
+    TestConfig.JOB_RESULTS_DIR = str(tmp_path / 'job_results')
+    app = _testing_app(TestConfig)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def file_app(tmp_path):
+    """Como `app` pero sobre un archivo: cada hilo usa su propia conexión (pruebas de concurrencia)."""
+    class FileTestConfig(TestConfig):
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{tmp_path / "test.db"}'
+        SQLALCHEMY_ENGINE_OPTIONS = ENGINE_PROFILES['sqlite']
+        JOB_RESULTS_DIR = str(tmp_path / 'job_results')
+    app = _testing_app(FileTestConfig)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def make_user():
+    """`make_user(username, role, **valores)` construye un User (sin agregarlo a la sesión) con
+    correo, contraseña y nombre de relleno; `valores` reemplaza cualquiera de ellos."""
+    def new_user(username, role='Estudiante', **values):
+        values = dict({'email': f'{username}@school.test', 'password': 'x', 'first_name': username.capitalize(),
+                       'last_name': 'Prueba'}, **values)
+        return User(username=username, role=role, **values)
+    return new_user
+
+
+@pytest.fixture
+def login(client):
+    """Inicia sesión con el usuario dado sin pasar por el hash de la contraseña."""
+    def login_as(user):
+        with client.session_transaction() as sess:
+            sess['_user_id'] = str(user.id)
+            sess['_fresh'] = True
+    return login_as
+
+
+class StatementCounter:
+    def __init__(self, engine):
+        self.engine = engine
+        self.count = 0
+        self.statements = []
+
+    def _count(self, conn, cursor, statement, parameters, context, executemany):
+        self.count += 1
+        self.statements.append((statement, parameters))
+
+    def __enter__(self):
+        self.count = 0
+        self.statements = []
+        event.listen(self.engine, 'before_cursor_execute', self._count)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.engine, 'before_cursor_execute', self._count)
+
+
+@pytest.fixture
+def count_statements(app):
+    """`with count_statements() as counter: ...` deja en counter.count las sentencias ejecutadas
+    y en counter.statements cada una con sus parámetros."""
+    return lambda: StatementCounter(db.engine)
@@ -0,0 +1,52 @@
+# tests/test_activity_config.py
+
+# Configuración de actividades por asignatura (activity_config.subject_activities): en las páginas
+# con conditional_page, la versión de la asignatura ya leída para el ETag se reutiliza.
+
+import pytest
+
+from extensions import db
+from models import Subject, Enrollment, SubjectActivityConfig
+from cache import get_version
+from versions import subject_changed, subject_key
+
+
+def _seed_subject(make_user):
+    teacher, student = make_user('profesor', 'Profesor'), make_user('alumno')
+    db.session.add_all([teacher, student])
+    db.session.commit()
+    subject = Subject(name='Física', code='FIS1', teacher_id=teacher.id)
+    db.session.add(subject)
+    db.session.commit()
+    db.session.add_all([Enrollment(student_id=student.id, subject_id=subject.id),
+                        SubjectActivityConfig(subject_id=subject.id, unit_number='Unidad I', activity_number=1,
+                                              activity_name='Tarea 1', max_score=10)])
+    db.session.commit()
+    return teacher, student, subject
+
+
+@pytest.mark.parametrize('role, url', [('teacher', '/profesor/asignatura/{}/gestionar_notas'),
+                                       ('student', '/estudiante/asignatura/{}/mis_notas')])
+def test_cache_hit_reuses_page_versions(client, login, make_user, count_statements, role, url):
+    teacher, student, subject = _seed_subject(make_user)
+    login(teacher if role == 'teacher' else student)
+    url = url.format(subject.id)
+    assert client.get(url).status_code == 200 # Llena la caché del proceso
+
+    with count_statements() as counter:
+        response = client.get(url)
+    assert response.status_code == 200
+    assert b'Tarea 1' in response.data
+    tables = [statement for statement, _ in counter.statements
+              if 'cache_version' in statement or 'subject_activity_config' in statement]
+    assert len(tables) == 1 and 'cache_version' in tables[0] # Solo la lectura del ETag
+
+
+def test_bumped_versions_are_read_again(app, make_user):
+    _, _, subject = _seed_subject(make_user)
+    key = subject_key(subject.id)
+    with app.test_request_context():
+        before = get_version(key)
+        subject_changed(subject.id)
+        db.session.commit()
+        assert get_version(key) == before + 1
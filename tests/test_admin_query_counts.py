@@ -0,0 +1,63 @@
+# tests/test_admin_query_counts.py
+
+# Los listados del administrador precargan sus relaciones (grade_request_load_options, profesor y
+# niveles de cada asignatura): el número de sentencias no depende de cuántas filas muestran.
+
+from datetime import datetime
+
+import pytest
+
+from extensions import db
+from models import Subject, GradeLevel, Grade, GradeChangeRequest
+
+PAGES = ('/admin/dashboard', '/admin/solicitudes_cambio_notas')
+MAX_STATEMENTS = 8
+
+
+def _seed_school(make_user):
+    admin, teacher, student = make_user('admin', 'Administrador'), make_user('profesor', 'Profesor'), make_user('alumno')
+    level = GradeLevel(name='Primero')
+    db.session.add_all([admin, teacher, student, level])
+    db.session.commit()
+    return admin, teacher, student, level
+
+
+def _add_subjects(count, prefix, admin, teacher, student, level):
+    """`count` asignaturas, cada una con una nota y una solicitud pendiente, aprobada y rechazada."""
+    for number in range(count):
+        subject = Subject(name=f'{prefix} {number}', code=f'{prefix}{number}', teacher_id=teacher.id,
+                          grade_levels=[level])
+        grade = Grade(student=student, subject=subject, value=5, description='Tarea',
+                      activity_name='Tarea 1', unit_number='Unidad I', component_type='Zona')
+        db.session.add_all([subject, grade])
+        for status in ('pending', 'approved', 'rejected'):
+            processed = status != 'pending'
+            db.session.add(GradeChangeRequest(
+                grade=grade, requested_by_user_id=teacher.id, reason='Corrección de la nota',
+                request_type='edit', new_value=4, status=status,
+                approved_by_user_id=admin.id if processed else None,
+                approval_date=datetime.utcnow() if processed else None))
+    db.session.commit()
+
+
+def _statements(client, count_statements, url):
+    db.session.expire_all()
+    with count_statements() as counter:
+        response = client.get(url)
+    assert response.status_code == 200
+    return counter.count
+
+
+@pytest.mark.parametrize('url', PAGES)
+def test_statement_count_does_not_grow_with_rows(client, login, make_user, count_statements, url):
+    school = _seed_school(make_user)
+    login(school[0])
+
+    _add_subjects(5, 'A', *school)
+    client.get(url) # La primera petición carga además la identidad del usuario (identity.py)
+    with_n = _statements(client, count_statements, url)
+    _add_subjects(5, 'B', *school)
+    with_2n = _statements(client, count_statements, url)
+
+    assert with_n == with_2n
+    assert with_n <= MAX_STATEMENTS
@@ -0,0 +1,49 @@
+# tests/test_cache_versions.py
+
+# Sellos de versión (cache.bump_versions): una clave nueva se crea sin chocar con otra transacción
+# que la crea al mismo tiempo, con upsert o, sin él, con un INSERT dentro de un SAVEPOINT.
+
+import pytest
+from sqlalchemy import event, text
+
+import cache
+from cache import bump_version, bump_versions, get_versions
+from extensions import db
+
+
+@pytest.fixture(params=['upsert', 'savepoint'])
+def strategy(request, monkeypatch):
+    if request.param == 'savepoint':
+        monkeypatch.setattr(cache, '_upsert_statement', lambda dialect_name: None)
+    return request.param
+
+
+def _versions(*keys):
+    return {key: version for key, (version, _) in get_versions(keys).items()}
+
+
+def test_new_and_existing_keys(app, strategy):
+    bump_version('a')
+    bump_versions(['a', 'b', 'b'])
+    db.session.commit()
+
+    assert _versions('a', 'b', 'c') == {'a': 2, 'b': 1}
+
+
+def test_key_created_by_another_transaction_meanwhile(app, monkeypatch):
+    # Sin upsert: otra transacción inserta la clave entre el UPDATE (sin filas) y el INSERT
+    monkeypatch.setattr(cache, '_upsert_statement', lambda dialect_name: None)
+    inserted = []
+
+    def insert_after_update(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith('UPDATE cache_version') and not inserted:
+            inserted.append(True)
+            conn.execute(text("INSERT INTO cache_version (key, version, updated_at) VALUES ('k', 1, NULL)"))
+    event.listen(db.engine, 'after_cursor_execute', insert_after_update)
+    try:
+        bump_versions(['k'])
+        db.session.commit()
+    finally:
+        event.remove(db.engine, 'after_cursor_execute', insert_after_update)
+
+    assert _versions('k') == {'k': 2}
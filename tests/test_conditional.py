@@ -0,0 +1,48 @@
+# tests/test_conditional.py
+
+# GET condicional (conditional.py): solo un ETag coincidente produce 304; el ETag distingue al usuario.
+
+from email.utils import formatdate
+
+from extensions import db
+from models import Subject
+
+
+def _students(make_user):
+    students = [make_user('maria'), make_user('juan')]
+    db.session.add_all(students)
+    db.session.add(Subject(name='Matemáticas', code='MAT')) # Sella la versión 'subjects' del dashboard
+    db.session.commit()
+    return students
+
+
+def test_matching_etag_returns_304(client, login, make_user):
+    maria, _ = _students(make_user)
+    login(maria)
+    first = client.get('/estudiante/dashboard')
+    assert first.status_code == 200
+    assert 'Last-Modified' not in first.headers
+
+    again = client.get('/estudiante/dashboard', headers={'If-None-Match': first.headers['ETag']})
+    assert again.status_code == 304
+
+
+def test_if_modified_since_alone_never_returns_304(client, login, make_user):
+    maria, juan = _students(make_user)
+    login(maria)
+    assert client.get('/estudiante/dashboard').status_code == 200
+
+    # Otro estudiante en el mismo navegador, con un cliente que solo envía If-Modified-Since
+    login(juan)
+    response = client.get('/estudiante/dashboard', headers={'If-Modified-Since': formatdate(usegmt=True)})
+    assert response.status_code == 200
+    assert b'Juan' in response.data
+
+
+def test_etag_of_another_user_does_not_match(client, login, make_user):
+    maria, juan = _students(make_user)
+    login(maria)
+    etag = client.get('/estudiante/dashboard').headers['ETag']
+
+    login(juan)
+    assert client.get('/estudiante/dashboard', headers={'If-None-Match': etag}).status_code == 200
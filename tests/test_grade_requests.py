@@ -0,0 +1,70 @@
+# tests/test_grade_requests.py
+
+# Aprobación por lotes de solicitudes de cambio (grade_requests.py): una solicitud se aplica una
+# sola vez aunque dos lotes la aprueben al mismo tiempo.
+
+import threading
+
+import grade_requests
+from extensions import db
+from grade_requests import process_grade_requests
+from models import Subject, Grade, GradeChangeRequest, GradeSummary, GradeEvent
+
+
+def _seed(make_user):
+    admin = make_user('admin', 'Administrador', first_name='Ana', last_name='Admin')
+    teacher = make_user('profesor', 'Profesor', first_name='Carlos', last_name='Gomez')
+    student = make_user('alumno', first_name='Maria', last_name='Gonzalez')
+    subject = Subject(name='Matemáticas', code='MAT', teacher_obj=teacher)
+    grade = Grade(student=student, subject=subject, value=7.0, description='Tarea',
+                  activity_name='Tarea 1', unit_number='Unidad I', component_type='Zona')
+    change = GradeChangeRequest(grade=grade, requested_by=teacher, reason='Corrección de la nota',
+                                request_type='edit', new_value=6.0, status='pending')
+    db.session.add_all([admin, teacher, student, subject, grade, change])
+    db.session.commit()
+    return admin.id, grade.id, change.id
+
+
+def _grade_state(grade_id):
+    db.session.expire_all()
+    grade = db.session.get(Grade, grade_id)
+    summary = GradeSummary.query.filter_by(student_id=grade.student_id, subject_id=grade.subject_id).one()
+    events = GradeEvent.query.filter_by(grade_id=grade_id, event_type='updated').count()
+    return grade.value, summary.zona_total, events
+
+
+def test_second_approval_is_skipped(app, make_user):
+    admin_id, grade_id, request_id = _seed(make_user)
+
+    first = process_grade_requests([request_id], 'approve', admin_id)
+    second = process_grade_requests([request_id], 'approve', admin_id)
+
+    assert [outcome.status for outcome in first + second] == ['approved', 'skipped']
+    assert _grade_state(grade_id) == (6.0, 6.0, 1)
+
+
+def test_concurrent_approval_applies_once(file_app, make_user, monkeypatch):
+    admin_id, grade_id, request_id = _seed(make_user)
+    claim = grade_requests._claim_requests
+    concurrent = []
+    started = threading.Event()
+
+    def approve_in_other_thread():
+        with file_app.app_context():
+            concurrent.extend(process_grade_requests([request_id], 'approve', admin_id))
+
+    def claim_after_other_batch(*args):
+        # El otro lote aprueba la misma solicitud entre la lectura y el reclamo de este
+        if not started.is_set():
+            started.set()
+            thread = threading.Thread(target=approve_in_other_thread)
+            thread.start()
+            thread.join()
+        return claim(*args)
+
+    monkeypatch.setattr(grade_requests, '_claim_requests', claim_after_other_batch)
+    outcomes = process_grade_requests([request_id], 'approve', admin_id)
+
+    assert [outcome.status for outcome in concurrent] == ['approved']
+    assert [outcome.status for outcome in outcomes] == ['skipped']
+    assert _grade_state(grade_id) == (6.0, 6.0, 1)
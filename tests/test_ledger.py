@@ -0,0 +1,42 @@
+# tests/test_ledger.py
+
+# Reconstrucción de notas a una fecha (ledger.grades_as_of) a partir de instantáneas.
+
+from datetime import datetime
+from sqlalchemy import insert, update
+
+from extensions import db
+from ledger import grade_event, grades_as_of, take_snapshot
+from models import Subject, Grade, GradeEvent
+
+
+def _grade(student, subject, activity_name, value):
+    return Grade(student=student, subject=subject, value=value, description=activity_name,
+                 activity_name=activity_name, unit_number='1', component_type='Zona')
+
+
+def test_late_committed_event_below_snapshot_id_is_replayed(app, make_user):
+    student = make_user('e.lopez', first_name='Eva', last_name='López')
+    subject = Subject(name='Física', code='FIS1')
+    late, other = _grade(student, subject, 'Tarea 1', 7), _grade(student, subject, 'Tarea 2', 8)
+    db.session.add_all([student, subject, late, other])
+    db.session.commit()
+    # En PostgreSQL un id alto puede confirmarse antes que uno bajo: se deja un hueco en los ids
+    db.session.execute(insert(GradeEvent), [dict(
+        grade_event('updated', other.id, student.id, subject.id, '1', 'Zona', 'Tarea 2', 9, old_value=8),
+        id=100, occurred_at=datetime.utcnow())])
+    db.session.execute(update(Grade).where(Grade.id == other.id).values(value=9))
+    snapshot = take_snapshot(subject.id)
+    db.session.commit()
+
+    # Transacción que obtuvo su id antes de la instantánea pero se confirmó después
+    db.session.execute(insert(GradeEvent), [dict(
+        grade_event('updated', late.id, student.id, subject.id, '1', 'Zona', 'Tarea 1', 5, old_value=7),
+        id=50, occurred_at=snapshot.taken_at)])
+    db.session.execute(update(Grade).where(Grade.id == late.id).values(value=5))
+    db.session.commit()
+
+    result = grades_as_of(subject.id, datetime.utcnow())
+    assert snapshot.last_event_id == 100
+    assert result.snapshot_taken_at == snapshot.taken_at
+    assert {grade.activity_name: grade.value for grade in result.grades} == {'Tarea 1': 5, 'Tarea 2': 9}
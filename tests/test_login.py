@@ -0,0 +1,48 @@
+# tests/test_login.py
+
+# Inicio de sesión (routes_public.login y passwords.py): un usuario inexistente cuesta el mismo
+# hashing que uno real, y los intentos fallidos desde una IP no bloquean al usuario en otra.
+
+import pytest
+
+import passwords
+from extensions import db
+
+FAST_HASH_METHOD = 'pbkdf2:sha256:1000'
+
+
+@pytest.fixture
+def student(app, make_user):
+    app.config['PASSWORD_HASH_METHOD'] = FAST_HASH_METHOD
+    user = make_user('alumno')
+    user.set_password('correcta')
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+
+def _login(client, username, password, remote_addr='10.0.0.1'):
+    return client.post('/login', data={'username': username, 'password': password},
+                       environ_base={'REMOTE_ADDR': remote_addr})
+
+
+def test_unknown_user_is_hashed_like_a_real_one(client, student, monkeypatch):
+    checked = []
+    def check_password_hash(password_hash, password):
+        checked.append(password_hash.split('$', 1)[0])
+        return True # Ni siquiera un hash de relleno que coincida permite entrar
+    monkeypatch.setattr(passwords, 'check_password_hash', check_password_hash)
+
+    response = _login(client, 'nadie', 'correcta')
+
+    assert response.status_code == 302 and response.location.endswith('/login')
+    assert checked == [FAST_HASH_METHOD]
+
+
+def test_failed_attempts_from_one_ip_do_not_lock_out_another(app, client, student):
+    for _ in range(app.config['LOGIN_RATE_USER_CAPACITY']):
+        _login(client, 'alumno', 'incorrecta', remote_addr='203.0.113.9')
+    assert _login(client, 'alumno', 'incorrecta', remote_addr='203.0.113.9').status_code == 429
+
+    response = _login(client, 'alumno', 'correcta', remote_addr='10.0.0.1')
+    assert response.status_code == 302 and response.location.endswith('/estudiante/dashboard')
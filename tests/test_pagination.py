@@ -0,0 +1,59 @@
+# tests/test_pagination.py
+
+# Paginación por cursor (pagination.keyset_page): las columnas de orden no admiten NULL, así que
+# recorrer las páginas devuelve todas las filas.
+
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+
+from extensions import db
+from models import GradeChangeRequest
+from pagination import keyset_page
+
+
+@pytest.fixture
+def teacher(app, make_user):
+    user = make_user('profesor', 'Profesor')
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+
+def _request(teacher, status, approval_date=None, **values):
+    return GradeChangeRequest(requested_by_user_id=teacher.id, reason='Corrección', request_type='edit',
+                              new_value=4, status=status, approval_date=approval_date, **values)
+
+
+def test_pages_cover_every_processed_request(teacher):
+    start = datetime(2026, 3, 1)
+    db.session.add_all([_request(teacher, 'approved', start + timedelta(hours=number % 3)) for number in range(7)])
+    db.session.commit()
+
+    seen, cursor = [], None
+    while True:
+        page = keyset_page(GradeChangeRequest.query.filter_by(status='approved'), GradeChangeRequest.approval_date,
+                           GradeChangeRequest.id, cursor=cursor, page_size=2, descending=True)
+        seen.extend(row.id for row in page)
+        if not page.has_more:
+            break
+        cursor = page.next_cursor
+
+    assert sorted(seen) == list(range(1, 8)) and len(seen) == 7
+
+
+def test_processed_request_needs_approval_date(teacher):
+    db.session.add(_request(teacher, 'approved'))
+    with pytest.raises(IntegrityError):
+        db.session.commit()
+    db.session.rollback()
+
+
+def test_request_date_is_required(teacher):
+    with pytest.raises(IntegrityError):
+        db.session.execute(insert(GradeChangeRequest.__table__), [{
+            'requested_by_user_id': teacher.id, 'reason': 'Corrección', 'request_type': 'edit',
+            'status': 'pending', 'request_date': None}])
+    db.session.rollback()
@@ -0,0 +1,14 @@
+# tests/test_request_metrics.py
+
+# Métricas por petición (request_metrics.py): la cabecera Server-Timing no se envía por defecto.
+
+def test_no_server_timing_by_default(app, client):
+    response = client.get('/login')
+    assert response.status_code == 200
+    assert 'Server-Timing' not in response.headers
+
+
+def test_server_timing_when_enabled(app, client):
+    app.config['SERVER_TIMING_HEADER'] = True
+    response = client.get('/login')
+    assert response.headers.getlist('Server-Timing')[0].startswith('db;dur=')
@@ -0,0 +1,55 @@
+# tests/test_search.py
+
+# Búsqueda por prefijo (search.py) sobre las columnas normalizadas: sin distinguir mayúsculas ni tildes.
+
+import pytest
+from sqlalchemy import insert, text
+
+from extensions import db
+from models import User, Subject, search_key
+from search import search_students, search_subjects
+
+
+@pytest.mark.parametrize('term', ['Álvarez', 'ÁLVAREZ', 'álvarez', 'alvarez', 'Álv', 'ángel alv'])
+def test_accented_names_are_found(app, make_user, term):
+    db.session.add_all([make_user('a.alvarez', first_name='Ángel', last_name='Álvarez'),
+                        make_user('b.perez', first_name='Bruno', last_name='Pérez')])
+    db.session.commit()
+
+    assert [result['label'] for result in search_students(term)] == ['Ángel Álvarez (a.alvarez)']
+
+
+def test_subjects_match_without_accents(app):
+    db.session.add_all([Subject(name='Ética', code='ETI1'), Subject(name='Óptica', code='OPT1')])
+    db.session.commit()
+
+    assert [result['label'] for result in search_subjects('etica')] == ['Ética (ETI1)']
+    assert [result['label'] for result in search_subjects('ÓPT')] == ['Óptica (OPT1)']
+
+
+def test_keys_follow_orm_updates_and_core_inserts(app, make_user):
+    student = make_user('o.ruiz', first_name='Oscar', last_name='Ruiz')
+    db.session.add(student)
+    db.session.commit()
+    student.first_name = 'Óscar'
+    db.session.commit()
+    db.session.execute(insert(User), [{'username': 'i.nunez', 'email': 'i@school.test', 'password': 'x',
+                                       'role': 'Estudiante', 'first_name': 'Íñigo', 'last_name': 'Núñez'}])
+    db.session.commit()
+
+    assert student.first_name_search == 'oscar'
+    assert [result['label'] for result in search_students('óscar')] == ['Óscar Ruiz (o.ruiz)']
+    assert [result['label'] for result in search_students('nunez')] == ['Íñigo Núñez (i.nunez)']
+
+
+def test_search_key():
+    assert search_key('ÁLVAREZ') == 'alvarez'
+    assert search_key('Núñez') == 'nunez'
+    assert search_key('Straße') == 'strasse'
+
+
+def test_prefix_search_uses_index(app):
+    plan = db.session.execute(text(
+        "EXPLAIN QUERY PLAN SELECT id FROM user WHERE role = 'Estudiante' "
+        "AND last_name_search >= 'alv' AND last_name_search < 'alw'")).all()
+    assert any('ix_user_role_last_name_search' in row[-1] for row in plan)
@@ -0,0 +1,187 @@
+# user_provisioning.py
+
+# Alta masiva de usuarios desde un listado CSV (inicio de año escolar).
+# - Todo el archivo se valida primero: columnas, rol, longitudes y duplicados dentro del archivo.
+# - La unicidad contra la base se comprueba con consultas IN por lotes sobre los índices únicos
+#   de username y email, en lugar de dos consultas por usuario como en el registro.
+# - Los hashes se calculan en un pool de procesos (scrypt es CPU puro; cada núcleo hace uno a la vez).
+# - Las filas se insertan con INSERT de Core por lotes, un commit por lote.
+
+import csv
+import os
+import secrets
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from flask import current_app
+from sqlalchemy import insert, select, or_
+from sqlalchemy.exc import IntegrityError
+from werkzeug.security import generate_password_hash
+from extensions import db
+from models import User
+
+DEFAULT_BATCH_SIZE = 500
+LOOKUP_CHUNK = 500 # Valores por cada IN (SQLite acepta un número limitado de parámetros)
+ROLES = ('Estudiante', 'Profesor', 'Administrador')
+GENERATED_PASSWORD_BYTES = 9 # 12 caracteres url-safe
+
+COLUMN_ALIASES = {
+    'username': ('username', 'usuario'),
+    'email': ('email', 'correo'),
+    'first_name': ('first_name', 'nombre'),
+    'last_name': ('last_name', 'apellido'),
+    'role': ('role', 'rol'),
+    'password': ('password', 'contraseña', 'contrasena'),
+}
+REQUIRED_COLUMNS = ('username', 'email', 'first_name', 'last_name', 'role')
+
+
+class ProvisionReport:
+    """Resultado del alta: creados, omitidos (ya existían tal cual), conflictos y errores por fila."""
+
+    def __init__(self):
+        self.rows_read = 0
+        self.created = 0
+        self.skipped = [] # (línea, usuario): mismo usuario y email ya existentes
+        self.conflicts = [] # (línea, mensaje): usuario o email ocupados por otra cuenta
+        self.errors = [] # (línea, mensaje): filas inválidas
+        self.generated_passwords = [] # (usuario, contraseña) de las filas sin contraseña en el archivo
+        self.batches = 0
+
+
+def _resolve_columns(fieldnames):
+    normalized = {name.strip().lower(): name for name in (fieldnames or []) if name}
+    columns = {}
+    for column, aliases in COLUMN_ALIASES.items():
+        for alias in aliases:
+            if alias in normalized:
+                columns[column] = normalized[alias]
+                break
+    missing = [column for column in REQUIRED_COLUMNS if column not in columns]
+    return columns, missing
+
+
+def _existing_accounts(usernames, emails):
+    """{username: email} de las cuentas que ya usan alguno de los usuarios o emails dados."""
+    found = {}
+    usernames, emails = list(usernames), list(emails)
+    for start in range(0, max(len(usernames), len(emails)), LOOKUP_CHUNK):
+        chunk_usernames = usernames[start:start + LOOKUP_CHUNK]
+        chunk_emails = emails[start:start + LOOKUP_CHUNK]
+        rows = db.session.execute(
+            select(User.username, User.email)
+            .where(or_(User.username.in_(chunk_usernames), User.email.in_(chunk_emails))))
+        found.update(rows.tuples().all())
+    return found
+
+
+def hash_passwords(passwords, method, workers=None):
+    """Hashes en paralelo con la política indicada. Con un solo worker no se crea el pool."""
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(passwords) < 2:
+        return [generate_password_hash(password, method=method) for password in passwords]
+    chunksize = max(1, len(passwords) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(generate_password_hash, passwords, repeat(method), chunksize=chunksize))
+
+
+def _insert_batch(rows, report):
+    """`rows` son (línea, fila, contraseña generada o None); solo las cuentas creadas se informan."""
+    def created(generated_password, username):
+        report.created += 1
+        if generated_password:
+            report.generated_passwords.append((username, generated_password))
+
+    try:
+        db.session.execute(insert(User), [row for _, row, _ in rows])
+        db.session.commit()
+        for _, row, generated_password in rows:
+            created(generated_password, row['username'])
+    except IntegrityError:
+        # Otro proceso creó alguna de estas cuentas después de la verificación: fila por fila
+        db.session.rollback()
+        for line_number, row, generated_password in rows:
+            try:
+                db.session.execute(insert(User), [row])
+                db.session.commit()
+                created(generated_password, row['username'])
+            except IntegrityError:
+                db.session.rollback()
+                report.conflicts.append((line_number, f'"{row["username"]}" o "{row["email"]}" se registró durante la importación.'))
+    report.batches += 1
+
+
+def provision_users(text_stream, batch_size=DEFAULT_BATCH_SIZE, workers=None, dry_run=False):
+    """Crea las cuentas del listado CSV `text_stream` y devuelve un ProvisionReport.
+
+    Columnas: username, email, first_name, last_name, role (también usuario, correo, nombre,
+    apellido, rol) y opcionalmente password. Las filas sin contraseña reciben una aleatoria,
+    que se devuelve en report.generated_passwords. Con dry_run solo se valida.
+    """
+    report = ProvisionReport()
+    reader = csv.DictReader(text_stream)
+    columns, missing = _resolve_columns(reader.fieldnames)
+    if missing:
+        report.errors.append((1, f'Faltan columnas en el encabezado: {", ".join(missing)}.'))
+        return report
+
+    roles = {role.lower(): role for role in ROLES}
+    limits = {name: User.__table__.c[name].type.length for name in ('username', 'email', 'first_name', 'last_name')}
+    candidates = [] # (línea, datos, contraseña en claro, generada)
+    seen_usernames, seen_emails = set(), set()
+    for line_number, row in enumerate(reader, start=2):
+        report.rows_read += 1
+        data = {column: (row.get(columns[column]) or '').strip() for column in REQUIRED_COLUMNS}
+        data['email'] = data['email'].lower()
+        blank = [column for column in REQUIRED_COLUMNS if not data[column]]
+        if blank:
+            report.errors.append((line_number, f'Campos vacíos: {", ".join(blank)}.'))
+            continue
+        too_long = [name for name, limit in limits.items() if len(data[name]) > limit]
+        if too_long:
+            report.errors.append((line_number, f'Campos demasiado largos: {", ".join(too_long)}.'))
+            continue
+        role = roles.get(data['role'].lower())
+        if role is None:
+            report.errors.append((line_number, f'Rol no válido: "{data["role"]}".'))
+            continue
+        data['role'] = role
+        if data['username'] in seen_usernames or data['email'] in seen_emails:
+            report.errors.append((line_number, f'"{data["username"]}" o "{data["email"]}" está repetido en el archivo.'))
+            continue
+        seen_usernames.add(data['username'])
+        seen_emails.add(data['email'])
+        password = (row.get(columns['password']) or '').strip() if 'password' in columns else ''
+        generated = not password
+        if generated:
+            password = secrets.token_urlsafe(GENERATED_PASSWORD_BYTES)
+        candidates.append((line_number, data, password, generated))
+
+    # Unicidad contra la base: unas pocas consultas IN en total
+    existing = _existing_accounts(seen_usernames, seen_emails)
+    taken_emails = {email: username for username, email in existing.items()}
+    to_create = []
+    for line_number, data, password, generated in candidates:
+        username, email = data['username'], data['email']
+        if existing.get(username) == email:
+            report.skipped.append((line_number, username))
+        elif username in existing:
+            report.conflicts.append((line_number, f'El usuario "{username}" ya existe con otro email.'))
+        elif email in taken_emails:
+            report.conflicts.append((line_number, f'El email "{email}" ya pertenece a "{taken_emails[email]}".'))
+        else:
+            to_create.append((line_number, data, password, generated))
+
+    if dry_run or not to_create:
+        return report
+
+    hashes = hash_passwords([password for _, _, password, _ in to_create],
+                            current_app.config['PASSWORD_HASH_METHOD'], workers)
+    batch = []
+    for (line_number, data, password, generated), password_hash in zip(to_create, hashes):
+        batch.append((line_number, dict(data, password=password_hash), password if generated else None))
+        if len(batch) >= batch_size:
+            _insert_batch(batch, report)
+            batch = []
+    if batch:
+        _insert_batch(batch, report)
+    return report
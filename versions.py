@@ -0,0 +1,66 @@
+# versions.py
+
+# Sellos de versión (CacheVersion, ver cache.py) de los datos que muestran las páginas.
+# conditional.py los usa para responder 304 Not Modified sin consultar nada más.
+#   grades:student:<id>  notas e inscripciones de un estudiante (cualquier asignatura)
+#   grades:subject:<id>  notas e inscripciones de una asignatura
+#   subject:<id>         datos y actividades configuradas de una asignatura
+#   subjects             altas, bajas y cambios de asignaturas (listados y dashboards)
+#   grade_requests       solicitudes de cambio de notas
+#   announcements        anuncios (announcements.py)
+# Las escrituras del ORM se detectan en after_flush; las notas se sellan desde
+# grade_summary.apply_deltas, por donde pasan también las escrituras masivas.
+
+from sqlalchemy import event
+from extensions import db
+from models import Subject, SubjectActivityConfig, GradeChangeRequest, Enrollment
+from cache import bump_versions
+
+SUBJECTS_KEY = 'subjects'
+GRADE_REQUESTS_KEY = 'grade_requests'
+ANNOUNCEMENTS_KEY = 'announcements'
+
+
+def student_grades_key(student_id):
+    return f'grades:student:{student_id}'
+
+
+def subject_grades_key(subject_id):
+    return f'grades:subject:{subject_id}'
+
+
+def subject_key(subject_id):
+    return f'subject:{subject_id}'
+
+
+def grades_changed(student_subject_pairs, connection=None):
+    """Sella las notas de los estudiantes y asignaturas afectados por una escritura de notas."""
+    keys = set()
+    for student_id, subject_id in student_subject_pairs:
+        keys.add(student_grades_key(student_id))
+        keys.add(subject_grades_key(subject_id))
+    bump_versions(keys, connection)
+
+
+def subject_changed(subject_id, connection=None):
+    bump_versions([subject_key(subject_id), SUBJECTS_KEY], connection)
+
+
+def grade_requests_changed(connection=None):
+    bump_versions([GRADE_REQUESTS_KEY], connection)
+
+
+@event.listens_for(db.session, 'after_flush')
+def _track_versioned_changes(session, flush_context):
+    keys = set()
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, Subject):
+            keys.update((subject_key(obj.id), SUBJECTS_KEY))
+        elif isinstance(obj, SubjectActivityConfig):
+            keys.add(subject_key(obj.subject_id))
+        elif isinstance(obj, Enrollment):
+            keys.update((student_grades_key(obj.student_id), subject_grades_key(obj.subject_id)))
+        elif isinstance(obj, GradeChangeRequest):
+            keys.add(GRADE_REQUESTS_KEY)
+    if keys:
+        bump_versions(keys, session.connection())
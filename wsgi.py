@@ -0,0 +1,9 @@
+# wsgi.py
+
+# Punto de entrada para servidores WSGI:
+#   gunicorn --preload -w 4 wsgi:app
+# Con --preload la aplicación se construye una vez en el proceso maestro y los workers la heredan por fork.
+
+from app import create_app
+
+app = create_app()